@@ -10,9 +10,14 @@ import streamlit as st
 
 from config import (
     APP_VERSION,
+    DEFAULT_DEMUCS_PROFILE,
     DEFAULT_PROFILE,
     DOWNLOADS_DIR,
     DEMUCS_MODEL,
+    DEMUCS_PROFILES,
+    DEMUCS_TWO_STEM_OPTIONS,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_MAX_BYTES,
     REQUIRED_TOOLS,
     RUNS_DIR,
     SIMPLIFY_ADVANCED_RANGES,
@@ -27,12 +32,16 @@ from config import (
 from pipeline import (
     assess_song_fit,
     build_score,
+    demucs_profile_settings,
     download_or_convert_audio,
     render_pdfs,
+    resolve_demucs_engine,
+    resolve_transcribe_engine,
     separate_stems,
     transcribe_to_midi,
 )
 from utils import (
+    cache_storage_summary,
     cleanup_temp,
     create_run_dir,
     create_run_id,
@@ -72,6 +81,7 @@ def _init_state() -> None:
         "source_type": "",
         "source_value": "",
         "stems": {},
+        "stems_separation": {},
         "assignments": {},
         "midi_map": {},
         "score_data": {},
@@ -81,6 +91,8 @@ def _init_state() -> None:
         "zip_path": "",
         "run_id": "",
         "run_dir": "",
+        "run_cache_stats": {},
+        "run_timings": {},
         "preflight": [],
         "preflight_snapshot": {},
         "preflight_change_indicator": "",
@@ -95,6 +107,8 @@ def _init_state() -> None:
         "opt_min_duration": float(SIMPLIFY_PRESET["min_note_duration_beats"]),
         "opt_density_threshold": int(SIMPLIFY_PRESET["density_threshold"]),
         "opt_auto_apply_recommendation": True,
+        "opt_demucs_profile": DEFAULT_DEMUCS_PROFILE,
+        "opt_demucs_two_stems": "Off",
         "opt_two_pass_export": False,
         "export_last_ok": False,
         "export_integrity_warning": "",
@@ -146,6 +160,8 @@ def _new_run() -> Path:
     run_dir = create_run_dir(RUNS_DIR, run_id)
     st.session_state.run_id = run_id
     st.session_state.run_dir = str(run_dir)
+    st.session_state.run_cache_stats = {}
+    st.session_state.run_timings = {}
     return run_dir
 
 
@@ -346,6 +362,13 @@ def _render_preflight() -> None:
         st.error("Some required tools are missing. Install them before running the pipeline.")
 
 
+def _render_input_cache_note() -> None:
+    """Show a short note when normalized input audio came from the cache."""
+    counters = (st.session_state.get("run_cache_stats") or {}).get("input_audio") or {}
+    if int(counters.get("hits", 0)) > 0:
+        st.caption("Reused cached normalized audio from an earlier run (no re-decode).")
+
+
 def _render_input_stage() -> None:
     st.subheader("1) Input")
     st.caption("Preparing audio starts a new run ID and run workspace.")
@@ -364,10 +387,13 @@ def _render_input_stage() -> None:
             try:
                 run_dir = _new_run()
                 source_path = _save_uploaded_file(uploaded, run_dir)
-                st.session_state.wav_path = download_or_convert_audio(source_path, run_dir=run_dir)
+                st.session_state.wav_path = download_or_convert_audio(
+                    source_path, run_dir=run_dir, cache_stats=st.session_state.run_cache_stats,
+                )
                 st.session_state.source_type = "local"
                 st.session_state.source_value = uploaded.name
                 st.success("Audio prepared.")
+                _render_input_cache_note()
             except Exception as exc:
                 _show_stage_error(
                     "Input preparation",
@@ -383,10 +409,13 @@ def _render_input_stage() -> None:
                 return
             try:
                 run_dir = _new_run()
-                st.session_state.wav_path = download_or_convert_audio(youtube_url.strip(), run_dir=run_dir)
+                st.session_state.wav_path = download_or_convert_audio(
+                    youtube_url.strip(), run_dir=run_dir, cache_stats=st.session_state.run_cache_stats,
+                )
                 st.session_state.source_type = "youtube"
                 st.session_state.source_value = youtube_url.strip()
                 st.success("Audio downloaded and prepared.")
+                _render_input_cache_note()
             except Exception as exc:
                 _show_stage_error(
                     "YouTube audio preparation",
@@ -404,13 +433,41 @@ def _render_stem_stage() -> None:
         st.info("Complete step 1 first.")
         return
 
+    profile_names = list(DEMUCS_PROFILES.keys())
+    if st.session_state.opt_demucs_profile not in profile_names:
+        st.session_state.opt_demucs_profile = DEFAULT_DEMUCS_PROFILE
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        demucs_profile = st.selectbox(
+            "Separation Speed Profile",
+            options=profile_names,
+            key="opt_demucs_profile",
+            help="Fast Preview trades separation quality for speed; Quality is slowest.",
+        )
+    with col2:
+        two_stem_choice = st.selectbox(
+            "Two-Stem Mode",
+            options=["Off"] + list(DEMUCS_TWO_STEM_OPTIONS),
+            key="opt_demucs_two_stems",
+            help="Separate only one stem plus its accompaniment (e.g. just the vocals line).",
+        )
+    two_stems = "" if two_stem_choice == "Off" else two_stem_choice
+
     if st.button("Separate Stems", use_container_width=True):
         try:
             with st.spinner("Running Demucs..."):
                 st.session_state.stems = separate_stems(
-                    st.session_state.wav_path, run_dir=_current_run_dir(),
+                    st.session_state.wav_path,
+                    run_dir=_current_run_dir(),
+                    cache_stats=st.session_state.run_cache_stats,
+                    profile=demucs_profile,
+                    two_stems=two_stems,
                 )
+            st.session_state.stems_separation = demucs_profile_settings(demucs_profile, two_stems)
             st.success("Stems generated.")
+            stem_counters = st.session_state.run_cache_stats.get("stems") or {}
+            if int(stem_counters.get("hits", 0)) > 0:
+                st.caption("Reused cached stems for this audio (Demucs skipped).")
         except Exception as exc:
             _show_stage_error(
                 "Stem separation",
@@ -655,8 +712,18 @@ def _render_diagnostics_panel() -> None:
         st.markdown(f"- Python: `{tool_versions.get('python', 'unknown')}`")
         st.markdown(f"- App Version: `{APP_VERSION}`")
         st.markdown(f"- Demucs Model: `{DEMUCS_MODEL}`")
+        st.markdown(f"- Demucs Engine: `{resolve_demucs_engine()}`")
+        st.markdown(f"- Transcription Engine: `{resolve_transcribe_engine()}`")
         st.markdown(f"- Latest Run ID: `{st.session_state.run_id or 'n/a'}`")
         st.markdown(f"- Latest ZIP: `{st.session_state.zip_path or 'n/a'}`")
+        render_counters = (st.session_state.get("run_cache_stats") or {}).get("renders") or {}
+        render_storage = cache_storage_summary(RENDER_CACHE_DIR)
+        render_cache_text = (
+            f"{render_counters.get('hits', 0)} hit / {render_counters.get('misses', 0)} miss latest run, "
+            f"{render_storage['count']} PDF(s), {_format_size(render_storage['size_bytes'])} "
+            f"of {_format_size(RENDER_CACHE_MAX_BYTES)}"
+        )
+        st.markdown(f"- Render Cache: `{render_cache_text}`")
         preflight_ts = st.session_state.get("preflight_last_run_ts", "")
         preflight_age = _format_elapsed_since(preflight_ts)
         st.markdown(f"- Preflight Last Run: `{preflight_ts or 'n/a'}`")
@@ -677,8 +744,11 @@ def _render_diagnostics_panel() -> None:
             f"Python: {tool_versions.get('python', 'unknown')}",
             f"App Version: {APP_VERSION}",
             f"Demucs Model: {DEMUCS_MODEL}",
+            f"Demucs Engine: {resolve_demucs_engine()}",
+            f"Transcription Engine: {resolve_transcribe_engine()}",
             f"Latest Run ID: {st.session_state.run_id or 'n/a'}",
             f"Latest ZIP: {st.session_state.zip_path or 'n/a'}",
+            f"Render Cache: {render_cache_text}",
             f"Preflight Last Run: {preflight_ts or 'n/a'}",
             f"Preflight Age: {preflight_age}",
             "Tool Availability:",
@@ -1261,10 +1331,46 @@ def _render_selected_run_details(run_id: str) -> None:
     else:
         st.session_state.history_warning_digest = ""
         st.caption("No manifest-recorded export integrity warnings.")
+    demucs_engine = str(pipeline.get("demucs_engine", "") or "")
+    separation_profile = str(pipeline.get("separation_profile", "") or "")
+    two_stems = str((pipeline.get("separation_settings") or {}).get("two_stems", "") or "")
     st.markdown(
         f"- Pipeline: app `{pipeline.get('app_version', 'n/a')}`, "
         f"demucs `{pipeline.get('demucs_model', 'n/a')}`"
+        f"{f' ({demucs_engine} engine)' if demucs_engine else ''}"
+        f"{f', separation `{separation_profile}`' if separation_profile else ''}"
+        f"{f' two-stem `{two_stems}`' if two_stems else ''}"
     )
+    cache_block = manifest.get("cache") or {}
+    if cache_block:
+        cache_text = ", ".join(
+            f"{name} {counters.get('hits', 0)} hit / {counters.get('misses', 0)} miss"
+            for name, counters in sorted(cache_block.items())
+        )
+        st.markdown(f"- Cache: `{cache_text}`")
+    transcription_timing = (manifest.get("timings") or {}).get("transcription") or {}
+    if transcription_timing:
+        stem_times = ", ".join(
+            f"{name} {seconds}s" for name, seconds in (transcription_timing.get("stems_s") or {}).items()
+        )
+        st.markdown(
+            f"- Transcription: `{transcription_timing.get('engine', 'cli')} engine, "
+            f"{transcription_timing.get('total_s', 'n/a')}s total, "
+            f"{transcription_timing.get('workers', 'n/a')} worker(s)`"
+            f"{f' ({stem_times})' if stem_times else ''}"
+        )
+    score_timing = (manifest.get("timings") or {}).get("score_build") or {}
+    if score_timing:
+        family_times = ", ".join(
+            f"{family} {entry.get('cleanup_s', 'n/a')}s/{entry.get('parts', 0)} part(s)"
+            for family, entry in (score_timing.get("families") or {}).items()
+        )
+        st.markdown(
+            f"- Score Build: `{score_timing.get('engine', 'music21')} engine, "
+            f"{score_timing.get('total_s', 'n/a')}s total, "
+            f"{score_timing.get('workers', 1)} worker(s)`"
+            f"{f' (cleanup: {family_times})' if family_times else ''}"
+        )
     st.markdown(f"- Part Summary: `{_format_selected_run_part_summary(manifest.get('parts'))}`")
 
     if st.button(
@@ -1369,6 +1475,16 @@ def _render_part_report() -> None:
                     "Beginner gate blocked this part as not classroom-playable. "
                     "Try a different stem assignment or use Easy Intermediate."
                 )
+            elif reason == "build_failed":
+                suggestion = (
+                    f"Score build failed for this stem ({entry.get('error', 'unknown error')}); "
+                    "other parts were still exported. Check the stem's MIDI, then rerun."
+                )
+            elif reason == "render_failed":
+                suggestion = (
+                    f"MuseScore could not render this part ({entry.get('error', 'unknown error')}); "
+                    "other parts were still exported. Check that MuseScore opens the part, then rerun."
+                )
             st.warning(f"**{name}**: skipped ({reason}). {suggestion}")
             has_skips = True
 
@@ -1538,8 +1654,17 @@ def _render_song_fit_panel(assigned_stems: dict[str, str]) -> None:
             cached_signature = st.session_state.get("fit_analysis_signature", "")
             if not st.session_state.get("midi_map") or cached_signature != signature:
                 with st.spinner("Analyzing song fit (transcribing assigned stems)..."):
-                    st.session_state.midi_map = transcribe_to_midi(assigned_stems, run_dir=_current_run_dir())
-            fit_analysis = assess_song_fit(st.session_state.midi_map, st.session_state.assignments)
+                    st.session_state.midi_map = transcribe_to_midi(
+                        assigned_stems,
+                        run_dir=_current_run_dir(),
+                        cache_stats=st.session_state.run_cache_stats,
+                        timings=st.session_state.run_timings,
+                    )
+            fit_analysis = assess_song_fit(
+                st.session_state.midi_map,
+                st.session_state.assignments,
+                cache_stats=st.session_state.run_cache_stats,
+            )
             st.session_state.fit_analysis = fit_analysis
             st.session_state.fit_analysis_signature = signature
             st.session_state.fit_analysis_profile_used = str(fit_analysis.get("recommended_profile", ""))
@@ -1595,6 +1720,19 @@ def _merge_fit_metadata(run_options: dict, assigned_stems: dict[str, str]) -> di
     return merged
 
 
+def _pipeline_metadata() -> dict:
+    """Pipeline block recorded in run manifests."""
+    separation = dict(st.session_state.get("stems_separation") or {})
+    return {
+        "app_version": APP_VERSION,
+        "demucs_model": DEMUCS_MODEL,
+        "demucs_engine": resolve_demucs_engine(),
+        "transcription_engine": resolve_transcribe_engine(),
+        "separation_profile": str(separation.pop("profile", "") or ""),
+        "separation_settings": separation,
+    }
+
+
 def _record_failed_run_manifest(
     run_dir: Path,
     run_id: str,
@@ -1621,10 +1759,12 @@ def _record_failed_run_manifest(
             options=options,
             assignments=st.session_state.assignments,
             part_report=part_report,
-            pipeline={"app_version": APP_VERSION, "demucs_model": DEMUCS_MODEL},
+            pipeline=_pipeline_metadata(),
             tool_versions=get_tool_versions(),
             zip_filename="",
             outcome_success=False,
+            cache_stats=st.session_state.get("run_cache_stats") or {},
+            timings=st.session_state.get("run_timings") or {},
         )
     set_manifest_outcome_success(manifest_path, False)
     set_manifest_outcome_failure_context(manifest_path, stage, failure_summary)
@@ -1643,7 +1783,18 @@ def _run_export(options: dict, assigned_stems: dict[str, str], run_dir: Path, ru
             st.caption("Reusing recent transcription output from fit analysis.")
         else:
             with st.spinner("Transcribing stems with Basic Pitch..."):
-                st.session_state.midi_map = transcribe_to_midi(assigned_stems, run_dir=run_dir)
+                st.session_state.midi_map = transcribe_to_midi(
+                    assigned_stems,
+                    run_dir=run_dir,
+                    cache_stats=st.session_state.run_cache_stats,
+                    timings=st.session_state.run_timings,
+                )
+            cached_stems = (st.session_state.run_timings.get("transcription") or {}).get("cached_stems") or []
+            if cached_stems:
+                st.caption(
+                    f"Reused cached transcription for {len(cached_stems)} of {len(assigned_stems)} stem(s): "
+                    + ", ".join(cached_stems)
+                )
     except Exception as exc:
         try:
             _record_failed_run_manifest(run_dir, run_id, options, "transcription", exc)
@@ -1662,8 +1813,16 @@ def _run_export(options: dict, assigned_stems: dict[str, str], run_dir: Path, ru
                 st.session_state.assignments,
                 options,
                 run_dir=run_dir,
+                timings=st.session_state.run_timings,
+                cache_stats=st.session_state.run_cache_stats,
             )
             st.session_state.musicxml_path = st.session_state.score_data["full_score"]
+        reused_parts = (st.session_state.run_timings.get("score_build") or {}).get("reused_stages") or {}
+        if reused_parts:
+            st.caption(
+                f"Reused earlier part builds for {len(reused_parts)} part(s) with unchanged settings: "
+                + ", ".join(reused_parts)
+            )
     except Exception as exc:
         try:
             _record_failed_run_manifest(run_dir, run_id, options, "score_build", exc)
@@ -1677,7 +1836,10 @@ def _run_export(options: dict, assigned_stems: dict[str, str], run_dir: Path, ru
         return False
     try:
         with st.spinner("Rendering PDFs with MuseScore..."):
-            render_result = render_pdfs(st.session_state.score_data, run_id=run_id)
+            render_result = render_pdfs(
+                st.session_state.score_data, run_id=run_id, timings=st.session_state.run_timings,
+                cache_stats=st.session_state.run_cache_stats,
+            )
             st.session_state.pdf_paths = render_result["paths"]
             st.session_state.part_report = render_result["part_report"]
             complexity_rows = _compute_export_complexity_rows()
@@ -1715,10 +1877,12 @@ def _run_export(options: dict, assigned_stems: dict[str, str], run_dir: Path, ru
             options=options,
             assignments=st.session_state.assignments,
             part_report=all_part_report,
-            pipeline={"app_version": APP_VERSION, "demucs_model": DEMUCS_MODEL},
+            pipeline=_pipeline_metadata(),
             tool_versions=get_tool_versions(),
             zip_filename=zip_name,
             outcome_success=True,
+            cache_stats=st.session_state.get("run_cache_stats") or {},
+            timings=st.session_state.get("run_timings") or {},
         )
     except Exception as exc:
         try:
@@ -1999,6 +2163,7 @@ def main() -> None:
                 "source_type",
                 "source_value",
                 "stems",
+                "stems_separation",
                 "assignments",
                 "midi_map",
                 "score_data",
@@ -2008,6 +2173,8 @@ def main() -> None:
                 "zip_path",
                 "run_id",
                 "run_dir",
+                "run_cache_stats",
+                "run_timings",
                 "export_last_ok",
                 "export_integrity_warning",
                 "export_complexity_rows",
@@ -2017,7 +2184,16 @@ def main() -> None:
                 "fit_analysis_profile_used",
                 "multi_pass_exports",
             ):
-                if key in ("stems", "assignments", "midi_map", "score_data", "fit_analysis"):
+                if key in (
+                    "stems",
+                    "stems_separation",
+                    "assignments",
+                    "midi_map",
+                    "score_data",
+                    "fit_analysis",
+                    "run_cache_stats",
+                    "run_timings",
+                ):
                     st.session_state[key] = {}
                 elif key in ("pdf_paths", "part_report", "export_complexity_rows", "multi_pass_exports"):
                     st.session_state[key] = []
@@ -3,6 +3,7 @@ from __future__ import annotations
 import base64
 import csv
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -10,6 +11,11 @@ import streamlit as st
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import BASIC_PITCH_PARAMS, RUNS_DIR
+
 TUNING_ROOT = PROJECT_ROOT / "datasets" / "tuning_rounds"
 
 RUBRIC_OPTIONS = {
@@ -110,6 +116,103 @@ def _embed_pdf(pdf_path: Path) -> None:
     )
 
 
+def _run_posteriorgrams(run_dir: Path) -> dict[str, Path]:
+    """Stem name -> saved Basic Pitch posteriorgram for one run."""
+    return {path.parent.name: path for path in sorted((run_dir / "midi").glob("*/*_posteriorgram.npz"))}
+
+
+def _default_redecode_stem(run_dir: Path, part_name: str, stems: list[str]) -> str:
+    manifest_path = run_dir / "manifest.json"
+    try:
+        assignments = json.loads(manifest_path.read_text()).get("assignments") or {}
+    except Exception:
+        assignments = {}
+    for stem_name, instrument in assignments.items():
+        if instrument == part_name and stem_name in stems:
+            return stem_name
+    return stems[0]
+
+
+def _render_redecode_panel(sample: dict) -> None:
+    """Re-decode a sample's transcription from cached activations with new thresholds."""
+    run_id = str(sample.get("run_id", ""))
+    run_dir = RUNS_DIR / run_id
+    with st.expander("Transcription thresholds (re-decode)", expanded=False):
+        posteriorgrams = _run_posteriorgrams(run_dir)
+        if not posteriorgrams:
+            st.caption(
+                "No saved posteriorgrams for this run. Transcribe with "
+                "`TRANSCRIBE_SAVE_POSTERIORGRAMS = True` to enable threshold tuning."
+            )
+            return
+        stems = list(posteriorgrams)
+        default_stem = _default_redecode_stem(run_dir, str(sample.get("part_name", "")), stems)
+        stem_name = st.selectbox(
+            "Stem", stems, index=stems.index(default_stem), key=f"tl_redecode_stem_{run_id}",
+        )
+        t1, t2, t3 = st.columns(3)
+        with t1:
+            onset_threshold = st.slider(
+                "Onset threshold", 0.05, 0.95, float(BASIC_PITCH_PARAMS["onset_threshold"]), 0.05,
+                key=f"tl_onset_{run_id}",
+            )
+        with t2:
+            frame_threshold = st.slider(
+                "Frame threshold", 0.05, 0.95, float(BASIC_PITCH_PARAMS["frame_threshold"]), 0.05,
+                key=f"tl_frame_{run_id}",
+            )
+        with t3:
+            minimum_note_length_ms = st.slider(
+                "Min note length (ms)", 10.0, 500.0, float(BASIC_PITCH_PARAMS["minimum_note_length_ms"]), 5.0,
+                key=f"tl_min_note_{run_id}",
+            )
+        params = {
+            "onset_threshold": onset_threshold,
+            "frame_threshold": frame_threshold,
+            "minimum_note_length_ms": minimum_note_length_ms,
+        }
+        # Decode results are memoized per (stem, thresholds) so rating clicks don't re-decode.
+        cache = st.session_state.setdefault("tl_redecode_cache", {})
+        cache_key = (str(posteriorgrams[stem_name]), onset_threshold, frame_threshold, minimum_note_length_ms)
+        if cache_key not in cache:
+            from pipeline import redecode_midi
+
+            out_name = (
+                f"{stem_name}_on{onset_threshold:.2f}_fr{frame_threshold:.2f}_min{minimum_note_length_ms:.0f}.mid"
+            )
+            try:
+                cache[cache_key] = redecode_midi(
+                    posteriorgrams[stem_name], run_dir / "redecode" / stem_name / out_name, params,
+                )
+            except ImportError:
+                st.error("Re-decoding needs the `basic_pitch` package in this environment.")
+                return
+        result = cache[cache_key]
+        st.caption(f"{result['note_count']} notes | decoded in {result['decode_ms']} ms")
+        midi_path = Path(result["midi_path"])
+        if midi_path.exists():
+            st.download_button(
+                "Download re-decoded MIDI",
+                data=midi_path.read_bytes(),
+                file_name=midi_path.name,
+                mime="audio/midi",
+                key=f"tl_redecode_download_{run_id}",
+            )
+        history = [
+            {
+                "Stem": Path(key[0]).parent.name,
+                "Onset": key[1],
+                "Frame": key[2],
+                "Min ms": key[3],
+                "Notes": row["note_count"],
+                "Decode ms": row["decode_ms"],
+            }
+            for key, row in cache.items()
+            if Path(key[0]).parents[2] == run_dir
+        ]
+        st.table(history)
+
+
 def _is_complete(row: dict) -> bool:
     return all(
         str(row.get(key, "")).strip()
@@ -186,6 +289,7 @@ def main() -> None:
     with left:
         pdf_path = Path(str(sample.get("pdf_path", "")))
         _embed_pdf(pdf_path)
+    _render_redecode_panel(sample)
 
     existing = ratings_map.get(current_sample_id, {})
 
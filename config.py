@@ -10,13 +10,87 @@ TEMP_DIR = PROJECT_ROOT / "temp"
 RUNS_DIR = TEMP_DIR / "runs"
 OUTPUT_DIR = PROJECT_ROOT / "outputs"
 DOWNLOADS_DIR = PROJECT_ROOT / "downloads"
+CACHE_DIR = TEMP_DIR / "cache"
 
 SUPPORTED_AUDIO_EXTENSIONS = {".wav", ".mp3", ".aac", ".m4a", ".flac"}
 
 YOUTUBE_DOMAINS = ("youtube.com", "www.youtube.com", "youtu.be", "m.youtube.com")
 
+# Input normalization target shared by every downstream stage.
+NORMALIZED_SAMPLE_RATE = 44100
+NORMALIZED_CHANNELS = 2
+# "stream" pipes ffmpeg PCM output to disk in fixed-size chunks (flat memory);
+# "pydub" decodes the whole song into an AudioSegment first (legacy path).
+AUDIO_NORMALIZE_MODE = "stream"
+AUDIO_NORMALIZE_CHUNK_BYTES = 1024 * 1024
+
+# Normalized input audio cache (keyed by source content hash or YouTube video ID).
+INPUT_CACHE_ENABLED = True
+INPUT_CACHE_DIR = CACHE_DIR / "inputs"
+INPUT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
 DEMUCS_MODEL = "htdemucs"
+# "cli" shells out to `demucs` per song; "inprocess" loads the model weights once
+# per server process and separates through the Demucs Python API (falls back to
+# "cli" when the demucs package is not importable from the app environment).
+DEMUCS_ENGINE = "cli"
+
+# Separation speed/quality trade-offs (maps to demucs --shifts/--overlap/--segment/-j).
+# segment=None keeps the model default; jobs="auto" matches the CPU core count.
+DEMUCS_PROFILES: dict[str, dict] = {
+    "Fast Preview": {"shifts": 0, "overlap": 0.1, "segment": 4, "jobs": "auto"},
+    "Balanced": {"shifts": 1, "overlap": 0.25, "segment": None, "jobs": "auto"},
+    "Quality": {"shifts": 3, "overlap": 0.5, "segment": None, "jobs": 1},
+}
+DEFAULT_DEMUCS_PROFILE = "Balanced"
+# Optional --two-stems target: separate one stem plus "no_<stem>" (faster to write/assign).
+DEMUCS_TWO_STEM_OPTIONS = ("vocals", "drums", "bass", "other")
+# Stem separation cache (keyed by normalized-audio hash, model, Demucs version).
+STEM_CACHE_ENABLED = True
+STEM_CACHE_DIR = CACHE_DIR / "stems"
+STEM_CACHE_MAX_BYTES = 8 * 1024 * 1024 * 1024
+
+# "cli" runs one `basic-pitch` subprocess per stem (model load each time); "inprocess"
+# loads the Basic Pitch model once per server process and transcribes every stem
+# through it (falls back to "cli" when basic_pitch is not importable from the app).
+TRANSCRIBE_ENGINE = "cli"
+# Basic Pitch note-decoding parameters (the basic-pitch CLI defaults), passed to both
+# engines and folded into the per-stem MIDI cache key.
+BASIC_PITCH_PARAMS: dict[str, float] = {
+    "onset_threshold": 0.5,
+    "frame_threshold": 0.3,
+    "minimum_note_length_ms": 127.7,
+}
+# Keep Basic Pitch's raw activations (note/onset/contour posteriorgrams) next to each
+# stem's MIDI as compressed float16 .npz so thresholds can be re-decoded without inference.
+TRANSCRIBE_SAVE_POSTERIORGRAMS = True
+# Per-stem MIDI cache (keyed by stem content hash, Basic Pitch version, BASIC_PITCH_PARAMS).
+MIDI_CACHE_ENABLED = True
+MIDI_CACHE_DIR = CACHE_DIR / "midi"
+MIDI_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# The CLI engine runs one `basic-pitch` subprocess per stem. "auto" runs up
+# to one per CPU core; the pool is further capped so that concurrent workers fit in
+# available memory at TRANSCRIBE_WORKER_MEMORY_MB each (set to 1 for serial runs).
+TRANSCRIBE_MAX_WORKERS = "auto"
+TRANSCRIBE_WORKER_MEMORY_MB = 1200
 MUSESCORE_CMD = "mscore"
+# "batch" renders the full score and every part PDF in one MuseScore process from a JSON
+# job file (`mscore -j`), paying MuseScore's startup once per export; files it fails to
+# produce are retried one at a time. "per_file" launches one MuseScore process per PDF.
+MUSESCORE_RENDER_MODE = "batch"
+# Per-file renders ("per_file" mode, and files a batch missed) run up to this many `mscore`
+# processes at once, the full score alongside the parts. "auto" runs up to one per CPU core,
+# capped by PDF count and available memory at MUSESCORE_WORKER_MEMORY_MB each (1 = serial).
+MUSESCORE_MAX_WORKERS = "auto"
+MUSESCORE_WORKER_MEMORY_MB = 400
+# Seconds one MuseScore conversion may run before it is killed (a batch job gets this per
+# file); a part that times out is reported as render_failed.
+MUSESCORE_TIMEOUT_S = 300
+# Rendered PDF cache (keyed by MusicXML content and MuseScore version; the encoding date and
+# generated part/instrument ids are ignored). Hits are hard-linked into outputs/<run_id>/.
+RENDER_CACHE_ENABLED = True
+RENDER_CACHE_DIR = CACHE_DIR / "renders"
+RENDER_CACHE_MAX_BYTES = 512 * 1024 * 1024
 
 REQUIRED_TOOLS = [
     {"name": "demucs", "cmd": "demucs", "args": ["--help"], "required": True},
@@ -75,6 +149,38 @@ SIMPLIFY_PROFILES: dict[str, dict] = {
 }
 
 DEFAULT_PROFILE = "Easy Intermediate"
+# "events" runs single-line cleanup (simplify/sanitize/tighten) on a NumPy note-event
+# array and builds music21 notes once; "music21" keeps the original object passes.
+SIMPLIFY_ENGINE = "events"
+# In-process parsed-MIDI cache shared by the fit check, score builds and Quick Reruns
+# (keyed by MIDI content hash; entries are frozen music21 scores plus note events,
+# bounded by total frozen size; every read returns an independent copy).
+PARSED_MIDI_CACHE_ENABLED = True
+PARSED_MIDI_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Per-part score build (cleanup, transposition, part MusicXML) can run on a process pool,
+# leaving the parent to pad/align and write the full score. 1 builds every part in-process;
+# "auto" (opt-in) uses up to one process per CPU core, capped by part count and available
+# memory at SCORE_BUILD_WORKER_MEMORY_MB each. Every build starts a fresh spawn pool, so it
+# only pays off with several cores and dense stems.
+SCORE_BUILD_MAX_WORKERS = 1
+SCORE_BUILD_WORKER_MEMORY_MB = 600
+# "direct" streams simplified single-line part exports straight to MusicXML text (falling
+# back to music21 for anything it does not cover); "music21" always uses music21's exporter.
+PART_EXPORT_WRITER = "direct"
+# "linear" bars every part of the full score on one shared barline grid in a single sweep
+# (notes crossing a barline are tied over); "music21" re-measures each part with music21's
+# makeMeasures and truncates at the barline. Meter changes always use "music21".
+SCORE_ALIGN_ENGINE = "linear"
+# In-process part-stage cache for Quick Reruns: each built part's cleaned concert part,
+# its written-part export score and part MusicXML, keyed by MIDI content hash, instrument,
+# part label and the simplification options. Reruns that only change title/composer/school
+# skip cleanup and transposition (and the part export too when title/composer are unchanged).
+PART_STAGE_CACHE_ENABLED = True
+PART_STAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Score build passes are always timed into the manifest (timings.score_build.passes/parts).
+# "cprofile" also dumps score_build.prof into the run directory (plus one .prof per pooled
+# part); "trace" writes score_build_trace.json (Chrome trace format) of every timed pass.
+SCORE_BUILD_PROFILE = ""
 TEACHER_VISIBLE_PROFILES = ("Beginner", "Easy Intermediate")
 
 SIMPLIFY_PRESET = SIMPLIFY_PROFILES[DEFAULT_PROFILE] | {"enabled": True}
@@ -2,33 +2,99 @@
 
 from __future__ import annotations
 
+import functools
 import glob
+import hashlib
+import importlib.util
+import os
+import re
 import shlex
 import subprocess
+import tempfile
+import threading
+import time
 import warnings
+import wave
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 from pydub import AudioSegment
 
 from config import (
+    AUDIO_NORMALIZE_CHUNK_BYTES,
+    AUDIO_NORMALIZE_MODE,
+    BASIC_PITCH_PARAMS,
+    DEFAULT_DEMUCS_PROFILE,
+    DEMUCS_ENGINE,
     DEMUCS_MODEL,
+    DEMUCS_PROFILES,
+    DEMUCS_TWO_STEM_OPTIONS,
     DOWNLOADS_DIR,
+    INPUT_CACHE_DIR,
+    INPUT_CACHE_ENABLED,
+    INPUT_CACHE_MAX_BYTES,
     INSTRUMENT_SPECS,
+    MIDI_CACHE_DIR,
+    MIDI_CACHE_ENABLED,
+    MIDI_CACHE_MAX_BYTES,
     MUSESCORE_CMD,
+    MUSESCORE_MAX_WORKERS,
+    MUSESCORE_RENDER_MODE,
+    MUSESCORE_TIMEOUT_S,
+    MUSESCORE_WORKER_MEMORY_MB,
+    NORMALIZED_CHANNELS,
+    NORMALIZED_SAMPLE_RATE,
     OUTPUT_DIR,
+    PARSED_MIDI_CACHE_ENABLED,
+    PARSED_MIDI_CACHE_MAX_BYTES,
+    PART_EXPORT_WRITER,
+    PART_STAGE_CACHE_ENABLED,
+    PART_STAGE_CACHE_MAX_BYTES,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_ENABLED,
+    RENDER_CACHE_MAX_BYTES,
+    SCORE_BUILD_MAX_WORKERS,
+    SCORE_ALIGN_ENGINE,
+    SCORE_BUILD_PROFILE,
+    SCORE_BUILD_WORKER_MEMORY_MB,
+    SIMPLIFY_ENGINE,
+    STEM_CACHE_DIR,
+    STEM_CACHE_ENABLED,
+    STEM_CACHE_MAX_BYTES,
     TEMP_DIR,
+    TRANSCRIBE_ENGINE,
+    TRANSCRIBE_MAX_WORKERS,
+    TRANSCRIBE_SAVE_POSTERIORGRAMS,
+    TRANSCRIBE_WORKER_MEMORY_MB,
     YOUTUBE_DOMAINS,
 )
 from utils import (
+    cached_tool_version,
     classify_audio_source,
+    commit_cache_entry,
     create_disclaimer_text,
+    evict_cache_lru,
+    extract_youtube_video_id,
+    hash_file_sha256,
+    hash_text_sha256,
+    link_or_copy_file,
+    lookup_cache_entry,
+    read_cache_entry_metadata,
+    record_cache_event,
     sanitize_filename,
     validate_single_video_youtube_url,
 )
 
 
-def _run(cmd: list[str]) -> None:
-    result = subprocess.run(cmd, capture_output=True, text=True)
+def _run(cmd: list[str], timeout: float | None = None) -> None:
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        rendered = " ".join(shlex.quote(part) for part in cmd)
+        raise RuntimeError(f"Command timed out after {timeout:g}s: {rendered}") from None
     if result.returncode != 0:
         rendered = " ".join(shlex.quote(part) for part in cmd)
         raise RuntimeError(
@@ -42,8 +108,127 @@ def _ensure_dirs() -> None:
     DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def download_or_convert_audio(source: str, run_dir: Path | None = None) -> str:
-    """Convert local audio file or YouTube URL into normalized wav."""
+def _ffmpeg_cmd() -> str:
+    """Return the ffmpeg executable pydub resolved (same binary preflight checks)."""
+    return str(getattr(AudioSegment, "converter", "") or "ffmpeg")
+
+
+def _pydub_normalize_to_wav(source_path: str, output_wav: Path) -> None:
+    """Decode the whole source in memory with pydub and export normalized wav."""
+    audio = AudioSegment.from_file(source_path)
+    audio = audio.set_channels(NORMALIZED_CHANNELS).set_frame_rate(NORMALIZED_SAMPLE_RATE)
+    audio.export(str(output_wav), format="wav")
+
+
+def _stream_normalize_to_wav(
+    source_path: str, output_wav: Path, chunk_bytes: int = AUDIO_NORMALIZE_CHUNK_BYTES,
+) -> None:
+    """Pipe source audio through ffmpeg into a 16-bit wav in fixed-size chunks.
+
+    Only one chunk of PCM is held in memory at a time, so peak memory stays flat
+    regardless of song length. The wav header is patched on close.
+    """
+    cmd = [
+        _ffmpeg_cmd(),
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        source_path,
+        "-vn",
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-ac",
+        str(NORMALIZED_CHANNELS),
+        "-ar",
+        str(NORMALIZED_SAMPLE_RATE),
+        "pipe:1",
+    ]
+    chunk_bytes = max(4096, int(chunk_bytes))
+    # stderr goes to a temp file so a chatty decoder can never block the stdout pipe.
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+        try:
+            with wave.open(str(output_wav), "wb") as handle:
+                handle.setnchannels(NORMALIZED_CHANNELS)
+                handle.setsampwidth(2)
+                handle.setframerate(NORMALIZED_SAMPLE_RATE)
+                while True:
+                    chunk = proc.stdout.read(chunk_bytes)
+                    if not chunk:
+                        break
+                    handle.writeframesraw(chunk)
+            returncode = proc.wait()
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            output_wav.unlink(missing_ok=True)
+            raise
+        finally:
+            if proc.stdout is not None:
+                proc.stdout.close()
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr_text = stderr_file.read().decode("utf-8", errors="replace").strip()
+            output_wav.unlink(missing_ok=True)
+            rendered = " ".join(shlex.quote(part) for part in cmd)
+            raise RuntimeError(f"Command failed ({returncode}): {rendered}\n{stderr_text}")
+
+
+def _normalize_audio_file(source_path: str, output_wav: Path, mode: str | None = None) -> None:
+    """Normalize any supported audio file to stereo 44.1 kHz wav using the chosen mode."""
+    selected = str(mode or AUDIO_NORMALIZE_MODE).strip().lower()
+    if selected == "pydub":
+        _pydub_normalize_to_wav(source_path, output_wav)
+    elif selected == "stream":
+        _stream_normalize_to_wav(source_path, output_wav)
+    else:
+        raise ValueError(f"Unknown audio normalize mode: {selected!r}")
+
+
+def _input_cache_key(kind: str, identity: str) -> str:
+    """Build a normalized-input cache key that also pins the normalization target."""
+    return hash_text_sha256(
+        f"input|{kind}:{identity}|wav|{NORMALIZED_SAMPLE_RATE}hz|{NORMALIZED_CHANNELS}ch"
+    )
+
+
+def _restore_cached_input(cache_key: str, output_wav: Path) -> bool:
+    if not INPUT_CACHE_ENABLED or not cache_key:
+        return False
+    entry = lookup_cache_entry(INPUT_CACHE_DIR, cache_key, [output_wav.name])
+    if entry is None:
+        return False
+    try:
+        link_or_copy_file(entry / output_wav.name, output_wav)
+    except OSError:
+        return False
+    return True
+
+
+def _store_cached_input(cache_key: str, output_wav: Path) -> None:
+    if not INPUT_CACHE_ENABLED or not cache_key:
+        return
+    try:
+        commit_cache_entry(INPUT_CACHE_DIR, cache_key, {output_wav.name: output_wav})
+        evict_cache_lru(INPUT_CACHE_DIR, INPUT_CACHE_MAX_BYTES, keep_keys=(cache_key,))
+    except OSError:
+        # Cache is an optimization only; never fail the run because of it.
+        pass
+
+
+def download_or_convert_audio(
+    source: str, run_dir: Path | None = None, cache_stats: dict | None = None,
+) -> str:
+    """Convert local audio file or YouTube URL into normalized wav.
+
+    Normalized audio is cached by source content hash (or YouTube video ID), so
+    repeat runs on the same song link the cached wav instead of re-decoding.
+    Hit/miss counts are recorded under `input_audio` in `cache_stats` if given.
+    """
     _ensure_dirs()
     workdir = run_dir or TEMP_DIR
     workdir.mkdir(parents=True, exist_ok=True)
@@ -55,6 +240,11 @@ def download_or_convert_audio(source: str, run_dir: Path | None = None) -> str:
         youtube_error = validate_single_video_youtube_url(source, YOUTUBE_DOMAINS)
         if youtube_error:
             raise ValueError(youtube_error)
+        video_id = extract_youtube_video_id(source)
+        cache_key = _input_cache_key("youtube", video_id) if video_id else ""
+        if _restore_cached_input(cache_key, output_wav):
+            record_cache_event(cache_stats, "input_audio", hit=True)
+            return str(output_wav)
         yt_template = str(workdir / "youtube_input.%(ext)s")
         _run(
             [
@@ -71,32 +261,248 @@ def download_or_convert_audio(source: str, run_dir: Path | None = None) -> str:
         yt_files = sorted(glob.glob(str(workdir / "youtube_input.*")))
         if not yt_files:
             raise RuntimeError("yt-dlp did not produce an audio file.")
-        audio = AudioSegment.from_file(yt_files[0])
+        source_audio = yt_files[0]
     else:
         if source_kind == "remote_url":
             raise ValueError("Only single-video YouTube URLs are supported for remote input.")
         input_path = Path(source)
         if not input_path.exists():
             raise FileNotFoundError(f"Audio source does not exist: {source}")
-        audio = AudioSegment.from_file(str(input_path))
-
-    audio = audio.set_channels(2).set_frame_rate(44100)
-    audio.export(str(output_wav), format="wav")
+        source_audio = str(input_path)
+        cache_key = (
+            _input_cache_key("sha256", hash_file_sha256(input_path)) if INPUT_CACHE_ENABLED else ""
+        )
+        if _restore_cached_input(cache_key, output_wav):
+            record_cache_event(cache_stats, "input_audio", hit=True)
+            return str(output_wav)
+
+    # A wav restored by an earlier call is a hard link into the cache; never write through it.
+    output_wav.unlink(missing_ok=True)
+    _normalize_audio_file(source_audio, output_wav)
+    _store_cached_input(cache_key, output_wav)
+    record_cache_event(cache_stats, "input_audio", hit=False)
     return str(output_wav)
 
 
-def separate_stems(wav_path: str, run_dir: Path | None = None) -> dict[str, str]:
-    """Run Demucs separation and return stem-name -> wav path."""
+def demucs_profile_settings(profile: str | None = None, two_stems: str = "") -> dict:
+    """Resolve a named separation profile into concrete Demucs settings."""
+    name = profile if profile in DEMUCS_PROFILES else DEFAULT_DEMUCS_PROFILE
+    raw = DEMUCS_PROFILES[name]
+    jobs = raw.get("jobs", 1)
+    if jobs == "auto":
+        jobs = max(1, os.cpu_count() or 1)
+    segment = raw.get("segment")
+    stem = str(two_stems or "").strip()
+    if stem and stem not in DEMUCS_TWO_STEM_OPTIONS:
+        raise ValueError(f"Unsupported two-stem target: {two_stems}")
+    return {
+        "profile": name,
+        "shifts": int(raw.get("shifts", 1)),
+        "overlap": float(raw.get("overlap", 0.25)),
+        "segment": int(segment) if segment else None,
+        "jobs": int(jobs),
+        "two_stems": stem,
+    }
+
+
+def _stem_cache_key(wav: Path, settings: dict) -> str:
+    """Key stems on normalized-audio content, Demucs model/version and output-shaping settings.
+
+    `jobs` only changes parallelism, not the result, so it is left out of the key.
+    """
+    shaping = (
+        f"shifts={settings['shifts']}|overlap={settings['overlap']}|"
+        f"segment={settings['segment']}|two_stems={settings['two_stems']}"
+    )
+    return hash_text_sha256(
+        f"stems|{hash_file_sha256(wav)}|{DEMUCS_MODEL}|{cached_tool_version('demucs')}|{shaping}"
+    )
+
+
+def _restore_cached_stems(cache_key: str, stem_root: Path) -> dict[str, str]:
+    """Link cached stems into the run's Demucs layout; returns {} on miss."""
+    if not STEM_CACHE_ENABLED or not cache_key:
+        return {}
+    entry = lookup_cache_entry(STEM_CACHE_DIR, cache_key, [])
+    if entry is None:
+        return {}
+    stem_names = [str(name) for name in read_cache_entry_metadata(entry).get("stems", [])]
+    if not stem_names or not all((entry / f"{name}.wav").is_file() for name in stem_names):
+        return {}
+    stems: dict[str, str] = {}
+    try:
+        for name in sorted(stem_names):
+            target = stem_root / f"{name}.wav"
+            link_or_copy_file(entry / f"{name}.wav", target)
+            stems[name] = str(target)
+    except OSError:
+        return {}
+    return stems
+
+
+def _store_cached_stems(cache_key: str, stems: dict[str, str], settings: dict) -> None:
+    if not STEM_CACHE_ENABLED or not cache_key:
+        return
+    try:
+        commit_cache_entry(
+            STEM_CACHE_DIR,
+            cache_key,
+            {f"{name}.wav": Path(path) for name, path in stems.items()},
+            metadata={
+                "stems": sorted(stems.keys()),
+                "demucs_model": DEMUCS_MODEL,
+                "demucs_version": cached_tool_version("demucs"),
+                "settings": settings,
+            },
+        )
+        evict_cache_lru(STEM_CACHE_DIR, STEM_CACHE_MAX_BYTES, keep_keys=(cache_key,))
+    except OSError:
+        pass
+
+
+# One shared model per server process; Streamlit sessions run in threads, so
+# separation through the warm model is serialized.
+_DEMUCS_ENGINE_LOCK = threading.Lock()
+
+
+def resolve_demucs_engine() -> str:
+    """Return the effective separation engine ("inprocess" or "cli")."""
+    if str(DEMUCS_ENGINE).strip().lower() == "inprocess" and importlib.util.find_spec("demucs"):
+        return "inprocess"
+    return "cli"
+
+
+@functools.lru_cache(maxsize=2)
+def _load_demucs_model(model_name: str):
+    """Load Demucs weights once per process and keep them warm for later songs."""
+    import torch
+    from demucs.pretrained import get_model
+
+    model = get_model(model_name)
+    model.eval()
+    model.to("cuda" if torch.cuda.is_available() else "cpu")
+    return model
+
+
+def _run_demucs_cli(wav: Path, demucs_out: Path, settings: dict | None = None) -> None:
+    settings = settings or demucs_profile_settings()
+    cmd = [
+        "demucs",
+        "-n",
+        DEMUCS_MODEL,
+        "--shifts",
+        str(settings["shifts"]),
+        "--overlap",
+        str(settings["overlap"]),
+        "-j",
+        str(settings["jobs"]),
+    ]
+    if settings.get("segment"):
+        cmd += ["--segment", str(settings["segment"])]
+    if settings.get("two_stems"):
+        cmd += ["--two-stems", str(settings["two_stems"])]
+    _run(cmd + ["-o", str(demucs_out), str(wav)])
+
+
+def _read_wav_tensor(wav: Path):
+    """Load a 16-bit PCM wav as a float32 (channels, frames) torch tensor."""
+    import numpy as np
+    import torch
+
+    with wave.open(str(wav), "rb") as handle:
+        channels = handle.getnchannels()
+        samplerate = handle.getframerate()
+        if handle.getsampwidth() != 2:
+            raise RuntimeError(f"Expected 16-bit PCM wav for separation: {wav}")
+        frames = handle.readframes(handle.getnframes())
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    return torch.from_numpy(samples.reshape(-1, channels).T.copy()), samplerate
+
+
+def _run_demucs_in_process(wav: Path, stem_root: Path, settings: dict | None = None) -> None:
+    """Separate through the Demucs Python API, writing the CLI's `<stem>.wav` layout.
+
+    Mirrors the CLI's normalize -> apply_model -> denormalize steps using calls
+    shared by Demucs 4.0 and 4.1 (`apply_model`, `convert_audio`, `save_audio`).
+    """
+    import torch
+    from demucs.apply import apply_model
+    from demucs.audio import convert_audio, save_audio
+
+    settings = settings or demucs_profile_settings()
+    model = _load_demucs_model(DEMUCS_MODEL)
+    two_stems = settings.get("two_stems", "")
+    if two_stems and two_stems not in model.sources:
+        raise RuntimeError(f"Stem `{two_stems}` is not provided by model {DEMUCS_MODEL}.")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    mix, samplerate = _read_wav_tensor(wav)
+    mix = convert_audio(mix, samplerate, model.samplerate, model.audio_channels)
+    with _DEMUCS_ENGINE_LOCK:
+        ref = mix.mean(0)
+        mean = ref.mean()
+        std = ref.std() + 1e-8
+        with torch.no_grad():
+            sources = apply_model(
+                model,
+                ((mix - mean) / std)[None],
+                device=device,
+                shifts=settings["shifts"],
+                split=True,
+                overlap=settings["overlap"],
+                segment=settings.get("segment"),
+                num_workers=settings["jobs"] if device == "cpu" else 0,
+                progress=False,
+            )[0]
+        sources = sources * std + mean
+    outputs = dict(zip(model.sources, sources))
+    if two_stems:
+        # Same convention as `demucs --two-stems`: the stem plus the sum of the rest.
+        kept = outputs[two_stems]
+        outputs = {two_stems: kept, f"no_{two_stems}": sources.sum(0) - kept}
+    stem_root.mkdir(parents=True, exist_ok=True)
+    for name, source in outputs.items():
+        save_audio(source, str(stem_root / f"{name}.wav"), samplerate=model.samplerate)
+
+
+def separate_stems(
+    wav_path: str,
+    run_dir: Path | None = None,
+    cache_stats: dict | None = None,
+    profile: str | None = None,
+    two_stems: str = "",
+) -> dict[str, str]:
+    """Run Demucs separation and return stem-name -> wav path.
+
+    `profile` selects a `DEMUCS_PROFILES` entry; `two_stems` (e.g. "vocals")
+    produces only that stem plus `no_<stem>`. Results are cached by
+    (normalized-audio hash, model, Demucs version, output-shaping settings); a
+    hit links the cached stems into `demucs/<model>/<wav stem>/` and skips
+    Demucs. Hit/miss counts are recorded under `stems` in `cache_stats` if given.
+    """
     _ensure_dirs()
     workdir = run_dir or TEMP_DIR
     wav = Path(wav_path)
     if not wav.exists():
         raise FileNotFoundError(f"Input wav missing: {wav_path}")
 
+    settings = demucs_profile_settings(profile, two_stems)
     demucs_out = workdir / "demucs"
-    _run(["demucs", "-n", DEMUCS_MODEL, "-o", str(demucs_out), str(wav)])
-
     stem_root = demucs_out / DEMUCS_MODEL / wav.stem
+    if stem_root.exists():
+        # Drop stems from an earlier separation of this run (e.g. a different two-stem target).
+        for stale in stem_root.glob("*.wav"):
+            stale.unlink(missing_ok=True)
+    cache_key = _stem_cache_key(wav, settings) if STEM_CACHE_ENABLED else ""
+    cached_stems = _restore_cached_stems(cache_key, stem_root)
+    if cached_stems:
+        record_cache_event(cache_stats, "stems", hit=True)
+        return cached_stems
+
+    if resolve_demucs_engine() == "inprocess":
+        _run_demucs_in_process(wav, stem_root, settings)
+    else:
+        _run_demucs_cli(wav, demucs_out, settings)
+
     if not stem_root.exists():
         raise RuntimeError(f"Demucs output folder missing: {stem_root}")
 
@@ -105,25 +511,333 @@ def separate_stems(wav_path: str, run_dir: Path | None = None) -> dict[str, str]
         stems[stem_file.stem] = str(stem_file)
     if not stems:
         raise RuntimeError("No stems were generated by Demucs.")
+    _store_cached_stems(cache_key, stems, settings)
+    record_cache_event(cache_stats, "stems", hit=False)
     return stems
 
 
-def transcribe_to_midi(stems: dict[str, str], run_dir: Path | None = None) -> dict[str, str]:
-    """Run basic-pitch CLI on each stem file and return stem-name -> midi path."""
+def _available_memory_mb() -> float | None:
+    """Best-effort available system memory in MB (None when it cannot be read)."""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def transcription_worker_count(stem_count: int, max_workers: int | str | None = None) -> int:
+    """Number of concurrent basic-pitch workers for `stem_count` stems.
+
+    Bounded by the configured/requested worker count (`"auto"` = CPU cores), the
+    number of stems, and how many `TRANSCRIBE_WORKER_MEMORY_MB` workers fit in
+    currently available memory. Always at least 1.
+    """
+    requested = TRANSCRIBE_MAX_WORKERS if max_workers is None else max_workers
+    if requested == "auto":
+        workers = os.cpu_count() or 1
+    else:
+        workers = int(requested)
+    workers = min(max(1, workers), max(1, stem_count))
+    available_mb = _available_memory_mb()
+    if available_mb is not None and TRANSCRIBE_WORKER_MEMORY_MB > 0:
+        workers = min(workers, max(1, int(available_mb // TRANSCRIBE_WORKER_MEMORY_MB)))
+    return workers
+
+
+def _stem_midi_path(stem_name: str, stem_path: str, midi_root: Path) -> Path:
+    """Output path basic-pitch uses for a stem: `midi/<stem>/<wav stem>_basic_pitch.mid`."""
+    return midi_root / sanitize_filename(stem_name) / f"{Path(stem_path).stem}_basic_pitch.mid"
+
+
+def _stem_posteriorgram_path(stem_name: str, stem_path: str, midi_root: Path) -> Path:
+    return midi_root / sanitize_filename(stem_name) / f"{Path(stem_path).stem}_posteriorgram.npz"
+
+
+_POSTERIORGRAM_KEYS = ("note", "onset", "contour")
+
+
+def _save_posteriorgram(model_output: dict, path: Path) -> None:
+    """Write Basic Pitch model output as compressed float16 arrays (plenty for thresholding)."""
+    import numpy as np
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {key: np.asarray(model_output[key], dtype=np.float16) for key in _POSTERIORGRAM_KEYS}
+    tmp_path = path.with_name(f".{path.stem}.tmp.npz")
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_posteriorgram(path: str | Path) -> dict:
+    """Load a saved posteriorgram as float32 arrays keyed note/onset/contour."""
+    import numpy as np
+
+    with np.load(str(path)) as data:
+        return {key: data[key].astype(np.float32) for key in _POSTERIORGRAM_KEYS}
+
+
+def _decode_model_output(model_output: dict, params: dict | None = None):
+    """Turn Basic Pitch activations into (PrettyMIDI, note events) with the given thresholds."""
+    from basic_pitch import note_creation
+    from basic_pitch.constants import AUDIO_SAMPLE_RATE, FFT_HOP
+
+    params = BASIC_PITCH_PARAMS | (params or {})
+    # Same ms -> frame conversion basic-pitch's predict() applies.
+    min_note_len = int(round(params["minimum_note_length_ms"] / 1000 * (AUDIO_SAMPLE_RATE / FFT_HOP)))
+    return note_creation.model_output_to_notes(
+        model_output,
+        onset_thresh=params["onset_threshold"],
+        frame_thresh=params["frame_threshold"],
+        min_note_len=min_note_len,
+    )
+
+
+def redecode_midi(posteriorgram_path: str | Path, output_midi: str | Path, params: dict | None = None) -> dict:
+    """Rebuild a stem's MIDI from saved activations with new thresholds (no model inference).
+
+    `params` overrides any of `BASIC_PITCH_PARAMS`. Returns the written path, the
+    note count, and decode time in milliseconds.
+    """
+    started = time.perf_counter()
+    midi_data, note_events = _decode_model_output(load_posteriorgram(posteriorgram_path), params)
+    output_midi = Path(output_midi)
+    output_midi.parent.mkdir(parents=True, exist_ok=True)
+    output_midi.unlink(missing_ok=True)  # may be a hard link into the MIDI cache
+    midi_data.write(str(output_midi))
+    return {
+        "midi_path": str(output_midi),
+        "note_count": len(note_events),
+        "decode_ms": round((time.perf_counter() - started) * 1000.0, 1),
+    }
+
+
+def _convert_cli_model_output(stem_dir: Path, posteriorgram_path: Path) -> None:
+    """Re-save `basic-pitch --save-model-outputs` (pickled dict .npz) in the compact posteriorgram format."""
+    import numpy as np
+
+    for raw_path in sorted(stem_dir.glob("*_basic_pitch_model_output.npz")):
+        try:
+            with np.load(str(raw_path), allow_pickle=True) as data:
+                model_output = data["basic_pitch_model_output"].item()
+            _save_posteriorgram(model_output, posteriorgram_path)
+        except (OSError, KeyError, ValueError):
+            pass
+        finally:
+            raw_path.unlink(missing_ok=True)
+
+
+def _midi_cache_key(stem_path: str) -> str:
+    """Key one stem's MIDI on stem content, Basic Pitch version and decoding params."""
+    params = "|".join(f"{name}={BASIC_PITCH_PARAMS[name]}" for name in sorted(BASIC_PITCH_PARAMS))
+    return hash_text_sha256(
+        f"midi|{hash_file_sha256(stem_path)}|{cached_tool_version('basic-pitch')}|{params}"
+    )
+
+
+def _restore_cached_midi(cache_key: str, midi_path: Path, posteriorgram_path: Path) -> bool:
+    """Link a cached stem transcription (and its posteriorgram, if cached) into place."""
+    if not MIDI_CACHE_ENABLED or not cache_key:
+        return False
+    entry = lookup_cache_entry(MIDI_CACHE_DIR, cache_key, ["transcription.mid"])
+    if entry is None:
+        return False
+    try:
+        link_or_copy_file(entry / "transcription.mid", midi_path)
+        if (entry / "posteriorgram.npz").is_file():
+            link_or_copy_file(entry / "posteriorgram.npz", posteriorgram_path)
+    except OSError:
+        return False
+    return True
+
+
+def _store_cached_midi(cache_key: str, midi_path: str, posteriorgram_path: Path) -> None:
+    if not MIDI_CACHE_ENABLED or not cache_key:
+        return
+    files = {"transcription.mid": Path(midi_path)}
+    if posteriorgram_path.is_file():
+        files["posteriorgram.npz"] = posteriorgram_path
+    try:
+        commit_cache_entry(
+            MIDI_CACHE_DIR,
+            cache_key,
+            files,
+            metadata={
+                "basic_pitch_version": cached_tool_version("basic-pitch"),
+                "params": dict(BASIC_PITCH_PARAMS),
+            },
+        )
+        evict_cache_lru(MIDI_CACHE_DIR, MIDI_CACHE_MAX_BYTES, keep_keys=(cache_key,))
+    except OSError:
+        pass
+
+
+def _transcribe_stem(stem_name: str, stem_path: str, midi_root: Path) -> tuple[str, float]:
+    """Run basic-pitch for one stem; return (midi path, wall seconds)."""
+    started = time.perf_counter()
+    stem_dir = midi_root / sanitize_filename(stem_name)
+    stem_dir.mkdir(parents=True, exist_ok=True)
+    # basic-pitch will not overwrite, and a leftover file would shadow the new output.
+    for pattern in ("*.mid", "*.midi", "*.npz"):
+        for stale in stem_dir.glob(pattern):
+            stale.unlink(missing_ok=True)
+    save_flags = ["--save-model-outputs"] if TRANSCRIBE_SAVE_POSTERIORGRAMS else []
+    _run(
+        [
+            "basic-pitch",
+            *save_flags,
+            "--onset-threshold",
+            str(BASIC_PITCH_PARAMS["onset_threshold"]),
+            "--frame-threshold",
+            str(BASIC_PITCH_PARAMS["frame_threshold"]),
+            "--minimum-note-length",
+            str(BASIC_PITCH_PARAMS["minimum_note_length_ms"]),
+            str(stem_dir),
+            str(stem_path),
+        ]
+    )
+    midi_candidates = sorted(stem_dir.glob("*.mid")) + sorted(stem_dir.glob("*.midi"))
+    if not midi_candidates:
+        raise RuntimeError(f"No MIDI produced for stem: {stem_name}")
+    if TRANSCRIBE_SAVE_POSTERIORGRAMS:
+        _convert_cli_model_output(stem_dir, _stem_posteriorgram_path(stem_name, stem_path, midi_root))
+    return str(midi_candidates[0]), round(time.perf_counter() - started, 3)
+
+
+# One warm Basic Pitch model per process; inference calls through it are serialized.
+_BASIC_PITCH_ENGINE_LOCK = threading.Lock()
+
+
+def resolve_transcribe_engine() -> str:
+    """Return the effective transcription engine ("inprocess" or "cli")."""
+    if str(TRANSCRIBE_ENGINE).strip().lower() == "inprocess" and importlib.util.find_spec("basic_pitch"):
+        return "inprocess"
+    return "cli"
+
+
+@functools.lru_cache(maxsize=1)
+def _load_basic_pitch_model():
+    """Load the Basic Pitch ICASSP 2022 model once per process."""
+    from basic_pitch import ICASSP_2022_MODEL_PATH
+    from basic_pitch.inference import Model
+
+    return Model(ICASSP_2022_MODEL_PATH)
+
+
+def _transcribe_stem_in_process(stem_name: str, stem_path: str, midi_root: Path) -> tuple[str, float]:
+    """Transcribe one stem with the warm model, writing the CLI's `<wav stem>_basic_pitch.mid`.
+
+    Equivalent to basic-pitch's predict(): inference, then note decoding with
+    `BASIC_PITCH_PARAMS` (the same decode `redecode_midi` uses).
+    """
+    from basic_pitch.inference import run_inference
+
+    started = time.perf_counter()
+    midi_path = _stem_midi_path(stem_name, stem_path, midi_root)
+    midi_path.parent.mkdir(parents=True, exist_ok=True)
+    model = _load_basic_pitch_model()
+    with _BASIC_PITCH_ENGINE_LOCK:
+        model_output = run_inference(str(stem_path), model)
+    if TRANSCRIBE_SAVE_POSTERIORGRAMS:
+        _save_posteriorgram(model_output, _stem_posteriorgram_path(stem_name, stem_path, midi_root))
+    midi_data, _ = _decode_model_output(model_output)
+    midi_data.write(str(midi_path))
+    return str(midi_path), round(time.perf_counter() - started, 3)
+
+
+def transcribe_to_midi(
+    stems: dict[str, str],
+    run_dir: Path | None = None,
+    cache_stats: dict | None = None,
+    timings: dict | None = None,
+    max_workers: int | str | None = None,
+) -> dict[str, str]:
+    """Run Basic Pitch on each stem file and return stem-name -> midi path.
+
+    Each stem's MIDI is cached by (stem content hash, Basic Pitch version,
+    `BASIC_PITCH_PARAMS`); cached stems are linked into place and only the
+    remaining stems are transcribed. With the "cli" engine those run concurrently
+    in a bounded pool of basic-pitch processes (see `transcription_worker_count`);
+    the "inprocess" engine runs them through one warm model instead. Both write
+    `midi/<stem>/<wav stem>_basic_pitch.mid` plus, when
+    `TRANSCRIBE_SAVE_POSTERIORGRAMS` is on, `<wav stem>_posteriorgram.npz` for
+    `redecode_midi`. Results keep the input stem order. If any
+    stem fails, every stem still runs to completion and a single RuntimeError lists
+    the failures in stem order. Per-stem hit/miss counts go under `midi` in
+    `cache_stats`, and wall times under `transcription` in `timings`, if given.
+    """
     _ensure_dirs()
     workdir = run_dir or TEMP_DIR
     midi_root = workdir / "midi"
     midi_root.mkdir(parents=True, exist_ok=True)
 
-    outputs: dict[str, str] = {}
+    started = time.perf_counter()
+    cached: dict[str, str] = {}
+    cache_keys: dict[str, str] = {}
+    pending: dict[str, str] = {}
     for stem_name, stem_path in stems.items():
-        stem_dir = midi_root / sanitize_filename(stem_name)
-        stem_dir.mkdir(parents=True, exist_ok=True)
-        _run(["basic-pitch", str(stem_dir), str(stem_path)])
-        midi_candidates = sorted(stem_dir.glob("*.mid")) + sorted(stem_dir.glob("*.midi"))
-        if not midi_candidates:
-            raise RuntimeError(f"No MIDI produced for stem: {stem_name}")
-        outputs[stem_name] = str(midi_candidates[0])
+        try:
+            cache_keys[stem_name] = _midi_cache_key(stem_path) if MIDI_CACHE_ENABLED else ""
+        except OSError:
+            cache_keys[stem_name] = ""  # unreadable stem; let the engine report it
+        midi_path = _stem_midi_path(stem_name, stem_path, midi_root)
+        midi_path.parent.mkdir(parents=True, exist_ok=True)
+        posteriorgram_path = _stem_posteriorgram_path(stem_name, stem_path, midi_root)
+        posteriorgram_path.unlink(missing_ok=True)  # never pair new MIDI with stale activations
+        # A MIDI restored by an earlier run may be a hard link into the cache; never write through it.
+        midi_path.unlink(missing_ok=True)
+        if _restore_cached_midi(cache_keys[stem_name], midi_path, posteriorgram_path):
+            cached[stem_name] = str(midi_path)
+        else:
+            pending[stem_name] = stem_path
+        if cache_keys[stem_name]:
+            record_cache_event(cache_stats, "midi", hit=stem_name in cached)
+
+    engine = resolve_transcribe_engine()
+    if engine == "inprocess":
+        runner, workers = _transcribe_stem_in_process, 1
+    else:
+        runner, workers = _transcribe_stem, transcription_worker_count(len(pending), max_workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="basic-pitch") as pool:
+        futures = {
+            stem_name: pool.submit(runner, stem_name, stem_path, midi_root)
+            for stem_name, stem_path in pending.items()
+        }
+
+    outputs: dict[str, str] = {}
+    stem_seconds: dict[str, float] = {}
+    failures: list[str] = []
+    for stem_name in stems:
+        if stem_name in cached:
+            outputs[stem_name] = cached[stem_name]
+            continue
+        try:
+            outputs[stem_name], stem_seconds[stem_name] = futures[stem_name].result()
+        except Exception as exc:
+            failures.append(f"{stem_name}: {exc}")
+            continue
+        _store_cached_midi(
+            cache_keys[stem_name],
+            outputs[stem_name],
+            _stem_posteriorgram_path(stem_name, stems[stem_name], midi_root),
+        )
+    if timings is not None:
+        timings["transcription"] = {
+            "engine": engine,
+            "workers": workers,
+            "total_s": round(time.perf_counter() - started, 3),
+            "stems_s": stem_seconds,
+            "cached_stems": sorted(cached),
+        }
+    if failures:
+        raise RuntimeError(
+            f"Transcription failed for {len(failures)} of {len(stems)} stem(s):\n"
+            + "\n".join(failures)
+        )
     return outputs
 
 
@@ -152,11 +866,22 @@ def _suppress_known_music21_warnings() -> None:
     )
 
 
-def _simplify_part(part_stream, options: dict) -> None:
+def _simplify_part(part_stream, options: dict, engine: str | None = None) -> None:
+    """Quantize to the profile grid, then drop short notes and thin dense beats (in place).
+
+    The "events" engine snaps every container with array math and removes pruned
+    notes in one batch per container; "music21" runs `Stream.quantize` and removes
+    notes one at a time. Both produce the same stream.
+    """
     divisor = _grid_to_divisor(options.get("quantize_grid", "1/8"))
     min_duration = float(options.get("min_note_duration_beats", 0.25))
     density_threshold = int(options.get("density_threshold", 6))
 
+    if (engine or SIMPLIFY_ENGINE) == "events":
+        _quantize_part_in_place(part_stream, divisor)
+        _prune_part_notes(part_stream, min_duration, density_threshold)
+        return
+
     part_stream.quantize(
         quarterLengthDivisors=(divisor,),
         processOffsets=True,
@@ -182,6 +907,113 @@ def _simplify_part(part_stream, options: dict) -> None:
                     element.activeSite.remove(element)
 
 
+def _quantize_part_in_place(part_stream, divisor: int) -> None:
+    """Single-divisor equivalent of `Stream.quantize(recurse=True, inPlace=True)`.
+
+    Offsets are snapped relative to each container (measures and voices included);
+    note/chord durations never snap to zero, and rests that do are removed. Every
+    element of every container is snapped in one array pass.
+    """
+    from music21 import note
+
+    unit = 1.0 / divisor
+    containers = list(part_stream.recurse(streamsOnly=True, includeSelf=True))
+    owners: list[int] = []
+    elements = []
+    offsets: list[float] = []
+    durations: list[float] = []
+    needs_length: list[bool] = []
+    for container_index, container in enumerate(containers):
+        for element in container.elements:
+            offset = container.elementOffset(element, returnSpecial=True)
+            if isinstance(offset, str):
+                continue  # end-of-stream elements (right barlines) have no offset of their own
+            owners.append(container_index)
+            elements.append(element)
+            offsets.append(float(offset))
+            if getattr(element, "isStream", False):
+                durations.append(-1.0)  # a stream's duration follows its contents
+                needs_length.append(False)
+            else:
+                durations.append(float(element.duration.quarterLength))
+                needs_length.append(isinstance(element, note.NotRest) and not element.duration.isGrace)
+    if not elements:
+        return
+
+    offsets_array = np.array(offsets)
+    snapped_offsets = np.sign(offsets_array) * _nearest_grid_multiple(np.abs(offsets_array), unit)
+    durations_array = np.array(durations)
+    snapped_durations = np.where(
+        np.array(needs_length, dtype=bool),
+        _nearest_grid_multiple(durations_array, unit, zero_allowed=False),
+        _nearest_grid_multiple(durations_array, unit),
+    )
+
+    rests_lacking_durations: dict[int, list] = {}
+    for owner, element, offset, original, quarter_length in zip(
+        owners, elements, snapped_offsets.tolist(), durations, snapped_durations.tolist()
+    ):
+        containers[owner].coreSetElementOffset(element, offset)
+        if original < 0.0:
+            continue
+        if quarter_length == 0.0 and isinstance(element, note.Rest):
+            rests_lacking_durations.setdefault(owner, []).append(element)
+        elif quarter_length != original:
+            element.duration.quarterLength = quarter_length
+    for owner, container in enumerate(containers):
+        container.coreElementsChanged(updateIsFlat=False)
+        if owner in rests_lacking_durations:
+            container.remove(rests_lacking_durations[owner])
+
+
+def _container_offsets(part_stream) -> dict[int, float]:
+    """Offset from part start of every stream inside `part_stream` (and itself), by id()."""
+    # Containers come out of recurse() after their parent, so offsets accumulate in one walk.
+    offsets: dict[int, float] = {id(part_stream): 0.0}
+    for container in part_stream.recurse(streamsOnly=True, includeSelf=False):
+        parent = container.activeSite
+        offsets[id(container)] = offsets.get(id(parent), 0.0) + float(parent.elementOffset(container))
+    return offsets
+
+
+def _prune_part_notes(part_stream, min_duration: float, density_threshold: int) -> None:
+    """Drop notes shorter than `min_duration` and notes past `density_threshold` per beat.
+
+    Notes are ranked in stream order within each whole-beat bucket, and removals
+    are applied once per container.
+    """
+    site_offsets = _container_offsets(part_stream)
+    notes = []
+    onsets = []
+    durations = []
+    for element in part_stream.recurse().notes:
+        notes.append(element)
+        onsets.append(site_offsets[id(element.activeSite)] + float(element.offset))
+        durations.append(float(element.duration.quarterLength))
+    if not notes:
+        return
+
+    keep = np.array(durations) >= min_duration
+    candidates = np.flatnonzero(keep)
+    buckets = np.trunc(np.array(onsets)[candidates]).astype(np.int64)
+    by_bucket = np.argsort(buckets, kind="stable")
+    sorted_buckets = buckets[by_bucket]
+    group_start = np.r_[0, np.flatnonzero(sorted_buckets[1:] != sorted_buckets[:-1]) + 1]
+    rank = np.arange(len(sorted_buckets)) - np.repeat(
+        group_start, np.diff(np.r_[group_start, len(sorted_buckets)])
+    )
+    keep[candidates[by_bucket[rank >= density_threshold]]] = False
+
+    doomed_by_site: dict[int, tuple] = {}
+    for index in np.flatnonzero(~keep).tolist():
+        element = notes[index]
+        site = element.activeSite
+        if site is not None:
+            doomed_by_site.setdefault(id(site), (site, []))[1].append(element)
+    for site, doomed in doomed_by_site.values():
+        site.remove(doomed)
+
+
 def _is_beginner_profile(options: dict) -> bool:
     profile = str(options.get("profile", "")).strip()
     return profile in {"Beginner", "Aggressive"}
@@ -232,7 +1064,11 @@ def _nearest_scale_midi(target_midi: int, allowed_pitch_classes: set[int]) -> in
     return min(candidates, key=lambda value: abs(value - target_midi))
 
 
-def _playability_metrics(part_stream) -> dict[str, float]:
+def _playability_metrics(part_stream, engine: str | None = None) -> dict[str, float]:
+    if (engine or SIMPLIFY_ENGINE) == "events":
+        events = note_events_from_part(part_stream)
+        if events is not None:
+            return _note_event_metrics(events)
     note_elements = list(_iter_melodic_notes(part_stream))
     midi_line = [value for value in (_primary_pitch_midi(n) for n in note_elements) if value is not None]
     note_count = len(note_elements)
@@ -268,13 +1104,116 @@ def _playability_metrics(part_stream) -> dict[str, float]:
     }
 
 
-def _apply_beginner_melody_filter(part_stream) -> dict[str, float]:
+# --- Key detection ---
+# Same answer as music21's `analyze("key")` (Aarden-Essen weighted Krumhansl-Schmuckler),
+# computed from one duration-weighted pitch-class histogram without building the 23
+# alternate-interpretation Key objects music21 attaches to every result.
+_KEY_PROFILES = {
+    "major": (
+        17.7661, 0.145624, 14.9265, 0.160186, 19.8049, 11.3587,
+        0.291248, 22.062, 0.145624, 8.15494, 0.232998, 4.95122,
+    ),
+    "minor": (
+        18.2648, 0.737619, 14.0499, 16.8599, 0.702494, 14.4362,
+        0.702494, 18.6161, 4.56621, 1.93186, 7.37619, 1.75623,
+    ),
+}
+# Tonic spellings after music21's keysValidMajor/keysValidMinor enharmonic flip.
+_KEY_TONIC_NAMES = {
+    "major": ("C", "C#", "D", "E-", "E", "F", "F#", "G", "A-", "A", "B-", "B"),
+    "minor": ("C", "C#", "D", "E-", "E", "F", "F#", "G", "G#", "A", "B-", "B"),
+}
+# Shifted estimates are reused only when the best key beats the runner-up by more
+# than float noise; near-ties are re-detected so tie-breaking matches music21.
+_KEY_SHIFT_MIN_MARGIN = 1e-9
+
+
+def _pitch_class_histogram(part_stream) -> np.ndarray | None:
+    """Quarter-length total per pitch class over every pitched note/chord member."""
+    from music21 import note
+
+    pitch_classes: list[int] = []
+    weights: list[float] = []
+    element_count = 0
+    for element in part_stream.recurse().notes:
+        if isinstance(element, note.Unpitched):
+            continue
+        element_count += 1
+        length = float(element.quarterLength)
+        for pitch_obj in element.pitches:
+            pitch_classes.append(pitch_obj.pitchClass)
+            weights.append(length)
+    if element_count == 0:
+        return None
+    return np.bincount(np.asarray(pitch_classes, dtype=np.int64), weights=weights, minlength=12)[:12]
+
+
+@functools.lru_cache(maxsize=256)
+def _key_estimate_for_histogram(histogram: tuple[float, ...]) -> tuple[int, str, float, float]:
+    """(tonic pitch class, mode, correlation, margin over the runner-up) for a histogram.
+
+    Correlations accumulate in music21's order (per key, over pitch classes 0..11) so
+    equal-weight profile entries tie exactly as they do there; ties go to the higher
+    pitch class, then minor.
+    """
+    hist = np.asarray(histogram, dtype=np.float64)
+    histogram_average = sum(histogram) / 12
+    rotation = (np.arange(12)[None, :] - np.arange(12)[:, None]) % 12
+    candidates: list[tuple[float, int, str]] = []
+    for mode, profile in _KEY_PROFILES.items():
+        weights = np.asarray(profile, dtype=np.float64)[rotation]
+        profile_average = sum(profile) / 12
+        top = np.zeros(12)
+        bottom_right = np.zeros(12)
+        bottom_left = np.zeros(12)
+        for column in range(12):
+            deviation = weights[:, column] - profile_average
+            top += deviation * (hist[column] - histogram_average)
+            bottom_right += deviation ** 2
+            bottom_left += (hist[column] - histogram_average) ** 2
+        for tonic in range(12):
+            if bottom_right[tonic] == 0 or bottom_left[tonic] == 0:
+                correlation = 0.0
+            else:
+                correlation = float(top[tonic]) / (float(bottom_right[tonic]) * float(bottom_left[tonic])) ** 0.5
+            candidates.append((correlation, tonic, mode))
+    candidates.sort(reverse=True)
+    best, runner_up = candidates[0], candidates[1]
+    return best[1], best[2], best[0], best[0] - runner_up[0]
+
+
+def _estimate_key(part_stream) -> tuple[int, str, float, float] | None:
+    """Key estimate for a part (see `_key_estimate_for_histogram`), or None without notes."""
+    histogram = _pitch_class_histogram(part_stream)
+    if histogram is None:
+        return None
+    return _key_estimate_for_histogram(tuple(float(value) for value in histogram))
+
+
+def _transpose_key_estimate(estimate, semitones: int):
+    """Shift a key estimate to a copy transposed by `semitones`; None when it is a near-tie."""
+    if estimate is None or estimate[3] <= _KEY_SHIFT_MIN_MARGIN:
+        return None
+    tonic, mode, correlation, margin = estimate
+    return (tonic + int(semitones)) % 12, mode, correlation, margin
+
+
+def _key_from_estimate(estimate):
+    from music21 import key
+
+    tonic, mode, correlation, _ = estimate
+    detected = key.Key(_KEY_TONIC_NAMES[mode][tonic], mode)
+    detected.correlationCoefficient = correlation
+    return detected
+
+
+def _apply_beginner_melody_filter(part_stream, engine: str | None = None) -> dict[str, float]:
     """Apply additional melody-aware cleanup for beginner readability."""
     from music21 import key
 
     notes = list(_iter_melodic_notes(part_stream))
     if not notes:
-        return _playability_metrics(part_stream)
+        return _playability_metrics(part_stream, engine)
 
     # Remove very short ornament-like events.
     for element in list(notes):
@@ -283,13 +1222,11 @@ def _apply_beginner_melody_filter(part_stream) -> dict[str, float]:
 
     notes = list(_iter_melodic_notes(part_stream))
     if not notes:
-        return _playability_metrics(part_stream)
+        return _playability_metrics(part_stream, engine)
 
     # Favor diatonic pitches of the local key to reduce accidental noise.
-    try:
-        analyzed_key = part_stream.analyze("key")
-    except Exception:
-        analyzed_key = key.Key("C")
+    estimate = _estimate_key(part_stream)
+    analyzed_key = _key_from_estimate(estimate) if estimate is not None else key.Key("C")
     allowed_pitch_classes = set(int(p.pitchClass) for p in analyzed_key.getScale().pitches)
     for element in notes:
         base = _primary_pitch_midi(element)
@@ -313,7 +1250,7 @@ def _apply_beginner_melody_filter(part_stream) -> dict[str, float]:
             _set_element_to_midi(element, current_midi)
         previous_midi = current_midi
 
-    return _playability_metrics(part_stream)
+    return _playability_metrics(part_stream, engine)
 
 
 def _woodwind_range_midi(instrument_name: str) -> tuple[int, int]:
@@ -617,8 +1554,6 @@ def _sanitize_percussion_part(part_stream, options: dict) -> None:
 
 def _tighten_monophonic_timeline(part_stream, grid: str) -> None:
     """Rebuild note timeline on a strict grid to eliminate overlap drift."""
-    import copy
-
     from music21 import chord, note, pitch, stream
 
     grid_step = {"1/4": 1.0, "1/8": 0.5, "1/16": 0.25}.get(str(grid), 0.5)
@@ -658,17 +1593,17 @@ def _tighten_monophonic_timeline(part_stream, grid: str) -> None:
             continue
         normalized.append((offset, duration, midi_value))
 
-    replacement = stream.Part()
+    replacement: list[tuple[float, object]] = []
     for offset, duration, midi_value in normalized:
         if midi_value is None:
-            replacement.insert(offset, note.Rest(quarterLength=duration))
+            replacement.append((offset, note.Rest(quarterLength=duration)))
             continue
         p = pitch.Pitch()
         p.midi = midi_value
         n = note.Note()
         n.pitch = p
         n.quarterLength = duration
-        replacement.insert(offset, n)
+        replacement.append((offset, n))
 
     for element in list(part_stream.notesAndRests):
         try:
@@ -680,54 +1615,590 @@ def _tighten_monophonic_timeline(part_stream, grid: str) -> None:
             part_stream.remove(element)
         except Exception:
             pass
-    for element in list(replacement.notesAndRests):
-        try:
-            offset = float(element.getOffsetInHierarchy(replacement))
-        except Exception:
-            offset = 0.0
-        part_stream.insert(offset, copy.deepcopy(element))
+    for offset, element in replacement:
+        part_stream.insert(offset, element)
+
+
+# --- Note-event IR for single-line cleanup ---
+# One row per sounding pitch; chord members share `element`. Loaded once from the
+# parsed MIDI so simplify/sanitize/tighten run on arrays instead of music21 objects.
+NOTE_EVENT_DTYPE = np.dtype(
+    [
+        ("onset", "f8"),  # quarter lengths from part start
+        ("duration", "f8"),  # quarter lengths
+        ("pitch", "i2"),  # MIDI number
+        ("velocity", "i2"),  # 0 when the MIDI note carried none
+        ("voice", "i2"),  # voice index within its measure (0 outside voices)
+        ("element", "i4"),  # source note/chord index in recurse() order
+        ("chord", "?"),  # row belongs to a chord
+        ("accidental", "?"),  # pitch spelled with an accidental
+        ("site", "i4"),  # containing stream, numbered in recurse() walk order
+        ("site_onset", "f8"),  # containing stream's offset from part start
+        ("parent_onset", "f8"),  # offset of the containing stream's own container
+        ("order", "i8"),  # music21 insertIndex within its site (sort tiebreak)
+    ]
+)
 
 
-def _force_fixed_percussion_pitch(part_stream, pitch_name: str = "C5") -> None:
-    """Ensure unpitched percussion displays as a single staff position."""
-    from music21 import note, pitch
+def note_events_from_part(part_stream) -> np.ndarray | None:
+    """Load a part's notes/chords into a NOTE_EVENT_DTYPE array in recurse() order.
 
-    for element in list(part_stream.recurse().notes):
-        if isinstance(element, note.Note):
-            element.pitch = pitch.Pitch(pitch_name)
+    Returns None when the part holds anything the IR does not model (unpitched
+    notes, empty chords); callers then keep the music21 passes.
+    """
+    from music21 import stream
 
+    rows: list[tuple] = []
+    container_offsets = _container_offsets(part_stream)
+    sites: dict[int, tuple[int, float, float, int]] = {}
+    for element_index, element in enumerate(part_stream.recurse().notes):
+        is_chord = bool(getattr(element, "isChord", False))
+        if is_chord:
+            pitches = list(element.pitches)
+        elif getattr(element, "isNote", False):
+            pitches = [element.pitch]
+        else:
+            return None
+        if not pitches:
+            return None
+        site = element.activeSite
+        if id(site) not in sites:
+            voice_index = 0
+            if isinstance(site, stream.Voice) and site.activeSite is not None:
+                voice_index = list(site.activeSite.voices).index(site)
+            site_onset = parent_onset = 0.0
+            if site is not part_stream:
+                site_onset = container_offsets[id(site)]
+                parent = site.activeSite
+                if parent is not None and parent is not part_stream:
+                    parent_onset = container_offsets[id(parent)]
+            sites[id(site)] = (len(sites), site_onset, parent_onset, voice_index)
+        site_index, site_onset, parent_onset, voice_index = sites[id(site)]
+        onset = site_onset + float(element.offset)
+        velocity = element.volume.velocity if element.hasVolumeInformation() else None
+        order = int(element.sortTuple(site).insertIndex)
+        duration = float(element.duration.quarterLength)
+        for pitch_obj in pitches:
+            rows.append(
+                (
+                    onset,
+                    duration,
+                    int(pitch_obj.midi),
+                    int(velocity or 0),
+                    voice_index,
+                    element_index,
+                    is_chord,
+                    pitch_obj.accidental is not None,
+                    site_index,
+                    site_onset,
+                    parent_onset,
+                    order,
+                )
+            )
+    return np.array(rows, dtype=NOTE_EVENT_DTYPE)
 
-def _insert_guarded_key_signature(part_stream) -> None:
-    """Insert detected key only when it likely reduces inline accidental clutter."""
-    from music21 import key
 
-    metrics = _playability_metrics(part_stream)
-    if float(metrics.get("accidental_density", 0.0)) < 0.18:
-        return
-    try:
-        detected = part_stream.analyze("key")
-    except Exception:
-        return
-    if not isinstance(detected, key.Key):
-        return
-    if abs(int(detected.sharps)) > 4:
-        return
-    for existing in list(part_stream.recurse().getElementsByClass(key.KeySignature)):
-        try:
-            existing.activeSite.remove(existing)
-        except Exception:
-            pass
-    part_stream.insert(0, key.KeySignature(int(detected.sharps)))
+def _element_starts(events: np.ndarray) -> np.ndarray:
+    """Index of the first row of each element (rows of one element are contiguous)."""
+    if len(events) == 0:
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, events["element"][1:] != events["element"][:-1]])
 
 
-def _flatten_part_to_primary_voice(part_stream) -> None:
-    """Collapse measures to a single primary voice to avoid overlapping timelines."""
+def _nearest_grid_multiple(values: np.ndarray, unit: float, zero_allowed: bool = True) -> np.ndarray:
+    """Vectorized music21 `common.nearestMultiple` (exact halves round down)."""
+    values = np.maximum(values, 0.0)
+    low = unit * np.floor(values / unit)
+    snapped = np.where(values <= low + unit / 2.0, low, low + unit)
+    if not zero_allowed:
+        snapped = np.where(snapped == 0.0, unit, snapped)
+    return snapped
+
+
+def _simplify_events(events: np.ndarray, options: dict) -> np.ndarray:
+    """Array version of `_simplify_part`: grid quantize, then min-duration and per-beat density prune."""
+    divisor = _grid_to_divisor(options.get("quantize_grid", "1/8"))
+    min_duration = float(options.get("min_note_duration_beats", 0.25))
+    density_threshold = int(options.get("density_threshold", 6))
+    if len(events) == 0:
+        return events
+
+    unit = 1.0 / divisor
+    out = events.copy()
+    # music21 quantizes every offset relative to its own container, including the
+    # offsets of measures and voices themselves.
+    parent_onset = _nearest_grid_multiple(out["parent_onset"], unit)
+    site_onset = parent_onset + _nearest_grid_multiple(out["site_onset"] - out["parent_onset"], unit)
+    out["onset"] = site_onset + _nearest_grid_multiple(out["onset"] - out["site_onset"], unit)
+    out["site_onset"] = site_onset
+    out["parent_onset"] = parent_onset
+    out["duration"] = _nearest_grid_multiple(out["duration"], unit, zero_allowed=False)
+
+    # Prune in the order music21 would visit the re-sorted stream: walk order of
+    # containers, then quantized offset, then insertion order.
+    starts = _element_starts(out)
+    heads = out[starts]
+    visit = np.lexsort((heads["order"], heads["onset"], heads["site"]))
+    keep = np.zeros(len(heads), dtype=bool)
+    long_enough = heads["duration"][visit] >= min_duration
+    candidates = visit[long_enough]
+    buckets = np.floor(heads["onset"][candidates]).astype(np.int64)
+    by_bucket = np.argsort(buckets, kind="stable")
+    sorted_buckets = buckets[by_bucket]
+    group_start = np.r_[0, np.flatnonzero(sorted_buckets[1:] != sorted_buckets[:-1]) + 1]
+    group_sizes = np.diff(np.r_[group_start, len(sorted_buckets)])
+    rank = np.arange(len(sorted_buckets)) - np.repeat(group_start, group_sizes)
+    keep[candidates[by_bucket[rank < density_threshold]]] = True
+    return out[np.repeat(keep, np.diff(np.r_[starts, len(out)]))]
+
+
+def _grid_buckets(onsets: np.ndarray, grid_step: float) -> np.ndarray:
+    return np.round(onsets / grid_step) * grid_step
+
+
+def _fused_line_events(
+    events: np.ndarray, instrument_name: str, options: dict, family: str,
+) -> np.ndarray:
+    """Single-pass monophonic sanitizer: bucket once, choose one pitch per bucket, tighten.
+
+    Equivalent to the family `_sanitize_*` pass followed by `_tighten_monophonic_timeline`.
+    Percussion maps to C5; melodic families pick the in-range candidate nearest the
+    previous note, fold leaps (7 semitones for woodwinds, 9 for low brass) and clamp to
+    range. Each note is then rounded to whole grid steps and cut at the next onset, so
+    the result is the final line.
+    """
+    grid = str(options.get("quantize_grid", "1/8"))
+    grid_step = {"1/4": 1.0, "1/8": 0.5, "1/16": 0.25}.get(grid, 0.5)
+    min_duration = max(float(options.get("min_note_duration_beats", 0.25)), grid_step)
+    if len(events) == 0:
+        return events
+
+    buckets = _grid_buckets(events["onset"], grid_step)
+    order = np.argsort(buckets, kind="stable")
+    sorted_buckets = buckets[order]
+    starts = np.r_[0, np.flatnonzero(sorted_buckets[1:] != sorted_buckets[:-1]) + 1]
+    onsets = sorted_buckets[starts]
+    durations = np.maximum.reduceat(events["duration"][order], starts)
+    durations = np.maximum(min_duration, np.round(durations / grid_step) * grid_step)
+
+    if family == "percussion":
+        chosen_line = np.full(len(onsets), 72)
+    else:
+        if family == "woodwind":
+            min_midi, max_midi = _woodwind_range_midi(instrument_name)
+            leap_limit = 7
+        else:
+            min_midi, max_midi = _instrument_range_midi(instrument_name)
+            leap_limit = 9
+        center_midi = (min_midi + max_midi) / 2.0
+        pitches = events["pitch"][order].tolist()
+        stops = np.r_[starts[1:], len(order)].tolist()
+        chosen_line = []
+        previous_midi: int | None = None
+        for start, stop in zip(starts.tolist(), stops):
+            raw_candidates = sorted(set(pitches[start:stop]))
+            in_range = [m for m in raw_candidates if min_midi <= m <= max_midi] or raw_candidates
+            if family == "low_brass":
+                anchor_midi = previous_midi if previous_midi is not None else int(center_midi)
+                chosen = min(in_range, key=lambda m: (abs(m - anchor_midi), m))
+            else:
+                anchor = center_midi if previous_midi is None else previous_midi
+                chosen = min(in_range, key=lambda m: abs(m - anchor))
+            chosen = max(min_midi, min(max_midi, int(chosen)))
+            if previous_midi is not None:
+                while chosen - previous_midi > leap_limit:
+                    chosen -= 12
+                while previous_midi - chosen > leap_limit:
+                    chosen += 12
+                chosen = max(min_midi, min(max_midi, int(chosen)))
+            chosen_line.append(chosen)
+            previous_midi = chosen
+
+    # Tighten: whole grid steps, each note ends by the next onset.
+    durations = np.maximum(grid_step, np.round(durations / grid_step) * grid_step)
+    durations = np.minimum(durations, np.maximum(grid_step, np.r_[np.diff(onsets), np.inf]))
+    out = np.zeros(len(onsets), dtype=NOTE_EVENT_DTYPE)
+    out["onset"] = onsets
+    out["duration"] = durations
+    out["pitch"] = chosen_line
+    out["element"] = np.arange(len(onsets))
+    out["order"] = np.arange(len(onsets))
+    return out
+
+
+def _replace_part_notes(part_stream, events: np.ndarray) -> None:
+    """Materialize one-note-per-element events as the part's flat note timeline.
+
+    Drops existing measures and top-level notes/rests (as the music21 tighten pass
+    does) and inserts fresh notes; other top-level elements (instrument) stay.
+    """
+    from music21 import note, pitch, stream
+
+    for element in list(part_stream.notesAndRests):
+        part_stream.remove(element)
+    for measure in list(part_stream.getElementsByClass(stream.Measure)):
+        part_stream.remove(measure)
+    for offset, duration, midi_value in zip(
+        events["onset"].tolist(), events["duration"].tolist(), events["pitch"].tolist()
+    ):
+        p = pitch.Pitch()
+        p.midi = int(midi_value)
+        n = note.Note()
+        n.pitch = p
+        n.quarterLength = duration
+        part_stream.insert(offset, n)
+
+
+def _line_family(instrument_name: str) -> str:
+    if _is_percussion_target(instrument_name):
+        return "percussion"
+    if _is_woodwind_target(instrument_name):
+        return "woodwind"
+    if _is_low_brass_target(instrument_name):
+        return "low_brass"
+    return "other"
+
+
+def _clean_line_events(events: np.ndarray, instrument_name: str, options: dict) -> np.ndarray:
+    """Prune, then the fused sanitizer, with the relaxed retry for over-pruned parts."""
+    family = _line_family(instrument_name)
+    cleaned = _fused_line_events(_simplify_events(events, options), instrument_name, options, family)
+    if len(cleaned):
+        return cleaned
+    # Same gentler retry as the music21 path: sanitize the original notes without pruning.
+    relaxed = dict(options)
+    relaxed["quantize_grid"] = "1/8"
+    relaxed["min_note_duration_beats"] = min(0.25, float(options.get("min_note_duration_beats", 0.25)))
+    relaxed["density_threshold"] = max(8, int(options.get("density_threshold", 6)))
+    return _fused_line_events(events, instrument_name, relaxed, family)
+
+
+def _clean_single_line_part(
+    part_stream, instrument_name: str, options: dict, engine: str | None = None, reload=None,
+):
+    """Simplify, sanitize and grid-tighten a woodwind/low-brass/percussion part; returns the cleaned part.
+
+    The "events" engine runs every pass on the note-event IR and touches music21
+    once, to write the result. "music21" (or parts the IR cannot model) runs the
+    original object passes. `reload` returns a fresh copy of the uncleaned part for
+    the over-pruned retry; without it the part is deep-copied up front.
+    """
     import copy
 
+    if (engine or SIMPLIFY_ENGINE) == "events":
+        events = note_events_from_part(part_stream)
+        if events is not None:
+            cleaned = _clean_line_events(events, instrument_name, options)
+            if len(cleaned):
+                _replace_part_notes(part_stream, cleaned)
+            return part_stream
+
+    original_part_stream = None if reload is not None else copy.deepcopy(part_stream)
+    _simplify_part(part_stream, options, engine=engine)
+    if _is_percussion_target(instrument_name):
+        _sanitize_percussion_part(part_stream, options)
+    elif _is_woodwind_target(instrument_name):
+        _sanitize_woodwind_melody(part_stream, instrument_name, options)
+    else:
+        _sanitize_single_line_part(part_stream, instrument_name, options)
+    _tighten_monophonic_timeline(part_stream, str(options.get("quantize_grid", "1/8")))
+    if len(list(part_stream.recurse().notes)) > 0:
+        return part_stream
+
+    # Fallback for over-pruned streams:
+    # re-run cleanup from original MIDI content with gentler defaults.
+    part_stream = reload() if reload is not None else original_part_stream
+    relaxed = dict(options)
+    relaxed["quantize_grid"] = "1/8"
+    relaxed["min_note_duration_beats"] = min(0.25, float(options.get("min_note_duration_beats", 0.25)))
+    relaxed["density_threshold"] = max(8, int(options.get("density_threshold", 6)))
+    if _is_percussion_target(instrument_name):
+        _sanitize_percussion_part(part_stream, relaxed)
+    elif _is_woodwind_target(instrument_name):
+        _sanitize_woodwind_melody(part_stream, instrument_name, relaxed)
+    else:
+        _sanitize_single_line_part(part_stream, instrument_name, relaxed)
+    _tighten_monophonic_timeline(part_stream, str(relaxed.get("quantize_grid", "1/8")))
+    return part_stream
+
+
+def _single_line_part_from_events(events: np.ndarray, instrument_name: str, options: dict):
+    """Cleaned single-line Part built from note events alone; None when nothing survives."""
     from music21 import stream
 
-    for measure in list(part_stream.recurse().getElementsByClass(stream.Measure)):
-        voices = list(measure.getElementsByClass(stream.Voice))
+    cleaned = _clean_line_events(events, instrument_name, options)
+    if not len(cleaned):
+        return None
+    part_stream = stream.Part()
+    _replace_part_notes(part_stream, cleaned)
+    return part_stream
+
+
+def _note_event_metrics(events: np.ndarray) -> dict[str, float]:
+    """Playability metrics from the IR (chords count once, lowest pitch leads)."""
+    if len(events) == 0:
+        return {
+            "note_count": 0.0,
+            "accidental_density": 0.0,
+            "large_leap_rate": 0.0,
+            "short_note_rate": 0.0,
+        }
+    starts = _element_starts(events)
+    note_count = len(starts)
+    short_count = int(np.count_nonzero(events["duration"][starts] <= 0.5))
+    accidental_count = int(np.count_nonzero(events["accidental"]))
+    primary = np.minimum.reduceat(events["pitch"], starts).astype(np.int64)
+    leaps = np.abs(np.diff(primary))
+    return {
+        "note_count": float(note_count),
+        "accidental_density": float(accidental_count / note_count),
+        "large_leap_rate": float(np.count_nonzero(leaps >= 8) / max(1, len(leaps))),
+        "short_note_rate": float(short_count / note_count),
+    }
+
+
+# --- Parsed-MIDI cache ---
+# One process-wide cache so the fit check, score builds and Quick Reruns parse each
+# Basic Pitch MIDI once. Entries are keyed by content hash (memoized per path, mtime
+# and size) and hold the parsed score frozen with music21's freezeThaw plus its
+# note-event IR; readers always get a fresh thawed score or array copy, so in-place
+# cleanup passes never touch a cached entry.
+_PARSED_MIDI_LOCK = threading.Lock()
+_PARSED_MIDI_ENTRIES: OrderedDict[str, tuple[bytes, np.ndarray | None, int]] = OrderedDict()
+_PARSED_MIDI_DIGESTS: dict[tuple[str, int, int], str] = {}
+
+
+def _parse_midi_file(midi_file: Path, store_pickle: bool = True):
+    from music21 import converter
+
+    with warnings.catch_warnings():
+        _suppress_known_music21_warnings()
+        # music21's own on-disk pickle would freeze/thaw a second copy of what we cache.
+        return converter.parse(str(midi_file), storePickle=store_pickle)
+
+
+def _midi_content_digest(midi_file: Path) -> str:
+    stat = midi_file.stat()
+    identity = (str(midi_file.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _PARSED_MIDI_LOCK:
+        digest = _PARSED_MIDI_DIGESTS.get(identity)
+    if digest is None:
+        digest = hash_file_sha256(midi_file)
+        with _PARSED_MIDI_LOCK:
+            if len(_PARSED_MIDI_DIGESTS) >= 4096:
+                _PARSED_MIDI_DIGESTS.clear()
+            _PARSED_MIDI_DIGESTS[identity] = digest
+    return digest
+
+
+def _freeze_parsed_midi(parsed) -> tuple[bytes, np.ndarray | None]:
+    """(frozen score, note events) cache entry for a fresh parse; `parsed` is unusable afterwards."""
+    from music21 import freezeThaw
+
+    events = note_events_from_part(parsed.parts[0] if parsed.parts else parsed)
+    # fastButUnsafe skips freezeThaw's deepcopy; `parsed` is not used afterwards.
+    frozen = freezeThaw.StreamFreezer(parsed, fastButUnsafe=True).writeStr(fmt="pickle")
+    return frozen, events
+
+
+def _thaw_stream(frozen: bytes):
+    from music21 import freezeThaw
+
+    thawer = freezeThaw.StreamThawer()
+    thawer.openStr(frozen)
+    return thawer.stream
+
+
+def _lookup_parsed_midi(digest: str, cache_stats: dict | None) -> tuple[bytes, np.ndarray | None] | None:
+    with _PARSED_MIDI_LOCK:
+        entry = _PARSED_MIDI_ENTRIES.get(digest)
+        if entry is not None:
+            _PARSED_MIDI_ENTRIES.move_to_end(digest)
+    record_cache_event(cache_stats, "parsed_midi", entry is not None)
+    return None if entry is None else (entry[0], entry[1])
+
+
+def _store_parsed_midi(digest: str, frozen: bytes, events: np.ndarray | None) -> None:
+    size = len(frozen) + (events.nbytes if events is not None else 0)
+    if size > PARSED_MIDI_CACHE_MAX_BYTES:
+        return
+    with _PARSED_MIDI_LOCK:
+        _PARSED_MIDI_ENTRIES[digest] = (frozen, events, size)
+        total = sum(item[2] for item in _PARSED_MIDI_ENTRIES.values())
+        while total > PARSED_MIDI_CACHE_MAX_BYTES and len(_PARSED_MIDI_ENTRIES) > 1:
+            _, (_, _, evicted_size) = _PARSED_MIDI_ENTRIES.popitem(last=False)
+            total -= evicted_size
+
+
+def _parsed_midi_entry(midi_path: str | Path, cache_stats: dict | None) -> tuple[bytes, np.ndarray | None]:
+    """Return (frozen score, note events) for a MIDI file, parsing it on a cache miss."""
+    midi_file = Path(midi_path)
+    digest = _midi_content_digest(midi_file)
+    entry = _lookup_parsed_midi(digest, cache_stats)
+    if entry is not None:
+        return entry
+    frozen, events = _freeze_parsed_midi(_parse_midi_file(midi_file, store_pickle=False))
+    _store_parsed_midi(digest, frozen, events)
+    return frozen, events
+
+
+def load_parsed_midi(midi_path: str | Path, cache_stats: dict | None = None):
+    """Parse a MIDI file into a music21 Score, reusing earlier parses in this process.
+
+    Every call returns an independent Score that callers may modify in place.
+    """
+    if not PARSED_MIDI_CACHE_ENABLED:
+        return _parse_midi_file(Path(midi_path))
+    frozen, _ = _parsed_midi_entry(midi_path, cache_stats)
+    return _thaw_stream(frozen)
+
+
+def load_midi_note_events(midi_path: str | Path, cache_stats: dict | None = None) -> np.ndarray | None:
+    """Note-event IR of a MIDI file's first part (a private copy), or None when it has unpitched notes."""
+    if not PARSED_MIDI_CACHE_ENABLED:
+        parsed = _parse_midi_file(Path(midi_path))
+        return note_events_from_part(parsed.parts[0] if parsed.parts else parsed)
+    _, events = _parsed_midi_entry(midi_path, cache_stats)
+    return None if events is None else events.copy()
+
+
+def clear_parsed_midi_cache() -> None:
+    with _PARSED_MIDI_LOCK:
+        _PARSED_MIDI_ENTRIES.clear()
+        _PARSED_MIDI_DIGESTS.clear()
+
+
+# --- Pass timing ---
+# `build_score` times every named pass (wall time, call count, notes left in the part)
+# into a plain-dict recorder per part, so pool workers send theirs back with the part
+# result. With SCORE_BUILD_PROFILE == "trace" each call is also kept as a Chrome trace
+# event. Passing recorder=None turns every `_timed_pass` into a no-op.
+
+
+def _new_pass_recorder(label: str, trace: bool = False) -> dict:
+    return {"label": label, "passes": {}, "events": [] if trace else None}
+
+
+def _stream_note_count(stream_obj) -> int:
+    """Notes and chords in a part or score (counted per measure once it has measures)."""
+    from music21 import stream
+
+    if isinstance(stream_obj, stream.Score):
+        return sum(_stream_note_count(part) for part in stream_obj.parts)
+    measures = list(stream_obj.getElementsByClass(stream.Measure))
+    if not measures:
+        return len(stream_obj.recurse().notes)
+    count = 0
+    for measure in measures:
+        count += len(measure.notes)
+        for voice in measure.voices:
+            count += len(voice.notes)
+    return count
+
+
+@contextmanager
+def _timed_pass(recorder: dict | None, name: str, notes_of=None):
+    """Record one call of pass `name`; `notes_of()` returns the stream to count afterwards."""
+    if recorder is None:
+        yield
+        return
+    started = time.perf_counter()
+    completed = False
+    try:
+        yield
+        completed = True
+    finally:
+        elapsed = time.perf_counter() - started
+        entry = recorder["passes"].setdefault(name, {"calls": 0, "total_s": 0.0, "notes": 0})
+        entry["calls"] += 1
+        entry["total_s"] += elapsed
+        counted = notes_of() if completed and notes_of is not None else None
+        if counted is not None:
+            entry["notes"] = _stream_note_count(counted)
+        if recorder["events"] is not None:
+            recorder["events"].append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round(started * 1e6, 1),
+                    "dur": round(elapsed * 1e6, 1),
+                    "args": {"part": recorder["label"], "notes": entry["notes"], "process": os.getpid()},
+                }
+            )
+
+
+def _merge_pass_timings(totals: dict, passes: dict) -> None:
+    for name, entry in passes.items():
+        total = totals.setdefault(name, {"calls": 0, "total_s": 0.0, "notes": 0})
+        total["calls"] += entry["calls"]
+        total["total_s"] += entry["total_s"]
+        total["notes"] += entry["notes"]
+
+
+def _rounded_pass_timings(passes: dict) -> dict:
+    return {
+        name: {"calls": entry["calls"], "total_s": round(entry["total_s"], 4), "notes": entry["notes"]}
+        for name, entry in passes.items()
+    }
+
+
+def _write_chrome_trace(path: Path, recorders: list[dict]) -> None:
+    """Write recorded pass events as a Chrome trace (chrome://tracing, Perfetto): one row per part."""
+    import json
+
+    pid = os.getpid()
+    events: list[dict] = []
+    for tid, recorder in enumerate(recorders):
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": recorder["label"]}})
+        events.extend(dict(event, pid=pid, tid=tid) for event in recorder.get("events") or [])
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+def _force_fixed_percussion_pitch(part_stream, pitch_name: str = "C5") -> None:
+    """Ensure unpitched percussion displays as a single staff position."""
+    from music21 import note, pitch
+
+    for element in list(part_stream.recurse().notes):
+        if isinstance(element, note.Note):
+            element.pitch = pitch.Pitch(pitch_name)
+
+
+def _insert_guarded_key_signature(part_stream, key_estimate=None, engine: str | None = None):
+    """Insert detected key only when it likely reduces inline accidental clutter.
+
+    `key_estimate` skips detection (e.g. the concert part's estimate shifted with
+    `_transpose_key_estimate`); returns the estimate used, or None when skipped.
+    `engine` selects how the accidental density is measured (default SIMPLIFY_ENGINE).
+    """
+    from music21 import key
+
+    metrics = _playability_metrics(part_stream, engine)
+    if float(metrics.get("accidental_density", 0.0)) < 0.18:
+        return None
+    if key_estimate is None:
+        key_estimate = _estimate_key(part_stream)
+    if key_estimate is None:
+        return None
+    detected = _key_from_estimate(key_estimate)
+    if abs(int(detected.sharps)) > 4:
+        return key_estimate
+    for existing in list(part_stream.recurse().getElementsByClass(key.KeySignature)):
+        try:
+            existing.activeSite.remove(existing)
+        except Exception:
+            pass
+    part_stream.insert(0, key.KeySignature(int(detected.sharps)))
+    return key_estimate
+
+
+def _flatten_part_to_primary_voice(part_stream) -> None:
+    """Collapse measures to a single primary voice to avoid overlapping timelines."""
+    import copy
+
+    from music21 import stream
+
+    for measure in list(part_stream.recurse().getElementsByClass(stream.Measure)):
+        voices = list(measure.getElementsByClass(stream.Voice))
         if len(voices) <= 1:
             continue
         primary = voices[0]
@@ -816,6 +2287,133 @@ def _normalize_part_grid(part_stream, grid: str) -> None:
 
 def _align_score_measures(score_obj) -> None:
     """Apply shared measure timeline across all parts for full-score barline alignment."""
+    if SCORE_ALIGN_ENGINE != "linear" or not _align_score_measures_linear(score_obj):
+        _align_score_measures_music21(score_obj)
+
+
+def _part_timeline(part_stream) -> tuple[list[tuple[float, object]], list, list]:
+    """One part's leaf elements as (absolute offset, element) in stream order.
+
+    Measures and voices are unpacked; end-of-stream elements (right barlines) are dropped.
+    Also returns the part-level spanners and every (offset, TimeSignature) seen.
+    """
+    from music21 import meter, spanner
+
+    events: list[tuple[float, object]] = []
+    spanners: list = []
+    signatures: list[tuple[float, object]] = []
+
+    def visit(container, base: float) -> None:
+        # Depth-first in element order, like flatten(), so ties at one offset keep its order.
+        for element in container.elements:
+            offset = container.elementOffset(element, returnSpecial=True)
+            if isinstance(offset, str):
+                continue
+            if getattr(element, "isStream", False):
+                visit(element, base + float(offset))
+            elif isinstance(element, spanner.Spanner):
+                spanners.append(element)
+            elif isinstance(element, meter.TimeSignature):
+                signatures.append((base + float(offset), element))
+            else:
+                events.append((base + float(offset), element))
+
+    visit(part_stream, 0.0)
+    # Nearly sorted already (measure by measure), so this is a linear merge in practice.
+    events.sort(key=lambda item: item[0])
+    return events, spanners, signatures
+
+
+def _align_score_measures_linear(score_obj) -> bool:
+    """Re-bar every part on one shared barline grid in a single sweep per part.
+
+    The grid comes from the (single, shared) time signature and the longest part. Each
+    part's elements are dropped into bars by offset; notes and chords crossing a barline
+    are split with ties, rests are cut at the barline, and short or empty bars are topped
+    up with a rest. Returns False, leaving the score untouched, when the parts use meter
+    changes, different meters or part-level voices; `_align_score_measures_music21`
+    handles those.
+    """
+    import copy
+
+    from music21 import bar, clef, meter, note, stream
+
+    parts = list(score_obj.parts)
+    timelines = []
+    shared_ts = None
+    for part in parts:
+        if part.hasVoices():
+            return False
+        events, spanners, signatures = _part_timeline(part)
+        for offset, signature in signatures:
+            if offset != 0.0:
+                return False
+            if shared_ts is None:
+                shared_ts = signature
+            elif signature.ratioString != shared_ts.ratioString:
+                return False
+        timelines.append((events, spanners))
+    if not parts:
+        return True
+    if shared_ts is None:
+        shared_ts = meter.TimeSignature("4/4")
+    bar_q = float(shared_ts.barDuration.quarterLength)
+    max_end = 0.0
+    for events, _ in timelines:
+        for offset, element in events:
+            max_end = max(max_end, offset + float(element.duration.quarterLength))
+    bar_count = max(1, int(np.ceil(max_end / bar_q)))
+
+    for part, (events, spanners) in zip(parts, timelines):
+        measures = [stream.Measure(number=index + 1) for index in range(bar_count)]
+        fill = [0.0] * bar_count
+        has_first_clef = False
+        for offset, element in events:
+            index = min(int(offset // bar_q), bar_count - 1)
+            if isinstance(element, clef.Clef) and offset == 0.0:
+                has_first_clef = True
+            duration = float(element.duration.quarterLength)
+            if isinstance(element, note.Rest) and offset + duration > (index + 1) * bar_q + 1e-9:
+                # Rests stop at the barline; the bars they covered are refilled below.
+                duration = (index + 1) * bar_q - offset
+                element.duration.quarterLength = duration
+            while (
+                isinstance(element, note.NotRest)
+                and index < bar_count - 1
+                and offset + duration > (index + 1) * bar_q + 1e-9
+            ):
+                head, element = element.splitAtQuarterLength((index + 1) * bar_q - offset)
+                measures[index].coreInsert(offset - index * bar_q, head)
+                fill[index] = bar_q
+                index += 1
+                offset = index * bar_q
+                duration = float(element.duration.quarterLength)
+            local = offset - index * bar_q
+            measures[index].coreInsert(local, element)
+            fill[index] = max(fill[index], local + duration)
+
+        first = measures[0]
+        first.coreInsert(0.0, copy.deepcopy(shared_ts))
+        if not has_first_clef:
+            first.coreInsert(0.0, clef.bestClef(part, recurse=True))
+        for measure, filled in zip(measures, fill):
+            if filled < bar_q - 1e-6:
+                measure.coreInsert(filled, note.Rest(quarterLength=bar_q - filled))
+            measure.coreElementsChanged()
+        measures[-1].rightBarline = bar.Barline("final")
+
+        staging = stream.Stream()
+        for index, measure in enumerate(measures):
+            staging.coreInsert(index * bar_q, measure)
+        for item in spanners:
+            staging.coreInsert(0.0, item)
+        staging.coreElementsChanged()
+        part.elements = staging
+    return True
+
+
+def _align_score_measures_music21(score_obj) -> None:
+    """Re-measure every part with music21 and pad them to the longest part's measure count."""
     from music21 import meter, note, stream
 
     with warnings.catch_warnings():
@@ -868,6 +2466,18 @@ def _pad_parts_to_common_length(score_obj, grid: str) -> None:
             part.append(note.Rest(quarterLength=deficit))
 
 
+def _assemble_full_score(score_obj, grid: str, recorder: dict | None = None) -> None:
+    """Pad, measure-align and notate the concert parts in one in-place pass."""
+    with _timed_pass(recorder, "pad_parts"):
+        _pad_parts_to_common_length(score_obj, grid)
+    with _timed_pass(recorder, "align_measures"):
+        _align_score_measures(score_obj)
+    with _timed_pass(recorder, "score_make_notation", lambda: score_obj):
+        with warnings.catch_warnings():
+            _suppress_known_music21_warnings()
+            score_obj.makeNotation(inPlace=True)
+
+
 def _beginner_playability_thresholds(instrument_name: str) -> dict[str, float]:
     """Return beginner gate thresholds tuned by instrument family."""
     name = str(instrument_name or "")
@@ -881,7 +2491,42 @@ def _beginner_playability_thresholds(instrument_name: str) -> dict[str, float]:
     return {"accidental_density": 0.30, "large_leap_rate": 0.40, "short_note_rate": 0.50}
 
 
-def assess_song_fit(midis: dict[str, str], assignment: dict[str, str]) -> dict:
+def _fit_part_metrics(midi_file: Path, cache_stats: dict | None) -> dict:
+    """Playability metrics plus chord/overlap rates for one MIDI part."""
+    events = load_midi_note_events(midi_file, cache_stats=cache_stats)
+    if events is not None:
+        metrics = _note_event_metrics(events)
+        starts = _element_starts(events)
+        # 1/16-note buckets to estimate overlap/noise density
+        buckets = np.round(events["onset"][starts] / 0.25).astype(np.int64)
+        _, bucket_sizes = np.unique(buckets, return_counts=True)
+        metrics["chord_rate"] = float(np.count_nonzero(events["chord"][starts]) / max(1, len(starts)))
+        metrics["overlap_rate"] = float(np.count_nonzero(bucket_sizes > 1) / max(1, len(bucket_sizes)))
+        return metrics
+
+    parsed = load_parsed_midi(midi_file, cache_stats=cache_stats)
+    part_stream = parsed.parts[0] if parsed.parts else parsed
+    metrics = _playability_metrics(part_stream)
+    note_elements = list(part_stream.recurse().notes)
+    chord_count = sum(1 for item in note_elements if getattr(item, "isChord", False))
+    bucket_counts: dict[int, int] = {}
+    for item in note_elements:
+        try:
+            offset = float(item.getOffsetInHierarchy(part_stream))
+        except Exception:
+            continue
+        bucket = int(round(offset / 0.25))
+        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
+    overlap_buckets = sum(1 for value in bucket_counts.values() if value > 1)
+    total_buckets = max(1, len(bucket_counts))
+    metrics["chord_rate"] = float(chord_count / max(1, len(note_elements)))
+    metrics["overlap_rate"] = float(overlap_buckets / total_buckets)
+    return metrics
+
+
+def assess_song_fit(
+    midis: dict[str, str], assignment: dict[str, str], cache_stats: dict | None = None,
+) -> dict:
     """Assess transcription feasibility from assigned melodic MIDI parts.
 
     Returns a dict with:
@@ -891,8 +2536,6 @@ def assess_song_fit(midis: dict[str, str], assignment: dict[str, str]) -> dict:
     - reasons (plain-language list)
     - part_metrics (per melodic part metrics)
     """
-    from music21 import converter
-
     percussion_tokens = ("Snare", "Bass Drum", "Percussion", "Auxiliary", "Timpani")
     part_metrics: list[dict] = []
 
@@ -906,26 +2549,7 @@ def assess_song_fit(midis: dict[str, str], assignment: dict[str, str]) -> dict:
         if not midi_file.exists():
             continue
 
-        with warnings.catch_warnings():
-            _suppress_known_music21_warnings()
-            parsed = converter.parse(str(midi_file))
-        part_stream = parsed.parts[0] if parsed.parts else parsed
-        metrics = _playability_metrics(part_stream)
-        note_elements = list(part_stream.recurse().notes)
-        chord_count = sum(1 for item in note_elements if getattr(item, "isChord", False))
-        bucket_counts: dict[int, int] = {}
-        for item in note_elements:
-            try:
-                offset = float(item.getOffsetInHierarchy(part_stream))
-            except Exception:
-                continue
-            # 1/16-note buckets to estimate overlap/noise density
-            bucket = int(round(offset / 0.25))
-            bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
-        overlap_buckets = sum(1 for value in bucket_counts.values() if value > 1)
-        total_buckets = max(1, len(bucket_counts))
-        metrics["chord_rate"] = float(chord_count / max(1, len(note_elements)))
-        metrics["overlap_rate"] = float(overlap_buckets / total_buckets)
+        metrics = _fit_part_metrics(midi_file, cache_stats)
         metrics["name"] = instrument_name
         part_metrics.append(metrics)
 
@@ -1013,219 +2637,1317 @@ def assess_song_fit(midis: dict[str, str], assignment: dict[str, str]) -> dict:
     }
 
 
-def build_score(
-    midis: dict[str, str], assignment: dict[str, str], options: dict,
-    run_dir: Path | None = None,
-) -> dict[str, str | dict[str, str]]:
-    """Build concert-pitch full score and transposed individual part MusicXML files.
+_PERCUSSION_CLEF_TOKENS = ("Snare", "Bass Drum", "Percussion", "Auxiliary")
+_TREBLE_CLEF_TOKENS = ("Flute", "Oboe", "Clarinet", "Sax", "Trumpet", "Horn", "Mallets", "Timpani")
+_BASS_CLEF_TOKENS = ("Tuba", "Trombone", "Bassoon", "Euphonium")
 
-    Returns dict with keys:
-        "full_score": path to concert-pitch MusicXML
-        "parts": dict mapping part_name -> transposed part MusicXML path
-    """
-    import copy
 
-    from music21 import clef, converter, expressions, instrument, interval, metadata, stream
+def _preferred_clef_for_instrument(name: str):
+    from music21 import clef
 
-    _ensure_dirs()
-    workdir = run_dir or TEMP_DIR
-    score = stream.Score(id="btt-score")
-    score.metadata = metadata.Metadata()
-    score.metadata.title = options.get("title", "Untitled")
-    score.metadata.composer = options.get("composer", "")
+    if any(token in name for token in _PERCUSSION_CLEF_TOKENS):
+        return clef.PercussionClef()
+    if any(token in name for token in _BASS_CLEF_TOKENS):
+        return clef.BassClef()
+    if any(token in name for token in _TREBLE_CLEF_TOKENS):
+        return clef.TrebleClef()
+    return None
 
-    disclaimer = create_disclaimer_text(options.get("school", ""))
-    simplify_enabled = bool(options.get("simplify_enabled", False))
 
-    part_dir = workdir / "part_exports"
-    part_dir.mkdir(parents=True, exist_ok=True)
-    transposed_parts: dict[str, str] = {}
-    skipped_parts: list[dict] = []
-    instrument_counts: dict[str, int] = {}
-    percussion_family_tokens = ("Snare", "Bass Drum", "Percussion", "Auxiliary")
-    treble_family_tokens = (
-        "Flute",
-        "Oboe",
-        "Clarinet",
-        "Sax",
-        "Trumpet",
-        "Horn",
-        "Mallets",
-        "Timpani",
-    )
-    bass_family_tokens = ("Tuba", "Trombone", "Bassoon", "Euphonium")
-
-    def _preferred_clef_for_instrument(name: str):
-        if any(token in name for token in percussion_family_tokens):
-            return clef.PercussionClef()
-        if any(token in name for token in bass_family_tokens):
-            return clef.BassClef()
-        if any(token in name for token in treble_family_tokens):
-            return clef.TrebleClef()
-        return None
+def _apply_instrument_and_clef(part_obj, name: str) -> None:
+    from music21 import clef, instrument
 
-    def _apply_instrument_and_clef(part_obj, name: str) -> None:
-        # MIDI imports may include many embedded instrument-change markers.
-        # Normalize to exactly one instrument at offset 0 for clean engraving.
-        for existing_instrument in list(part_obj.recurse().getElementsByClass(instrument.Instrument)):
-            try:
-                existing_instrument.activeSite.remove(existing_instrument)
-            except Exception:
-                pass
+    # MIDI imports may include many embedded instrument-change markers.
+    # Normalize to exactly one instrument at offset 0 for clean engraving.
+    for existing_instrument in list(part_obj.recurse().getElementsByClass(instrument.Instrument)):
         try:
-            part_obj.insert(0, instrument.fromString(name))
+            existing_instrument.activeSite.remove(existing_instrument)
         except Exception:
             pass
-        preferred = _preferred_clef_for_instrument(name)
-        if preferred is not None:
-            for existing in list(part_obj.recurse().getElementsByClass(clef.Clef)):
+    try:
+        part_obj.insert(0, instrument.fromString(name))
+    except Exception:
+        pass
+    preferred = _preferred_clef_for_instrument(name)
+    if preferred is not None:
+        for existing in list(part_obj.recurse().getElementsByClass(clef.Clef)):
+            try:
+                existing.activeSite.remove(existing)
+            except Exception:
+                pass
+        part_obj.insert(0, preferred)
+
+
+def score_build_worker_count(part_count: int, max_workers: int | str | None = None) -> int:
+    """Number of processes for the per-part score build (1 = build in-process).
+
+    Bounded like `transcription_worker_count`, using `SCORE_BUILD_MAX_WORKERS` and
+    `SCORE_BUILD_WORKER_MEMORY_MB`.
+    """
+    requested = SCORE_BUILD_MAX_WORKERS if max_workers is None else max_workers
+    if requested == "auto":
+        workers = os.cpu_count() or 1
+    else:
+        workers = int(requested)
+    workers = min(max(1, workers), max(1, part_count))
+    available_mb = _available_memory_mb()
+    if available_mb is not None and SCORE_BUILD_WORKER_MEMORY_MB > 0:
+        workers = min(workers, max(1, int(available_mb // SCORE_BUILD_WORKER_MEMORY_MB)))
+    return workers
+
+
+def _prepare_part_export(score_obj) -> None:
+    """Run music21's MusicXML export fix-ups on `score_obj` in place.
+
+    Mirrors `GeneralObjectExporter`/`PartExporter` (hidden gap rests, makeNotation,
+    written pitch, duration splits, accidentals/beams/tuplet brackets) without the deep
+    copy the exporter takes first; the score is written once and then discarded.
+    """
+    from music21 import clef, key, meter, stream
+    from music21.stream import makeNotation as m21_make_notation
+
+    with warnings.catch_warnings():
+        _suppress_known_music21_warnings()
+        score_obj.makeRests(
+            refStreamOrTimeRange=[0.0, score_obj.highestTime],
+            fillGaps=True,
+            inPlace=True,
+            hideRests=True,
+            timeRangeFromBarDuration=True,
+        )
+        score_obj.makeNotation(inPlace=True)
+        score_obj.toWrittenPitch(inPlace=True, ottavasToSounding=True)
+        for part in score_obj.parts:
+            part.splitAtDurations(recurse=True)
+            measures = part.getElementsByClass(stream.Measure)
+            if not measures:
+                continue
+            first_measure = measures.first()
+            if first_measure.clef is None and part.getElementsByClass(clef.Clef):
+                first_measure.clef = part.getElementsByClass(clef.Clef).first()
+            if first_measure.keySignature is None and part.getElementsByClass(key.KeySignature):
+                first_measure.keySignature = part.getElementsByClass(key.KeySignature).first()
+            if first_measure.timeSignature is None and part.getElementsByClass(meter.TimeSignature):
+                first_measure.timeSignature = part.getElementsByClass(meter.TimeSignature).first()
+            if not part.streamStatus.haveAccidentalsBeenMade():
+                part.makeAccidentals(inPlace=True)
+            if not part.streamStatus.beams:
                 try:
-                    existing.activeSite.remove(existing)
+                    part.makeBeams(inPlace=True)
                 except Exception:
                     pass
-            part_obj.insert(0, preferred)
+            if not part.streamStatus.tuplets:
+                for measure in measures:
+                    for container in [measure, *measure.voices]:
+                        m21_make_notation.makeTupletBrackets(container, inPlace=True)
+
+
+_MUSICXML_ACCIDENTALS = {
+    "sharp": "sharp",
+    "flat": "flat",
+    "natural": "natural",
+    "double-sharp": "double-sharp",
+    "double-flat": "flat-flat",
+}
+_MUSICXML_BEAM_TYPES = {"start": "begin", "continue": "continue", "stop": "end"}
+_MUSICXML_STYLE_ATTRIBUTES = ("color", "absoluteX", "absoluteY", "relativeX", "relativeY")
+
+
+def _has_plain_style(obj, allow_hidden: bool = False) -> bool:
+    """True when `obj` carries no styling the direct MusicXML writer would drop."""
+    if not getattr(obj, "hasStyleInformation", False):
+        return True
+    style_obj = obj.style
+    if any(getattr(style_obj, name, None) is not None for name in _MUSICXML_STYLE_ATTRIBUTES):
+        return False
+    if getattr(style_obj, "stemStyle", None) is not None or getattr(style_obj, "noteSize", None):
+        return False
+    return allow_hidden or not style_obj.hideObjectOnPrint
+
+
+def _has_xml_id(obj) -> bool:
+    from music21.musicxml.xmlObjects import isValidXSDID
+
+    obj_id = getattr(obj, "id", None)
+    return isinstance(obj_id, str) and isValidXSDID(obj_id)
+
+
+def _measure_attributes_xml(measure, first: bool, transposition) -> list[str] | None:
+    """<attributes> lines for the start of a measure, or None if unsupported."""
+    from music21.common import numToIntOrFloat
+
+    lines: list[str] = []
+    if first:
+        from music21 import defaults
+
+        lines.append(f"        <divisions>{defaults.divisionsPerQuarter}</divisions>")
+    key_sig = measure.keySignature
+    if key_sig is not None:
+        if not _has_plain_style(key_sig) or _has_xml_id(key_sig) or key_sig.isNonTraditional:
+            return None
+        if any(p.octave is not None for p in key_sig.alteredPitches):
+            return None
+        lines.append("        <key>")
+        lines.append(f"          <fifths>{key_sig.sharps}</fifths>")
+        if getattr(key_sig, "mode", None) is not None:
+            lines.append(f"          <mode>{key_sig.mode}</mode>")
+        lines.append("        </key>")
+    time_sig = measure.timeSignature
+    if time_sig is not None:
+        if (
+            not _has_plain_style(time_sig)
+            or _has_xml_id(time_sig)
+            or time_sig.summedNumerator
+            or time_sig.symbolizeDenominator
+            or time_sig.symbol != ""
+        ):
+            return None
+        lines.append("        <time>")
+        for term in time_sig.displaySequence.flatten():
+            lines.append(f"          <beats>{term.numerator}</beats>")
+            lines.append(f"          <beat-type>{term.denominator}</beat-type>")
+        lines.append("        </time>")
+    clef_obj = measure.clef
+    if clef_obj is not None:
+        if not _has_plain_style(clef_obj) or _has_xml_id(clef_obj) or clef_obj.sign is None:
+            return None
+        lines.append("        <clef>")
+        lines.append(f"          <sign>{clef_obj.sign}</sign>")
+        if clef_obj.line is not None:
+            lines.append(f"          <line>{clef_obj.line}</line>")
+        if clef_obj.octaveChange not in (0, None):
+            lines.append(f"          <clef-octave-change>{clef_obj.octaveChange}</clef-octave-change>")
+        lines.append("        </clef>")
+    if transposition is not None:
+        generic_steps = transposition.diatonic.generic.directed
+        octave_shift, diatonic = divmod(abs(generic_steps) - 1, 7)
+        chromatic = abs(transposition.chromatic.semitones) % 12
+        if generic_steps < 0:
+            diatonic, octave_shift, chromatic = -diatonic, -octave_shift, -chromatic
+        lines.append("        <transpose>")
+        lines.append(f"          <diatonic>{diatonic}</diatonic>")
+        lines.append(f"          <chromatic>{numToIntOrFloat(chromatic)}</chromatic>")
+        if octave_shift != 0:
+            lines.append(f"          <octave-change>{octave_shift}</octave-change>")
+        lines.append("        </transpose>")
+    if not lines:
+        return []
+    return ["      <attributes>", *lines, "      </attributes>"]
+
+
+def _metronome_xml(mark) -> list[str] | None:
+    """<direction> lines for a plain metronome mark, or None if unsupported."""
+    from music21 import tempo
+    from music21.common import numToIntOrFloat
+    from music21.musicxml.m21ToXml import typeToMusicXMLType
+
+    if (
+        type(mark) is not tempo.MetronomeMark
+        or mark.numberImplicit
+        or mark.number is None
+        or mark.parentheses
+        or mark.placement is not None
+        or mark.getTextExpression(returnImplicit=False) is not None
+        or _has_xml_id(mark)
+    ):
+        return None
+    lines = [
+        "      <direction>",
+        "        <direction-type>",
+        '          <metronome parentheses="no">',
+        f"            <beat-unit>{typeToMusicXMLType(mark.referent.type)}</beat-unit>",
+    ]
+    lines.extend("            <beat-unit-dot />" for _ in range(mark.referent.dots))
+    lines.append(f"            <per-minute>{numToIntOrFloat(mark.number)}</per-minute>")
+    lines.extend(["          </metronome>", "        </direction-type>"])
+    quarter_bpm = mark.getQuarterBPM() or 0.0
+    if quarter_bpm:
+        lines.append(f'        <sound tempo="{numToIntOrFloat(quarter_bpm)}" />')
+    lines.append("      </direction>")
+    return lines
+
+
+def _note_xml(n, divisions: int, bar_length) -> list[str] | None:
+    """<note> lines for a single pitch or rest, or None if unsupported."""
+    from xml.sax.saxutils import escape
 
-    for stem_name, midi_path in midis.items():
-        instrument_name = assignment.get(stem_name, "").strip()
-        if not instrument_name:
-            continue
+    from music21 import note
+    from music21.common import numToIntOrFloat
+    from music21.musicxml.m21ToXml import typeToMusicXMLType
+
+    is_rest = type(n) is note.Rest
+    d = n.duration
+    if (
+        d.isGrace
+        or d.tuplets
+        or d.type == "inexpressible"
+        or len(d.dotGroups) > 1
+        or n.lyrics
+        or n.articulations
+        or n.expressions
+        or (n.hasEditorialInformation and (n.editorial.get("footnotes") or n.editorial.get("comments")))
+        or not _has_plain_style(n, allow_hidden=True)
+        or _has_xml_id(n)
+    ):
+        return None
+    full_measure_rest = is_rest and (
+        n.fullMeasure in (True, "always")
+        or (n.fullMeasure == "auto" and bar_length is not None and bar_length == d.quarterLength)
+    )
+    if d.type == "complex" and not full_measure_rest:
+        return None
 
-        # Disambiguate when multiple stems share the same instrument
-        instrument_counts[instrument_name] = instrument_counts.get(instrument_name, 0) + 1
-        count = instrument_counts[instrument_name]
-        part_label = instrument_name if count == 1 else f"{instrument_name} ({count})"
+    attributes = []
+    if not is_rest and n.hasVolumeInformation() and n.volume.velocityScalar is not None:
+        attributes.append(f'dynamics="{n.volume.velocityScalar * 100 * (127 / 90):.2f}"')
+    if n.hasStyleInformation and n.style.hideObjectOnPrint:
+        attributes.extend(['print-object="no"', 'print-spacing="yes"'])
+    lines = ["      <note" + "".join(f" {item}" for item in attributes) + ">"]
 
-        parsed = converter.parse(midi_path)
-        part_stream = parsed.parts[0] if parsed.parts else parsed
-        original_part_stream = copy.deepcopy(part_stream)
-        part_stream.partName = part_label
-        part_stream.partAbbreviation = part_label
-
-        if simplify_enabled:
-            _simplify_part(part_stream, options)
-            if _is_percussion_target(instrument_name):
-                _sanitize_percussion_part(part_stream, options)
-            elif _is_woodwind_target(instrument_name):
-                _sanitize_woodwind_melody(part_stream, instrument_name, options)
-            elif _is_low_brass_target(instrument_name):
-                _sanitize_single_line_part(part_stream, instrument_name, options)
-            if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name) or _is_low_brass_target(instrument_name):
-                _tighten_monophonic_timeline(part_stream, str(options.get("quantize_grid", "1/8")))
-
-            if len(list(part_stream.recurse().notes)) == 0:
-                # Fallback for over-pruned streams:
-                # re-run cleanup from original MIDI content with gentler defaults.
-                part_stream = copy.deepcopy(original_part_stream)
-                relaxed = dict(options)
-                relaxed["quantize_grid"] = "1/8"
-                relaxed["min_note_duration_beats"] = min(
-                    0.25, float(options.get("min_note_duration_beats", 0.25))
-                )
-                relaxed["density_threshold"] = max(
-                    8, int(options.get("density_threshold", 6))
-                )
-                if _is_percussion_target(instrument_name):
-                    _sanitize_percussion_part(part_stream, relaxed)
-                elif _is_woodwind_target(instrument_name):
-                    _sanitize_woodwind_melody(part_stream, instrument_name, relaxed)
-                elif _is_low_brass_target(instrument_name):
-                    _sanitize_single_line_part(part_stream, instrument_name, relaxed)
-                if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name) or _is_low_brass_target(instrument_name):
-                    _tighten_monophonic_timeline(part_stream, str(relaxed.get("quantize_grid", "1/8")))
-
-            if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name):
-                _normalize_part_grid(part_stream, str(options.get("quantize_grid", "1/8")))
-            else:
-                _flatten_part_to_primary_voice(part_stream)
-                _rebalance_measure_durations(part_stream)
-            if _is_beginner_profile(options) and not any(
-                token in instrument_name for token in ("Snare", "Bass Drum", "Percussion")
+    accidental = None
+    if is_rest:
+        if n.stepShift != 0:
+            return None
+        lines.append('        <rest measure="yes" />' if full_measure_rest else "        <rest />")
+    else:
+        if (
+            n.notehead != "normal"
+            or n.noteheadParenthesis
+            or n.noteheadFill is not None
+            or n.stemDirection not in ("unspecified", "up", "down", "noStem")
+        ):
+            return None
+        p = n.pitch
+        accidental = p.accidental
+        lines.append("        <pitch>")
+        lines.append(f"          <step>{p.step}</step>")
+        if accidental is not None:
+            if (
+                accidental.name not in _MUSICXML_ACCIDENTALS
+                or accidental.displayStyle != "normal"
+                or not _has_plain_style(accidental)
             ):
-                metrics = _apply_beginner_melody_filter(part_stream)
-                limits = _beginner_playability_thresholds(instrument_name)
-                if (
-                    metrics["note_count"] > 0
-                    and (
-                        metrics["accidental_density"] > limits["accidental_density"]
-                        or metrics["large_leap_rate"] > limits["large_leap_rate"]
-                        or metrics["short_note_rate"] > limits["short_note_rate"]
-                    )
-                ):
-                    skipped_parts.append(
-                        {
-                            "name": part_label,
-                            "status": "skipped",
-                            "reason": "unplayable_beginner",
-                            "note_count": 0,
-                        }
-                    )
-                    continue
+                return None
+            lines.append(f"          <alter>{numToIntOrFloat(accidental.alter)}</alter>")
+        lines.append(f"          <octave>{p.implicitOctave}</octave>")
+        lines.append("        </pitch>")
+    lines.append(f"        <duration>{int(round(divisions * d.quarterLength))}</duration>")
+
+    tie_types: list[str] = []
+    if n.tie is not None:
+        if n.tie.style != "normal" or n.tie.placement is not None:
+            return None
+        tie_types = ["stop", "start"] if n.tie.type == "continue" else [n.tie.type]
+        lines.extend(f'        <tie type="{tie_type}" />' for tie_type in tie_types)
+    if not full_measure_rest:
+        lines.append(f"        <type>{escape(typeToMusicXMLType(d.type))}</type>")
+        lines.extend("        <dot />" for _ in range(d.dots))
+    if accidental is not None and accidental.displayStatus in (True, None):
+        lines.append(f"        <accidental>{_MUSICXML_ACCIDENTALS[accidental.name]}</accidental>")
+    if not is_rest:
+        if n.stemDirection != "unspecified":
+            stem = "none" if n.stemDirection == "noStem" else n.stemDirection
+            lines.append(f"        <stem>{stem}</stem>")
+        if n.beams is not None:
+            for beam_obj in n.beams.beamsList:
+                if not _has_plain_style(beam_obj) or _has_xml_id(beam_obj):
+                    return None
+                if beam_obj.type in _MUSICXML_BEAM_TYPES:
+                    beam_text = _MUSICXML_BEAM_TYPES[beam_obj.type]
+                elif beam_obj.type == "partial" and beam_obj.direction in ("left", "right"):
+                    beam_text = "backward hook" if beam_obj.direction == "left" else "forward hook"
+                else:
+                    return None
+                lines.append(f'        <beam number="{beam_obj.number}">{beam_text}</beam>')
+    if tie_types:
+        lines.append("        <notations>")
+        lines.extend(f'          <tied type="{tie_type}" />' for tie_type in tie_types)
+        lines.append("        </notations>")
+    lines.append("      </note>")
+    return lines
+
+
+def _monophonic_part_musicxml(part, title: str, composer: str) -> str | None:
+    """Serialize a prepared single-line part straight to MusicXML text.
+
+    Covers what the simplified single-line parts contain: measures of plain notes and
+    rests (ties across barlines, beams, stems, accidentals, hidden gap rests), metronome
+    marks, clef/key/time, the instrument transposition and the final barline, written
+    exactly as music21's exporter would. Returns None for anything else (chords, voices,
+    tuplets, spanners, lyrics, styling, ...) so the caller can fall back to music21.
+    """
+    import datetime
+    from xml.sax.saxutils import escape
+
+    from music21 import bar, clef, defaults, instrument, key, meter, note, spanner, stream, tempo
+    from music21.stream.enums import ShowNumber
+
+    if not title or not isinstance(composer, str):
+        return None
+    if part.hasStyleInformation or any(isinstance(el, spanner.Spanner) for el in part):
+        return None
+    instruments = part.getInstruments(returnDefault=True, recurse=True)
+    if len(instruments) != 1:
+        return None
+    inst = instruments[0]
+    inst_offset = instruments.elementOffset(inst)
+    if inst.partId is None:
+        inst.partIdRandomize()
+    if inst.midiChannel is None:
+        try:
+            inst.autoAssignMidiChannel(usedChannels=[])
+        except Exception:
+            return None
+    if inst.instrumentId is None:
+        inst.instrumentIdRandomize()
+    percussion = isinstance(inst, instrument.UnpitchedPercussion)
+
+    divisions = defaults.divisionsPerQuarter
+    body: list[str] = []
+    bar_length = None
+    for index, measure in enumerate(part.getElementsByClass(stream.Measure)):
+        if (
+            measure.hasStyleInformation
+            or measure.layoutWidth is not None
+            or measure.leftBarline is not None
+            or measure.duration.quarterLength <= 0
+            or _has_xml_id(measure)
+        ):
+            return None
+        measure_start = part.elementOffset(measure)
+        transposition = None
+        if measure_start <= inst_offset < measure_start + measure.duration.quarterLength:
+            transposition = inst.transposition
+        attributes = _measure_attributes_xml(measure, index == 0, transposition)
+        if attributes is None:
+            return None
+        if measure.timeSignature is not None:
+            bar_length = measure.timeSignature.barDuration.quarterLength
+
+        implicit = "yes" if measure.showNumber is ShowNumber.NEVER else "no"
+        comment = "Measure " + str(measure.number)
+        pad = max(0, 60 - len(comment))
+        body.append(f"    <!--{'=' * (pad // 2)} {comment} {'=' * (pad - pad // 2)}-->")
+        body.append(f'    <measure implicit="{implicit}" number="{measure.measureNumberWithSuffix()}">')
+        body.extend(attributes)
+
+        position = 0.0
+        group: list = []
+        group_offset = None
+        elements = [el for el in measure if not isinstance(el, (bar.Barline, instrument.Instrument))]
+        for element in elements + [None]:
+            element_offset = None if element is None else measure.elementOffset(element)
+            if group and (element is None or element_offset != group_offset):
+                gap = group_offset - position
+                if gap > 0 and any(isinstance(el, (note.GeneralNote, clef.Clef)) for el in group):
+                    forward = int(round(gap * divisions))
+                    if forward:
+                        body.extend(
+                            ["      <forward>", f"        <duration>{forward}</duration>", "      </forward>"]
+                        )
+                        position += gap
+                notes = []
+                for el in group:
+                    if type(el) in (note.Note, note.Rest):
+                        notes.append(el)
+                    elif isinstance(el, (clef.Clef, key.KeySignature, meter.TimeSignature)):
+                        # Only the start-of-measure attributes written above are supported.
+                        if group_offset != 0 or position != 0:
+                            return None
+                    elif isinstance(el, tempo.TempoIndication):
+                        if group_offset != position:
+                            return None
+                        direction = _metronome_xml(el)
+                        if direction is None:
+                            return None
+                        body.extend(direction)
+                    else:
+                        return None
+                for n in notes:
+                    note_lines = _note_xml(n, divisions, bar_length)
+                    if note_lines is None:
+                        return None
+                    body.extend(note_lines)
+                    position += n.duration.quarterLength
+                group = []
+            if element is not None:
+                group.append(element)
+                group_offset = element_offset
+
+        right_barline = measure.rightBarline
+        if right_barline is not None:
+            if isinstance(right_barline, bar.Repeat) or _has_xml_id(right_barline):
+                return None
+            body.extend(
+                [
+                    '      <barline location="right">',
+                    f"        <bar-style>{right_barline.musicXMLBarStyle()}</bar-style>",
+                    "      </barline>",
+                ]
+            )
+        body.append("    </measure>")
+    if not body:
+        return None
+
+    part_id = str(inst.partId)
+    instrument_id = str(inst.instrumentId)
+    header = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<!DOCTYPE score-partwise  PUBLIC "-//Recordare//DTD MusicXML '
+        f'{defaults.musicxmlVersion} Partwise//EN" "http://www.musicxml.org/dtds/partwise.dtd">',
+        f'<score-partwise version="{defaults.musicxmlVersion}">',
+        "  <work>",
+        f"    <work-title>{escape(title)}</work-title>",
+        "  </work>",
+        f"  <movement-title>{escape(title)}</movement-title>",
+        "  <identification>",
+        (
+            f'    <creator type="composer">{escape(composer)}</creator>'
+            if composer
+            else '    <creator type="composer" />'
+        ),
+        "    <encoding>",
+        f"      <encoding-date>{datetime.date.today()}</encoding-date>",
+        f"      <software>{escape(defaults.software)}</software>",
+        '      <supports element="beam" type="yes" />',
+        '      <supports element="stem" type="yes" />',
+        '      <supports element="accidental" type="yes" />',
+        "    </encoding>",
+        "  </identification>",
+        "  <defaults>",
+        "    <scaling>",
+        f"      <millimeters>{defaults.scalingMillimeters}</millimeters>",
+        f"      <tenths>{defaults.scalingTenths}</tenths>",
+        "    </scaling>",
+        "  </defaults>",
+        "  <part-list>",
+        f'    <score-part id="{part_id}">',
+        f"      <part-name>{escape(part.partName if part.partName is not None else defaults.partName)}</part-name>",
+    ]
+    if part.partAbbreviation is not None:
+        header.append(f"      <part-abbreviation>{escape(part.partAbbreviation)}</part-abbreviation>")
+    if inst.instrumentName is not None or inst.instrumentAbbreviation is not None or inst.midiProgram is not None:
+        header.append(f'      <score-instrument id="{instrument_id}">')
+        header.append(f"        <instrument-name>{escape(str(inst.instrumentName))}</instrument-name>")
+        if inst.instrumentAbbreviation is not None:
+            header.append(
+                f"        <instrument-abbreviation>{escape(str(inst.instrumentAbbreviation))}</instrument-abbreviation>"
+            )
+        header.append("      </score-instrument>")
+    if inst.midiProgram is not None or percussion:
+        header.append(f'      <midi-instrument id="{instrument_id}">')
+        header.append(f"        <midi-channel>{inst.midiChannel + 1}</midi-channel>")
+        if inst.midiProgram is not None:
+            header.append(f"        <midi-program>{inst.midiProgram + 1}</midi-program>")
+        if percussion and inst.percMapPitch is not None:
+            header.append(f"        <midi-unpitched>{inst.percMapPitch + 1}</midi-unpitched>")
+        header.append("      </midi-instrument>")
+    header.extend(
+        [
+            "    </score-part>",
+            "  </part-list>",
+            "  <!--=========================== Part 1 ===========================-->",
+            f'  <part id="{part_id}">',
+        ]
+    )
+    return "\n".join([*header, *body, "  </part>", "</score-partwise>"])
+
+
+def _write_part_musicxml(score_obj, path: Path, title: str, composer: str) -> str:
+    """Write a single-part export score as MusicXML, consuming it; returns the writer used.
+
+    Parts `_monophonic_part_musicxml` covers are streamed as text ("direct"); anything
+    else goes through music21's exporter on the already-prepared score ("music21").
+    """
+    _prepare_part_export(score_obj)
+    xml_text = _monophonic_part_musicxml(score_obj.parts[0], title, composer)
+    if xml_text is not None:
+        Path(path).write_text(xml_text, encoding="utf-8")
+        return "direct"
+    with warnings.catch_warnings():
+        _suppress_known_music21_warnings()
+        score_obj.write("musicxml", fp=str(path), makeNotation=False)
+    return "music21"
+
+
+def _build_part(job: dict) -> dict:
+    """Clean, transpose and export one assigned stem for `build_score`.
+
+    `job["parsed"]` is the stem's (frozen score, note events) parsed-MIDI cache entry, or
+    None to parse the MIDI here; with `job["return_parsed"]` set, that fresh parse comes
+    back as `result["parsed"]` for the caller to cache. The result holds either
+    `concert_part` and the written `part_xml` path, or a `skipped` part entry; with
+    `job["metrics_only"]` it stops after cleanup and holds the line's `metrics` instead.
+    """
+    import copy
 
-        # Concert-pitch copy for the full score
-        concert_part = copy.deepcopy(part_stream)
+    from music21 import interval, metadata, stream
+
+    instrument_name = job["instrument_name"]
+    part_label = job["part_label"]
+    options = job["options"]
+    engine = job["engine"]
+    simplify_enabled = bool(options.get("simplify_enabled", False))
+    result: dict = {"label": part_label, "family": _line_family(instrument_name), "cleanup_s": None}
+
+    single_line = (
+        _is_woodwind_target(instrument_name)
+        or _is_percussion_target(instrument_name)
+        or _is_low_brass_target(instrument_name)
+    )
+    recorder = _new_pass_recorder(part_label, trace=bool(job.get("trace")))
+    result["passes"] = recorder
+    grid = str(options.get("quantize_grid", "1/8"))
+
+    def _regularize(target) -> None:
+        # Woodwind/percussion lines snap to the grid; other lines keep one voice per measure.
+        if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name):
+            with _timed_pass(recorder, "normalize_grid", lambda: target):
+                _normalize_part_grid(target, grid)
+        else:
+            with _timed_pass(recorder, "flatten_voices", lambda: target):
+                _flatten_part_to_primary_voice(target)
+            with _timed_pass(recorder, "rebalance_measures", lambda: target):
+                _rebalance_measure_durations(target)
+
+    parsed_entry = job.get("parsed")
+    parsed_score = None
+    if parsed_entry is None:
+        return_parsed = bool(job.get("return_parsed"))
+        with _timed_pass(recorder, "parse_midi"):
+            parsed_score = _parse_midi_file(Path(job["midi_path"]), store_pickle=not return_parsed)
+            if return_parsed:
+                parsed_entry = _freeze_parsed_midi(parsed_score)
+                result["parsed"] = parsed_entry
+                parsed_score = None
+
+    part_stream = None
+    events_cleanup_s = 0.0
+    if simplify_enabled and single_line and engine == "events":
+        # Note-event cleanup rebuilds the whole part, so the cached events are enough.
+        if parsed_entry is not None:
+            events = None if parsed_entry[1] is None else parsed_entry[1].copy()
+        else:
+            events = note_events_from_part(parsed_score.parts[0] if parsed_score.parts else parsed_score)
+        if events is not None:
+            cleanup_started = time.perf_counter()
+            with _timed_pass(recorder, "events_cleanup", lambda: part_stream):
+                part_stream = _single_line_part_from_events(events, instrument_name, options)
+            events_cleanup_s = time.perf_counter() - cleanup_started
+
+    def _reload_part(labelled: bool = True):
+        # Over-pruned fallbacks re-derive the untouched part instead of keeping a deepcopy.
+        if parsed_entry is not None:
+            reloaded = _thaw_stream(parsed_entry[0])
+        else:
+            reloaded = _parse_midi_file(Path(job["midi_path"]))
+        reloaded = reloaded.parts[0] if reloaded.parts else reloaded
+        if labelled:
+            reloaded.partName = part_label
+            reloaded.partAbbreviation = part_label
+        return reloaded
+
+    cleaned_from_events = part_stream is not None
+    if part_stream is None:
+        if parsed_score is None:
+            with _timed_pass(recorder, "thaw_midi"):
+                parsed_score = _thaw_stream(parsed_entry[0])
+        part_stream = parsed_score.parts[0] if parsed_score.parts else parsed_score
+    part_stream.partName = part_label
+    part_stream.partAbbreviation = part_label
+
+    if simplify_enabled:
+        cleanup_started = time.perf_counter()
+        if single_line:
+            if not cleaned_from_events:
+                with _timed_pass(recorder, "clean_single_line", lambda: part_stream):
+                    part_stream = _clean_single_line_part(
+                        part_stream, instrument_name, options, engine=engine, reload=_reload_part,
+                    )
+        else:
+            with _timed_pass(recorder, "simplify", lambda: part_stream):
+                _simplify_part(part_stream, options, engine=engine)
+                if len(list(part_stream.recurse().notes)) == 0:
+                    # Fallback for over-pruned streams: keep the original MIDI content.
+                    part_stream = _reload_part(labelled=False)
+
+        _regularize(part_stream)
+        result["cleanup_s"] = events_cleanup_s + time.perf_counter() - cleanup_started
+        if _is_beginner_profile(options) and not any(
+            token in instrument_name for token in ("Snare", "Bass Drum", "Percussion")
+        ):
+            with _timed_pass(recorder, "beginner_filter", lambda: part_stream):
+                metrics = _apply_beginner_melody_filter(part_stream, engine)
+            limits = _beginner_playability_thresholds(instrument_name)
+            if (
+                metrics["note_count"] > 0
+                and (
+                    metrics["accidental_density"] > limits["accidental_density"]
+                    or metrics["large_leap_rate"] > limits["large_leap_rate"]
+                    or metrics["short_note_rate"] > limits["short_note_rate"]
+                )
+            ):
+                result["skipped"] = {
+                    "name": part_label,
+                    "status": "skipped",
+                    "reason": "unplayable_beginner",
+                    "note_count": 0,
+                }
+                if job.get("metrics_only"):
+                    result["metrics"] = metrics
+                return result
+
+    if job.get("metrics_only"):
+        # Simplification sweeps only need the cleaned line, not the transposed export.
+        result["metrics"] = _playability_metrics(part_stream, engine)
+        return result
+
+    # The cleaned part itself becomes the concert-pitch part for the full score, so the
+    # transposed part export is the only copy taken.
+    with _timed_pass(recorder, "copy_part"):
+        transposed_part = copy.deepcopy(part_stream)
+    concert_part = part_stream
+    concert_key = None
+    with _timed_pass(recorder, "key_and_clef", lambda: concert_part):
         if _is_percussion_target(instrument_name):
             _force_fixed_percussion_pitch(concert_part, "C5")
         elif _is_woodwind_target(instrument_name):
-            _insert_guarded_key_signature(concert_part)
+            concert_key = _insert_guarded_key_signature(concert_part, engine=engine)
         _apply_instrument_and_clef(concert_part, instrument_name)
-        score.insert(0, concert_part)
+    result["concert_part"] = concert_part
 
-        # Transposed copy for the individual part export
-        semitones = int(INSTRUMENT_SPECS.get(instrument_name, 0))
-        transposed_part = copy.deepcopy(part_stream)
+    # Transposed variant for the individual part export
+    semitones = int(INSTRUMENT_SPECS.get(instrument_name, 0))
+    with _timed_pass(recorder, "transpose", lambda: transposed_part):
         if semitones:
             transposed_part.transpose(interval.Interval(semitones), inPlace=True)
         _clamp_written_part_range(transposed_part, instrument_name)
+    with _timed_pass(recorder, "key_and_clef", lambda: transposed_part):
         if _is_percussion_target(instrument_name):
             _force_fixed_percussion_pitch(transposed_part, "C5")
         elif _is_woodwind_target(instrument_name):
-            _insert_guarded_key_signature(transposed_part)
+            # Octave folding keeps pitch classes, so the written key is the concert key shifted.
+            _insert_guarded_key_signature(
+                transposed_part, _transpose_key_estimate(concert_key, semitones), engine=engine
+            )
         _apply_instrument_and_clef(transposed_part, instrument_name)
-        if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name):
-            _normalize_part_grid(transposed_part, str(options.get("quantize_grid", "1/8")))
-        else:
-            _flatten_part_to_primary_voice(transposed_part)
-            _rebalance_measure_durations(transposed_part)
+    _regularize(transposed_part)
+    with _timed_pass(recorder, "make_notation", lambda: transposed_part):
         with warnings.catch_warnings():
             _suppress_known_music21_warnings()
-            transposed_part = transposed_part.makeNotation(inPlace=False)
-        if _is_woodwind_target(instrument_name) or _is_percussion_target(instrument_name):
-            _normalize_part_grid(transposed_part, str(options.get("quantize_grid", "1/8")))
+            transposed_part.makeNotation(inPlace=True)
+    _regularize(transposed_part)
+
+    part_export_score = stream.Score(id=f"part-{sanitize_filename(part_label)}")
+    part_export_score.metadata = metadata.Metadata()
+    part_export_score.metadata.title = options.get("title", "Untitled")
+    part_export_score.metadata.composer = options.get("composer", "")
+    part_export_score.insert(0, transposed_part)
+
+    part_xml = Path(job["part_dir"]) / f"{sanitize_filename(part_label)}.musicxml"
+    prepared = simplify_enabled and PART_EXPORT_WRITER == "direct"
+    with _timed_pass(recorder, "part_export"):
+        if prepared:
+            # Simplified single-line parts skip music21's exporter (and its deep copy).
+            result["part_writer"] = _write_part_musicxml(
+                part_export_score, part_xml, options.get("title", "Untitled"), options.get("composer", ""),
+            )
+        else:
+            part_export_score.write("musicxml", fp=str(part_xml))
+            result["part_writer"] = "music21"
+    result["part_xml"] = str(part_xml)
+    if job.get("return_stage"):
+        from music21 import freezeThaw
+
+        # The export score is not used after writing, so it is frozen without a copy.
+        result["stage_export"] = freezeThaw.StreamFreezer(
+            part_export_score, fastButUnsafe=True
+        ).writeStr(fmt="pickle")
+        result["stage_prepared"] = prepared
+    return result
+
+
+def _build_part_in_worker(job: dict) -> dict:
+    """`_build_part` for a pool worker: the concert part travels back frozen.
+
+    With `job["profile_path"]` set, the build runs under cProfile and dumps its stats there.
+    """
+    from music21 import freezeThaw
+
+    if job.get("profile_path"):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(_build_part, job)
+        finally:
+            profiler.dump_stats(job["profile_path"])
+    else:
+        result = _build_part(job)
+    concert_part = result.pop("concert_part", None)
+    if concert_part is not None:
+        result["concert_frozen"] = freezeThaw.StreamFreezer(
+            concert_part, fastButUnsafe=True
+        ).writeStr(fmt="pickle")
+    return result
+
+
+def _build_failed_entry(part_label: str, exc: BaseException) -> dict:
+    return {
+        "name": part_label,
+        "status": "skipped",
+        "reason": "build_failed",
+        "note_count": 0,
+        "error": f"{type(exc).__name__}: {exc}",
+    }
+
+
+def _build_parts_in_pool(jobs: list[dict], workers: int) -> list[dict]:
+    """Run `_build_part` for every job on a process pool; results keep job order."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    results: list[dict] = []
+    # spawn: the app process runs Streamlit threads, which fork() must not inherit.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [pool.submit(_build_part_in_worker, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {"label": job["part_label"], "skipped": _build_failed_entry(job["part_label"], exc)}
+            if "concert_frozen" in result:
+                frozen = result.pop("concert_frozen")
+                result["concert_part"] = _thaw_stream(frozen)
+                if job.get("return_stage"):
+                    result["stage_concert"] = frozen
+            results.append(result)
+    return results
+
+
+# --- Part-stage cache ---
+# Quick Reruns mostly rebuild the same parts under a new title, composer or school. Each
+# built part is kept frozen (cleaned concert part plus its written-part export score) with
+# the part MusicXML it produced, keyed by MIDI content hash, instrument, part label,
+# cleanup engine, part writer and the options cleanup reads; score metadata is not in the
+# key. A hit skips the part build, and also the part export when title and composer match.
+_PART_STAGE_LOCK = threading.Lock()
+_PART_STAGE_ENTRIES: OrderedDict[tuple, dict] = OrderedDict()
+_PART_STAGE_OPTION_KEYS = (
+    "simplify_enabled", "profile", "quantize_grid", "min_note_duration_beats", "density_threshold",
+)
+
+
+def _part_stage_key(digest: str, job: dict) -> tuple:
+    options = job["options"]
+    return (
+        digest,
+        job["instrument_name"],
+        job["part_label"],
+        job["engine"],
+        PART_EXPORT_WRITER,
+        tuple(str(options.get(name, "")) for name in _PART_STAGE_OPTION_KEYS),
+    )
+
+
+def _part_metadata_key(options: dict) -> tuple[str, str]:
+    return str(options.get("title", "Untitled")), str(options.get("composer", ""))
+
+
+def _lookup_part_stage(stage_key: tuple, cache_stats: dict | None) -> dict | None:
+    with _PART_STAGE_LOCK:
+        entry = _PART_STAGE_ENTRIES.get(stage_key)
+        if entry is not None:
+            _PART_STAGE_ENTRIES.move_to_end(stage_key)
+    record_cache_event(cache_stats, "part_stages", entry is not None)
+    return entry
+
+
+def _store_part_stage(stage_key: tuple, entry: dict) -> None:
+    size = sum(len(entry.get(name) or b"") for name in ("concert", "export", "xml_text"))
+    if size > PART_STAGE_CACHE_MAX_BYTES:
+        return
+    with _PART_STAGE_LOCK:
+        _PART_STAGE_ENTRIES[stage_key] = dict(entry, size=size)
+        total = sum(item["size"] for item in _PART_STAGE_ENTRIES.values())
+        while total > PART_STAGE_CACHE_MAX_BYTES and len(_PART_STAGE_ENTRIES) > 1:
+            _, evicted = _PART_STAGE_ENTRIES.popitem(last=False)
+            total -= evicted["size"]
+
+
+def _part_stage_entry(result: dict, options: dict) -> dict | None:
+    """Cache entry for a fresh `_build_part` result (popping its stage fields), or None."""
+    concert = result.pop("stage_concert", None)
+    export = result.pop("stage_export", None)
+    prepared = result.pop("stage_prepared", False)
+    if "skipped" in result:
+        if result["skipped"].get("reason") == "build_failed":
+            return None
+        return {"family": result["family"], "skipped": dict(result["skipped"])}
+    if concert is None or export is None:
+        return None
+    return {
+        "family": result["family"],
+        "concert": concert,
+        "export": export,
+        "prepared": prepared,
+        "part_writer": result["part_writer"],
+        "metadata": _part_metadata_key(options),
+        "xml_text": Path(result["part_xml"]).read_text(encoding="utf-8"),
+    }
+
+
+def _reuse_part_stage(entry: dict, job: dict) -> tuple[dict, list[str]]:
+    """Rebuild a `_build_part` result from a cached part stage.
+
+    Returns the result and the stages it reused: "part_build" (parse, cleanup,
+    transposition) always, plus "part_export" when the cached part MusicXML already
+    carries this job's title and composer; otherwise the cached export score is
+    written again under the new metadata.
+    """
+    result: dict = {"label": job["part_label"], "family": entry["family"], "cleanup_s": None}
+    if "skipped" in entry:
+        result["skipped"] = dict(entry["skipped"])
+        return result, ["part_build"]
+
+    options = job["options"]
+    part_xml = Path(job["part_dir"]) / f"{sanitize_filename(job['part_label'])}.musicxml"
+    title, composer = _part_metadata_key(options)
+    reused = ["part_build"]
+    if entry["metadata"] == (title, composer):
+        part_xml.write_text(entry["xml_text"], encoding="utf-8")
+        reused.append("part_export")
+        result["part_writer"] = entry["part_writer"]
+    else:
+        score_obj = _thaw_stream(entry["export"])
+        score_obj.metadata.title = title
+        score_obj.metadata.composer = composer
+        xml_text = None
+        if entry["part_writer"] == "direct":
+            xml_text = _monophonic_part_musicxml(score_obj.parts[0], title, composer)
+        if xml_text is not None:
+            part_xml.write_text(xml_text, encoding="utf-8")
         else:
-            _flatten_part_to_primary_voice(transposed_part)
-            _rebalance_measure_durations(transposed_part)
+            with warnings.catch_warnings():
+                _suppress_known_music21_warnings()
+                score_obj.write("musicxml", fp=str(part_xml), makeNotation=not entry["prepared"])
+        result["part_writer"] = entry["part_writer"]
+        result["stage_metadata"] = (title, composer)
+    result["concert_part"] = _thaw_stream(entry["concert"])
+    result["part_xml"] = str(part_xml)
+    return result, reused
+
+
+def clear_part_stage_cache() -> None:
+    with _PART_STAGE_LOCK:
+        _PART_STAGE_ENTRIES.clear()
+
+
+def _score_build_jobs(
+    midis: dict[str, str], assignment: dict[str, str], options: dict, part_dir: Path,
+) -> list[dict]:
+    """One `_build_part` job per assigned stem, in stem order."""
+    instrument_counts: dict[str, int] = {}
+    jobs: list[dict] = []
+    for stem_name, midi_path in midis.items():
+        instrument_name = assignment.get(stem_name, "").strip()
+        if not instrument_name:
+            continue
 
-        part_export_score = stream.Score(id=f"part-{sanitize_filename(part_label)}")
-        part_export_score.metadata = metadata.Metadata()
-        part_export_score.metadata.title = options.get("title", "Untitled")
-        part_export_score.metadata.composer = options.get("composer", "")
-        part_export_score.insert(0, transposed_part)
+        # Disambiguate when multiple stems share the same instrument
+        instrument_counts[instrument_name] = instrument_counts.get(instrument_name, 0) + 1
+        count = instrument_counts[instrument_name]
+        part_label = instrument_name if count == 1 else f"{instrument_name} ({count})"
+        jobs.append(
+            {
+                "midi_path": str(midi_path),
+                "instrument_name": instrument_name,
+                "part_label": part_label,
+                "options": dict(options),
+                "part_dir": str(part_dir),
+                "engine": SIMPLIFY_ENGINE,
+                "parsed": None,
+                "return_parsed": False,
+            }
+        )
+    return jobs
 
-        part_xml = part_dir / f"{sanitize_filename(part_label)}.musicxml"
-        part_export_score.write("musicxml", fp=str(part_xml))
-        transposed_parts[part_label] = str(part_xml)
+
+def evaluate_simplification(
+    midis: dict[str, str], assignment: dict[str, str], options: dict,
+    cache_stats: dict | None = None,
+) -> list[dict]:
+    """Run `build_score`'s per-part cleanup for one option set, without exporting anything.
+
+    Parts go through the same parse, cleanup and Beginner playability gate as a real
+    build, but stop before transposition and MusicXML. Returns one row per assigned
+    part with its label, instrument, cleanup family, `status` (`kept` or `skipped`),
+    skip `reason`, the `_playability_metrics` of the cleaned line, and `cleanup_s` /
+    `wall_s` timings. Parsed MIDI comes from the process-wide parsed-MIDI cache.
+    """
+    rows: list[dict] = []
+    for job in _score_build_jobs(midis, assignment, options, TEMP_DIR):
+        job["metrics_only"] = True
+        started = time.perf_counter()
+        try:
+            if PARSED_MIDI_CACHE_ENABLED:
+                job["parsed"] = _parsed_midi_entry(job["midi_path"], cache_stats)
+            result = _build_part(job)
+        except Exception as exc:
+            result = {
+                "family": _line_family(job["instrument_name"]),
+                "skipped": _build_failed_entry(job["part_label"], exc),
+            }
+        row = {
+            "part": job["part_label"],
+            "instrument": job["instrument_name"],
+            "family": result["family"],
+            "status": "skipped" if "skipped" in result else "kept",
+            "reason": str((result.get("skipped") or {}).get("reason", "")),
+            "error": str((result.get("skipped") or {}).get("error", "")),
+            "cleanup_s": None if result.get("cleanup_s") is None else round(result["cleanup_s"], 4),
+            "wall_s": round(time.perf_counter() - started, 4),
+        }
+        row.update(result.get("metrics") or {})
+        rows.append(row)
+    return rows
+
+
+def build_score(
+    midis: dict[str, str], assignment: dict[str, str], options: dict,
+    run_dir: Path | None = None,
+    timings: dict | None = None,
+    cache_stats: dict | None = None,
+    max_workers: int | str | None = None,
+) -> dict[str, str | dict[str, str]]:
+    """Build concert-pitch full score and transposed individual part MusicXML files.
+
+    Returns dict with keys:
+        "full_score": path to concert-pitch MusicXML
+        "parts": dict mapping part_name -> transposed part MusicXML path
+        "skipped_parts": part entries that were not exported
+
+    Parts are cleaned, transposed and written independently, on a process pool when
+    `score_build_worker_count` allows more than one worker; only padding, measure
+    alignment and the full-score write run in this process. Parts keep stem order,
+    and a stem whose build raises is skipped with reason `build_failed` instead of
+    aborting the others.
+
+    Parts found in the part-stage cache (same MIDI, instrument and cleanup options as an
+    earlier build in this process) are not rebuilt; see `_reuse_part_stage`.
+
+    When `timings` is given, records `timings["score_build"]` with per-family cleanup time,
+    the stages each reused part skipped, and wall time, call count and note count for every
+    timed pass (`passes` summed over the build, `parts` per built part). SCORE_BUILD_PROFILE
+    additionally writes a cProfile dump or a Chrome trace into the run directory.
+    """
+    workdir = run_dir or TEMP_DIR
+    if SCORE_BUILD_PROFILE != "cprofile":
+        return _build_score(midis, assignment, options, workdir, timings, cache_stats, max_workers)
+
+    import cProfile
+
+    _ensure_dirs()
+    workdir.mkdir(parents=True, exist_ok=True)
+    profile_path = workdir / "score_build.prof"
+    profiler = cProfile.Profile()
+    try:
+        score_data = profiler.runcall(
+            _build_score, midis, assignment, options, workdir, timings, cache_stats, max_workers
+        )
+    finally:
+        profiler.dump_stats(str(profile_path))
+    if timings is not None:
+        timings["score_build"]["profile"] = str(profile_path)
+    return score_data
+
+
+def _build_score(
+    midis: dict[str, str], assignment: dict[str, str], options: dict,
+    workdir: Path,
+    timings: dict | None,
+    cache_stats: dict | None,
+    max_workers: int | str | None,
+) -> dict[str, str | dict[str, str]]:
+    from music21 import expressions, metadata, stream
+
+    _ensure_dirs()
+    started = time.perf_counter()
+    score = stream.Score(id="btt-score")
+    score.metadata = metadata.Metadata()
+    score.metadata.title = options.get("title", "Untitled")
+    score.metadata.composer = options.get("composer", "")
+
+    disclaimer = create_disclaimer_text(options.get("school", ""))
+
+    part_dir = workdir / "part_exports"
+    part_dir.mkdir(parents=True, exist_ok=True)
+    transposed_parts: dict[str, str] = {}
+    skipped_parts: list[dict] = []
+    cleanup_by_family: dict[str, dict] = {}
+
+    jobs = _score_build_jobs(midis, assignment, options, part_dir)
+    for job in jobs:
+        job["trace"] = SCORE_BUILD_PROFILE == "trace"
+
+    # Quick Reruns reuse cached part stages; only parts whose inputs changed are built.
+    reused_stages: dict[str, list[str]] = {}
+    reused_results: dict[int, dict] = {}
+    stage_keys: dict[int, tuple] = {}
+    if PART_STAGE_CACHE_ENABLED:
+        for index, job in enumerate(jobs):
+            try:
+                stage_key = _part_stage_key(_midi_content_digest(Path(job["midi_path"])), job)
+            except OSError:
+                continue
+            stage_keys[index] = stage_key
+            entry = _lookup_part_stage(stage_key, cache_stats)
+            if entry is None:
+                job["return_stage"] = True
+                continue
+            reused_results[index], reused_stages[job["part_label"]] = _reuse_part_stage(entry, job)
+            if "stage_metadata" in reused_results[index]:
+                metadata_key = reused_results[index].pop("stage_metadata")
+                xml_text = Path(reused_results[index]["part_xml"]).read_text(encoding="utf-8")
+                _store_part_stage(stage_key, dict(entry, metadata=metadata_key, xml_text=xml_text))
+    build_jobs = [job for index, job in enumerate(jobs) if index not in reused_results]
+
+    workers = score_build_worker_count(len(build_jobs), max_workers)
+    if workers > 1:
+        digests: list[str | None] = []
+        for job in build_jobs:
+            if SCORE_BUILD_PROFILE == "cprofile":
+                # The parent's profile only sees the pool waiting; each worker dumps its own.
+                job["profile_path"] = str(workdir / f"score_build_{sanitize_filename(job['part_label'])}.prof")
+            digest = None
+            if PARSED_MIDI_CACHE_ENABLED:
+                try:
+                    digest = _midi_content_digest(Path(job["midi_path"]))
+                except OSError:
+                    digest = None
+            if digest is not None:
+                job["parsed"] = _lookup_parsed_midi(digest, cache_stats)
+                job["return_parsed"] = job["parsed"] is None
+            digests.append(digest)
+        built = _build_parts_in_pool(build_jobs, workers)
+        for digest, result in zip(digests, built):
+            if digest is not None and "parsed" in result:
+                _store_parsed_midi(digest, *result["parsed"])
+    else:
+        from music21 import freezeThaw
+
+        built = []
+        for job in build_jobs:
+            try:
+                if PARSED_MIDI_CACHE_ENABLED:
+                    job["parsed"] = _parsed_midi_entry(job["midi_path"], cache_stats)
+                result = _build_part(job)
+                if job.get("return_stage") and "concert_part" in result:
+                    # Freezing without a copy and thawing is cheaper than freezeThaw's deepcopy.
+                    result["stage_concert"] = freezeThaw.StreamFreezer(
+                        result["concert_part"], fastButUnsafe=True
+                    ).writeStr(fmt="pickle")
+                    result["concert_part"] = _thaw_stream(result["stage_concert"])
+                built.append(result)
+            except Exception as exc:
+                built.append({"label": job["part_label"], "skipped": _build_failed_entry(job["part_label"], exc)})
+
+    built_iter = iter(built)
+    results = []
+    for index, job in enumerate(jobs):
+        if index in reused_results:
+            results.append(reused_results[index])
+            continue
+        result = next(built_iter)
+        entry = _part_stage_entry(result, job["options"]) if job.get("return_stage") else None
+        if entry is not None:
+            _store_part_stage(stage_keys[index], entry)
+        results.append(result)
+
+    part_writers: dict[str, int] = {}
+    recorders: list[dict] = []
+    pass_totals: dict[str, dict] = {}
+    for result in results:
+        if result.get("passes") is not None:
+            recorders.append(result.pop("passes"))
+            _merge_pass_timings(pass_totals, recorders[-1]["passes"])
+        if result.get("cleanup_s") is not None:
+            family_timing = cleanup_by_family.setdefault(result["family"], {"parts": 0, "cleanup_s": 0.0})
+            family_timing["parts"] += 1
+            family_timing["cleanup_s"] += result["cleanup_s"]
+        if "skipped" in result:
+            skipped_parts.append(result["skipped"])
+            continue
+        score.insert(0, result["concert_part"])
+        transposed_parts[result["label"]] = result["part_xml"]
+        part_writers[result["part_writer"]] = part_writers.get(result["part_writer"], 0) + 1
 
     if not score.parts:
+        failures = [item["error"] for item in skipped_parts if item.get("reason") == "build_failed"]
+        if failures:
+            raise RuntimeError(f"No assigned parts could be built: {failures[0]}")
         raise RuntimeError("No assigned parts produced notes. Check assignments and inputs.")
 
     if disclaimer:
         score.insert(0, expressions.TextExpression(disclaimer))
-    _pad_parts_to_common_length(score, str(options.get("quantize_grid", "1/8")))
-    _align_score_measures(score)
-    with warnings.catch_warnings():
-        _suppress_known_music21_warnings()
-        score = score.makeNotation(inPlace=False)
-    _pad_parts_to_common_length(score, str(options.get("quantize_grid", "1/8")))
-    _align_score_measures(score)
-    with warnings.catch_warnings():
-        _suppress_known_music21_warnings()
-        score = score.makeNotation(inPlace=False)
+    score_recorder = _new_pass_recorder("score", trace=SCORE_BUILD_PROFILE == "trace")
+    _assemble_full_score(score, str(options.get("quantize_grid", "1/8")), score_recorder)
     full_score_path = workdir / f"{sanitize_filename(options.get('title', 'score'))}.musicxml"
-    score.write("musicxml", fp=str(full_score_path))
+    with _timed_pass(score_recorder, "full_score_write"):
+        score.write("musicxml", fp=str(full_score_path))
+    _merge_pass_timings(pass_totals, score_recorder["passes"])
+    trace_path = None
+    if SCORE_BUILD_PROFILE == "trace":
+        trace_path = workdir / "score_build_trace.json"
+        _write_chrome_trace(trace_path, [score_recorder, *recorders])
+    if timings is not None:
+        timings["score_build"] = {
+            "engine": SIMPLIFY_ENGINE,
+            "workers": workers,
+            "total_s": round(time.perf_counter() - started, 3),
+            "families": {
+                family: {"parts": entry["parts"], "cleanup_s": round(entry["cleanup_s"], 3)}
+                for family, entry in sorted(cleanup_by_family.items())
+            },
+            "part_writers": dict(sorted(part_writers.items())),
+            "reused_stages": reused_stages,
+            "passes": _rounded_pass_timings(pass_totals),
+            "parts": {recorder["label"]: _rounded_pass_timings(recorder["passes"]) for recorder in recorders},
+        }
+        if trace_path is not None:
+            timings["score_build"]["profile"] = str(trace_path)
     return {"full_score": str(full_score_path), "parts": transposed_parts, "skipped_parts": skipped_parts}
 
 
-def render_pdfs(score_data: dict[str, str | dict[str, str]], run_id: str | None = None) -> dict:
+def _render_failed_entry(part_name: str, note_count: int, error: str) -> dict:
+    return {
+        "name": part_name,
+        "status": "skipped",
+        "reason": "render_failed",
+        "note_count": note_count,
+        "error": error,
+    }
+
+
+def _render_musescore_batch(jobs: list[tuple[Path, Path]], job_path: Path) -> None:
+    """Convert every (MusicXML, PDF) pair in one MuseScore process through a `-j` job file.
+
+    MuseScore may stop at the first bad file or exit non-zero after converting the rest,
+    so the exit status is not trusted: callers check which PDFs were written.
+    """
+    import json
+
+    for _, pdf in jobs:
+        pdf.unlink(missing_ok=True)  # stale PDFs from an earlier render must not count as output
+    job_path.write_text(
+        json.dumps([{"in": str(source.resolve()), "out": str(pdf.resolve())} for source, pdf in jobs], indent=2),
+        encoding="utf-8",
+    )
+    try:
+        subprocess.run(
+            [MUSESCORE_CMD, "-j", str(job_path)],
+            capture_output=True, text=True, timeout=MUSESCORE_TIMEOUT_S * len(jobs),
+        )
+    except subprocess.TimeoutExpired:
+        pass  # killed; whatever it did not write is retried per file
+
+
+@functools.lru_cache(maxsize=None)
+def _musescore_version(cmd: str) -> str:
+    """First line of `<cmd> --version`, memoized per command; "" when MuseScore cannot say."""
+    try:
+        result = subprocess.run([cmd, "--version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    if result.returncode != 0:
+        return ""
+    return (result.stdout or result.stderr or "").strip().split("\n")[0]
+
+
+_MUSICXML_ENCODING_DATE = re.compile(rb"<encoding-date>[^<]*</encoding-date>")
+_MUSICXML_ID_ATTR = re.compile(rb'\bid="([^"]*)"')
+
+
+def _render_cache_key(xml_path: Path) -> str:
+    """Key one PDF on its MusicXML content and the MuseScore version.
+
+    Every build stamps today's encoding date and generates fresh part/instrument ids, none of
+    which reach the engraving, so the date is dropped and ids are renumbered in order of
+    appearance before hashing. Returns "" (no caching) when the MuseScore version is unknown.
+    """
+    version = _musescore_version(MUSESCORE_CMD)
+    if not version:
+        return ""
+    ids: dict[bytes, bytes] = {}
+
+    def _renumber(match: re.Match) -> bytes:
+        original = match.group(1)
+        if original not in ids:
+            ids[original] = b"%d" % len(ids)
+        return b'id="' + ids[original] + b'"'
+
+    canonical = _MUSICXML_ID_ATTR.sub(_renumber, _MUSICXML_ENCODING_DATE.sub(b"", xml_path.read_bytes()))
+    return hash_text_sha256(f"render|{hashlib.sha256(canonical).hexdigest()}|{version}")
+
+
+def _restore_cached_pdf(cache_key: str, pdf_path: Path) -> bool:
+    """Hard-link a cached PDF into place (copying where links are unsupported)."""
+    if not RENDER_CACHE_ENABLED or not cache_key:
+        return False
+    entry = lookup_cache_entry(RENDER_CACHE_DIR, cache_key, ["render.pdf"])
+    if entry is None:
+        return False
+    try:
+        link_or_copy_file(entry / "render.pdf", pdf_path)
+    except OSError:
+        return False
+    return True
+
+
+def _store_cached_pdfs(rendered: dict[str, Path], keep_keys: tuple[str, ...]) -> None:
+    """Commit freshly rendered PDFs (cache key -> PDF), then trim the cache to its budget."""
+    if not RENDER_CACHE_ENABLED or not rendered:
+        return
+    try:
+        for cache_key, pdf_path in rendered.items():
+            commit_cache_entry(
+                RENDER_CACHE_DIR,
+                cache_key,
+                {"render.pdf": pdf_path},
+                metadata={"musescore_version": _musescore_version(MUSESCORE_CMD), "pdf": pdf_path.name},
+            )
+        evict_cache_lru(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES, keep_keys=keep_keys)
+    except OSError:
+        pass
+
+
+def render_worker_count(pdf_count: int, max_workers: int | str | None = None) -> int:
+    """Number of concurrent per-file `mscore` processes for `pdf_count` PDFs.
+
+    Bounded like `transcription_worker_count`, using `MUSESCORE_MAX_WORKERS` and
+    `MUSESCORE_WORKER_MEMORY_MB`.
+    """
+    requested = MUSESCORE_MAX_WORKERS if max_workers is None else max_workers
+    if requested == "auto":
+        workers = os.cpu_count() or 1
+    else:
+        workers = int(requested)
+    workers = min(max(1, workers), max(1, pdf_count))
+    available_mb = _available_memory_mb()
+    if available_mb is not None and MUSESCORE_WORKER_MEMORY_MB > 0:
+        workers = min(workers, max(1, int(available_mb // MUSESCORE_WORKER_MEMORY_MB)))
+    return workers
+
+
+def render_pdfs(
+    score_data: dict[str, str | dict[str, str]],
+    run_id: str | None = None,
+    timings: dict | None = None,
+    max_workers: int | str | None = None,
+    cache_stats: dict | None = None,
+) -> dict:
     """Render full-score PDF (concert pitch) and transposed part PDFs via MuseScore CLI.
 
     Args:
@@ -1234,10 +3956,22 @@ def render_pdfs(score_data: dict[str, str | dict[str, str]], run_id: str | None
     Returns dict with keys:
         "paths": list of rendered PDF file paths
         "part_report": list of dicts with part status details for QC/manifest
+
+    With MUSESCORE_RENDER_MODE == "batch" every PDF is converted by one MuseScore process
+    from a job file written next to the full-score MusicXML; files it did not produce are
+    retried one process each. Per-file renders, the full score included, run concurrently
+    on up to `render_worker_count` processes, each killed after MUSESCORE_TIMEOUT_S. A
+    part whose PDF still fails is skipped with reason `render_failed`; a failing full
+    score raises. `part_report` keeps stem order. When `timings` is given, records
+    `timings["render"]` with the mode, worker and MuseScore process counts and wall time.
+
+    PDFs whose MusicXML was rendered before by the same MuseScore version are linked from
+    the render cache instead; hit/miss counts are recorded under `renders` in `cache_stats`.
     """
     from music21 import converter
 
     _ensure_dirs()
+    started = time.perf_counter()
 
     full_score_xml = Path(score_data["full_score"])
     if not full_score_xml.exists():
@@ -1247,20 +3981,21 @@ def render_pdfs(score_data: dict[str, str | dict[str, str]], run_id: str | None
     output_root.mkdir(parents=True, exist_ok=True)
 
     score_pdf = output_root / f"{full_score_xml.stem}_full_score.pdf"
-    _run([MUSESCORE_CMD, "-o", str(score_pdf), str(full_score_xml)])
-    rendered: list[str] = [str(score_pdf)]
     part_report: list[dict] = []
     for item in score_data.get("skipped_parts", []) if isinstance(score_data, dict) else []:
         if isinstance(item, dict):
-            part_report.append(
-                {
-                    "name": str(item.get("name", "")),
-                    "status": "skipped",
-                    "reason": str(item.get("reason", "unknown")),
-                    "note_count": int(item.get("note_count", 0)),
-                }
-            )
-
+            entry = {
+                "name": str(item.get("name", "")),
+                "status": "skipped",
+                "reason": str(item.get("reason", "unknown")),
+                "note_count": int(item.get("note_count", 0)),
+            }
+            if item.get("error"):
+                entry["error"] = str(item["error"])
+            part_report.append(entry)
+
+    # (report index, part name, MusicXML, PDF, note count) for every part worth rendering.
+    pending: list[tuple[int, str, Path, Path, int]] = []
     for part_name, part_xml_path in score_data["parts"].items():
         part_xml = Path(part_xml_path)
         if not part_xml.exists():
@@ -1283,13 +4018,86 @@ def render_pdfs(score_data: dict[str, str | dict[str, str]], run_id: str | None
             continue
 
         part_pdf = output_root / f"{sanitize_filename(part_name)}.pdf"
-        _run([MUSESCORE_CMD, "-o", str(part_pdf), str(part_xml)])
+        pending.append((len(part_report), part_name, part_xml, part_pdf, note_count))
+        part_report.append({})
+
+    jobs = [(full_score_xml, score_pdf)] + [(part_xml, part_pdf) for _, _, part_xml, part_pdf, _ in pending]
+    cache_keys: dict[Path, str] = {}
+    cached: list[str] = []
+    to_render: list[tuple[Path, Path]] = []
+    for source, pdf in jobs:
+        try:
+            cache_keys[pdf] = _render_cache_key(source) if RENDER_CACHE_ENABLED else ""
+        except OSError:
+            cache_keys[pdf] = ""
+        # A PDF left by an earlier render may be a hard link into the cache; MuseScore must
+        # never write through it.
+        pdf.unlink(missing_ok=True)
+        if _restore_cached_pdf(cache_keys[pdf], pdf):
+            cached.append(pdf.name)
+        else:
+            to_render.append((source, pdf))
+        if cache_keys[pdf]:
+            record_cache_event(cache_stats, "renders", hit=pdf.name in cached)
+
+    processes = 0
+    retried: list[str] = []
+    if MUSESCORE_RENDER_MODE == "batch" and len(to_render) > 1:
+        _render_musescore_batch(to_render, full_score_xml.parent / "musescore_batch.json")
+        processes += 1
+        single_jobs = [job for job in to_render if not (job[1].is_file() and job[1].stat().st_size > 0)]
+        retried = [job[1].name for job in single_jobs]
+    else:
+        single_jobs = to_render
+    workers = render_worker_count(len(single_jobs), max_workers) if single_jobs else 0
+    errors: dict[Path, str] = {}
+    if single_jobs:
+        # The full score is queued first: it is the slowest file and no longer blocks the parts.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mscore") as pool:
+            futures = [
+                (pdf, pool.submit(_run, [MUSESCORE_CMD, "-o", str(pdf), str(source)], MUSESCORE_TIMEOUT_S))
+                for source, pdf in single_jobs
+            ]
+        processes += len(futures)
+        for pdf, future in futures:
+            try:
+                future.result()
+            except RuntimeError as exc:
+                errors[pdf] = str(exc)
+    _store_cached_pdfs(
+        {
+            cache_keys[pdf]: pdf
+            for _, pdf in to_render
+            if cache_keys[pdf] and pdf not in errors and pdf.is_file() and pdf.stat().st_size > 0
+        },
+        keep_keys=tuple(key for key in cache_keys.values() if key),
+    )
+    if score_pdf in errors:
+        raise RuntimeError(errors[score_pdf])
+
+    rendered: list[str] = [str(score_pdf)]
+    for index, part_name, _, part_pdf, note_count in pending:
+        if part_pdf in errors:
+            part_report[index] = _render_failed_entry(part_name, note_count, errors[part_pdf])
+            continue
         rendered.append(str(part_pdf))
-        part_report.append({
+        part_report[index] = {
             "name": part_name, "status": "exported",
             "note_count": note_count, "path": str(part_pdf),
-        })
+        }
 
+    if timings is not None:
+        timings["render"] = {
+            "mode": MUSESCORE_RENDER_MODE,
+            "workers": workers,
+            "processes": processes,
+            "total_s": round(time.perf_counter() - started, 3),
+            "retried": retried,
+            "cached": cached,
+        }
     if len(rendered) == 1:
+        failures = [entry["error"] for entry in part_report if entry.get("reason") == "render_failed"]
+        if failures:
+            raise RuntimeError(f"No parts could be rendered: {failures[0]}")
         raise RuntimeError("No non-empty parts were rendered.")
     return {"paths": rendered, "part_report": part_report}
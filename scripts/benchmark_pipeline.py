@@ -0,0 +1,1105 @@
+#!/usr/bin/env python3
+"""Local performance benchmarks for BTT pipeline stages.
+
+Each subcommand runs one stage under comparable conditions and prints a short
+table (wall time, peak RSS where available). Use `--out` to save JSON results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _write_synthetic_wav(
+    path: Path, minutes: float, sample_rate: int = 48000, channels: int = 1,
+) -> None:
+    """Write a tone sweep wav chunk by chunk (never holds the whole song in memory)."""
+    total_frames = int(minutes * 60.0 * sample_rate)
+    block = sample_rate  # one second per write
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(channels)
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        written = 0
+        while written < total_frames:
+            count = min(block, total_frames - written)
+            freq = 220.0 + (written // sample_rate % 24) * 20.0
+            frames = bytearray()
+            for idx in range(count):
+                value = int(12000 * math.sin(2.0 * math.pi * freq * (written + idx) / sample_rate))
+                frames += struct.pack("<h", value) * channels
+            handle.writeframes(bytes(frames))
+            written += count
+
+
+def _write_synthetic_midi(path: Path, notes: int, seed: int = 0) -> None:
+    """Write a dense, unquantized single-track MIDI (transcription-like note soup)."""
+    from music21 import chord, midi, note, stream
+
+    rng = random.Random(seed)
+    track = stream.Stream()
+    offset = 0.0
+    for _ in range(notes):
+        if rng.random() > 0.3:
+            offset += rng.choice([0.07, 0.12, 0.25, 0.31, 0.49, 0.5, 0.76, 1.0])
+        duration = rng.choice([0.05, 0.1, 0.2, 0.26, 0.33, 0.5, 0.74, 1.0, 1.5])
+        root = rng.randint(36, 90)
+        if rng.random() < 0.1:
+            element = chord.Chord([root, root + 4, root + 7], quarterLength=duration)
+        else:
+            element = note.Note(root, quarterLength=duration)
+        element.volume.velocity = rng.randint(30, 120)
+        track.insert(offset, element)
+    midi_file = midi.translate.streamToMidiFile(track)
+    midi_file.open(str(path), "wb")
+    midi_file.write()
+    midi_file.close()
+
+
+def _run_child_measured(code: str) -> dict:
+    """Run Python code in a child process and return wall time plus peak RSS (MB)."""
+    # Output goes to temp files so a chatty child can never block on a full pipe.
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-c", code],
+            cwd=str(PROJECT_ROOT),
+            stdout=stdout_file,
+            stderr=stderr_file,
+        )
+        peak_rss_mb: float | None = None
+        if hasattr(os, "wait4"):
+            # wait4 reports the largest RSS of the child or any descendant it waited for.
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+            peak_rss_mb = round(float(usage.ru_maxrss) / scale, 1)
+        else:
+            proc.wait()
+        elapsed = time.perf_counter() - started
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        stdout = stdout_file.read()
+        stderr = stderr_file.read()
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode("utf-8", errors="replace").strip() or "child failed")
+    return {
+        "wall_s": round(elapsed, 3),
+        "peak_rss_mb": peak_rss_mb,
+        "stdout": stdout.decode("utf-8", errors="replace").strip(),
+    }
+
+
+def _print_rows(title: str, rows: list[dict], columns: list[str]) -> None:
+    print(f"=== {title} ===")
+    widths = {
+        col: max(len(col), *(len(str(row.get(col, ""))) for row in rows)) if rows else len(col)
+        for col in columns
+    }
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(widths[col]) for col in columns))
+
+
+def bench_normalize(args: argparse.Namespace) -> dict:
+    """Compare pydub (in-memory) vs streaming ffmpeg input normalization."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-normalize-") as tmp:
+        tmp_path = Path(tmp)
+        for minutes in args.minutes:
+            source = tmp_path / f"source_{minutes}m.wav"
+            _write_synthetic_wav(source, minutes)
+            for mode in ("pydub", "stream"):
+                for attempt in range(max(1, args.repeat)):
+                    output = tmp_path / f"out_{mode}.wav"
+                    code = (
+                        "from pathlib import Path\n"
+                        "from pipeline import _normalize_audio_file\n"
+                        f"_normalize_audio_file({str(source)!r}, Path({str(output)!r}), mode={mode!r})\n"
+                    )
+                    measured = _run_child_measured(code)
+                    rows.append(
+                        {
+                            "minutes": minutes,
+                            "mode": mode,
+                            "attempt": attempt + 1,
+                            "wall_s": measured["wall_s"],
+                            "peak_rss_mb": measured["peak_rss_mb"],
+                            "output_mb": round(output.stat().st_size / (1024.0 * 1024.0), 1),
+                        }
+                    )
+    _print_rows(
+        "Input normalization (pydub vs stream)",
+        rows,
+        ["minutes", "mode", "attempt", "wall_s", "peak_rss_mb", "output_mb"],
+    )
+    return {"benchmark": "normalize", "rows": rows}
+
+
+def bench_demucs_engine(args: argparse.Namespace) -> dict:
+    """Compare cold per-song Demucs CLI runs with one warm in-process engine."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-demucs-") as tmp:
+        tmp_path = Path(tmp)
+        songs: list[Path] = []
+        for index in range(max(1, args.songs)):
+            song_dir = tmp_path / f"song_{index + 1}"
+            song_dir.mkdir()
+            wav = song_dir / "input_normalized.wav"
+            _write_synthetic_wav(wav, args.seconds / 60.0, sample_rate=44100, channels=2)
+            songs.append(wav)
+
+        for index, wav in enumerate(songs):
+            code = (
+                "from pathlib import Path\n"
+                "from pipeline import _run_demucs_cli\n"
+                f"_run_demucs_cli(Path({str(wav)!r}), Path({str(wav.parent / 'cli')!r}))\n"
+            )
+            measured = _run_child_measured(code)
+            rows.append(
+                {
+                    "engine": "cli (cold)",
+                    "song": index + 1,
+                    "wall_s": measured["wall_s"],
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+
+        # One long-lived child separates every song back to back with a warm model.
+        song_list = [str(wav) for wav in songs]
+        code = (
+            "import json, time\n"
+            "from pathlib import Path\n"
+            "from pipeline import _run_demucs_in_process\n"
+            "timings = []\n"
+            f"for song in {song_list!r}:\n"
+            "    started = time.perf_counter()\n"
+            "    _run_demucs_in_process(Path(song), Path(song).parent / 'warm')\n"
+            "    timings.append(round(time.perf_counter() - started, 3))\n"
+            "print(json.dumps(timings))\n"
+        )
+        measured = _run_child_measured(code)
+        warm_timings = json.loads(measured["stdout"].splitlines()[-1])
+        for index, wall_s in enumerate(warm_timings):
+            rows.append(
+                {
+                    "engine": "inprocess (warm)" if index else "inprocess (first, loads model)",
+                    "song": index + 1,
+                    "wall_s": wall_s,
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+    _print_rows(
+        f"Demucs engines ({args.songs} songs x {args.seconds:.0f}s)",
+        rows,
+        ["engine", "song", "wall_s", "peak_rss_mb"],
+    )
+    return {"benchmark": "demucs-engine", "rows": rows}
+
+
+def bench_demucs_profiles(args: argparse.Namespace) -> dict:
+    """Time each separation profile (and optional two-stem mode) on one fixed fixture."""
+    from config import DEMUCS_PROFILES
+
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-profiles-") as tmp:
+        tmp_path = Path(tmp)
+        wav = tmp_path / "input_normalized.wav"
+        _write_synthetic_wav(wav, args.seconds / 60.0, sample_rate=44100, channels=2)
+        variants = [(name, "") for name in DEMUCS_PROFILES]
+        if args.two_stems:
+            variants += [(name, args.two_stems) for name in DEMUCS_PROFILES]
+        for profile, two_stems in variants:
+            out_dir = tmp_path / f"out_{len(rows)}"
+            code = (
+                "from pathlib import Path\n"
+                "from pipeline import _run_demucs_cli, demucs_profile_settings\n"
+                f"settings = demucs_profile_settings({profile!r}, {two_stems!r})\n"
+                f"_run_demucs_cli(Path({str(wav)!r}), Path({str(out_dir)!r}), settings)\n"
+            )
+            measured = _run_child_measured(code)
+            stem_count = len(list(out_dir.rglob("*.wav")))
+            rows.append(
+                {
+                    "profile": profile,
+                    "two_stems": two_stems or "-",
+                    "wall_s": measured["wall_s"],
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                    "stems": stem_count,
+                }
+            )
+    _print_rows(
+        f"Demucs profiles ({args.seconds:.0f}s fixture)",
+        rows,
+        ["profile", "two_stems", "wall_s", "peak_rss_mb", "stems"],
+    )
+    return {"benchmark": "demucs-profiles", "rows": rows}
+
+
+def bench_transcribe_engine(args: argparse.Namespace) -> dict:
+    """Compare one basic-pitch CLI call per stem with a warm in-process model over all stems."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-transcribe-") as tmp:
+        tmp_path = Path(tmp)
+        stems: dict[str, str] = {}
+        for index in range(max(1, args.stems)):
+            wav = tmp_path / f"stem_{index + 1}.wav"
+            _write_synthetic_wav(wav, args.seconds / 60.0, sample_rate=22050)
+            stems[wav.stem] = str(wav)
+
+        for stem_name, stem_path in stems.items():
+            code = (
+                "from pathlib import Path\n"
+                "from pipeline import _transcribe_stem\n"
+                f"_transcribe_stem({stem_name!r}, {stem_path!r}, Path({str(tmp_path / 'cli')!r}))\n"
+            )
+            measured = _run_child_measured(code)
+            rows.append(
+                {
+                    "engine": "cli (per stem)",
+                    "stem": stem_name,
+                    "wall_s": measured["wall_s"],
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+
+        # One child loads the model once and transcribes every stem through it.
+        code = (
+            "import json\n"
+            "from pathlib import Path\n"
+            "from pipeline import _transcribe_stem_in_process\n"
+            "timings = []\n"
+            f"for name, path in {stems!r}.items():\n"
+            f"    timings.append(_transcribe_stem_in_process(name, path, Path({str(tmp_path / 'warm')!r}))[1])\n"
+            "print(json.dumps(timings))\n"
+        )
+        measured = _run_child_measured(code)
+        warm_timings = json.loads(measured["stdout"].splitlines()[-1])
+        for index, (stem_name, wall_s) in enumerate(zip(stems, warm_timings)):
+            rows.append(
+                {
+                    "engine": "inprocess (warm)" if index else "inprocess (first, loads model)",
+                    "stem": stem_name,
+                    "wall_s": wall_s,
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+        rows.append(
+            {
+                "engine": "inprocess (child total)",
+                "stem": "all",
+                "wall_s": measured["wall_s"],
+                "peak_rss_mb": measured["peak_rss_mb"],
+            }
+        )
+    _print_rows(
+        f"Transcription engines ({args.stems} stems x {args.seconds:.0f}s)",
+        rows,
+        ["engine", "stem", "wall_s", "peak_rss_mb"],
+    )
+    return {"benchmark": "transcribe-engine", "rows": rows}
+
+
+def bench_score_build(args: argparse.Namespace) -> dict:
+    """Per-part score build on a dense stem: music21 object passes vs the note-event IR."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-score-") as tmp:
+        tmp_path = Path(tmp)
+        midi_path = tmp_path / "dense.mid"
+        _write_synthetic_midi(midi_path, args.notes, seed=args.seed)
+        for instrument_name in args.instruments:
+            for engine in ("music21", "events"):
+                # Cleanup alone and the whole build_score call for a one-part score.
+                code = (
+                    "import json, time\n"
+                    "from pathlib import Path\n"
+                    "from music21 import converter\n"
+                    "import pipeline\n"
+                    "from config import SIMPLIFY_PROFILES\n"
+                    f"pipeline.SIMPLIFY_ENGINE = {engine!r}\n"
+                    f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], enabled=True)\n"
+                    f"part = converter.parse({str(midi_path)!r}).parts[0]\n"
+                    "started = time.perf_counter()\n"
+                    f"part = pipeline._clean_single_line_part(part, {instrument_name!r}, options)\n"
+                    "cleanup_s = time.perf_counter() - started\n"
+                    "note_count = len(list(part.recurse().notes))\n"
+                    "timings = {}\n"
+                    "started = time.perf_counter()\n"
+                    f"pipeline.build_score({{'stem': {str(midi_path)!r}}}, {{'stem': {instrument_name!r}}}, options,\n"
+                    f"    run_dir=Path({str(tmp_path / engine)!r}), timings=timings)\n"
+                    "print(json.dumps({'cleanup_s': cleanup_s, 'build_s': time.perf_counter() - started,\n"
+                    "    'notes_out': note_count, 'passes': timings['score_build']['passes']}))\n"
+                )
+                measured = _run_child_measured(code)
+                result = json.loads(measured["stdout"].splitlines()[-1])
+                slowest = max(result["passes"].items(), key=lambda item: item[1]["total_s"])
+                rows.append(
+                    {
+                        "instrument": instrument_name,
+                        "engine": engine,
+                        "notes_out": result["notes_out"],
+                        "cleanup_s": round(result["cleanup_s"], 3),
+                        "build_score_s": round(result["build_s"], 3),
+                        "slowest_pass": f"{slowest[0]} ({slowest[1]['total_s']:.3f}s)",
+                        "peak_rss_mb": measured["peak_rss_mb"],
+                        "passes": result["passes"],
+                    }
+                )
+    _print_rows(
+        f"Score build ({args.notes} input notes, {args.profile})",
+        rows,
+        ["instrument", "engine", "notes_out", "cleanup_s", "build_score_s", "slowest_pass", "peak_rss_mb"],
+    )
+    return {"benchmark": "score-build", "rows": rows}
+
+
+def bench_simplify(args: argparse.Namespace) -> dict:
+    """`_simplify_part` on dense stems: music21 quantize + per-note removal vs array quantize/prune."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-simplify-") as tmp:
+        for notes in args.notes:
+            midi_path = Path(tmp) / f"dense_{notes}.mid"
+            _write_synthetic_midi(midi_path, notes, seed=args.seed)
+            for engine in ("music21", "events"):
+                code = (
+                    "import json, time\n"
+                    "from music21 import converter\n"
+                    "import pipeline\n"
+                    "from config import SIMPLIFY_PROFILES\n"
+                    f"part = converter.parse({str(midi_path)!r}).parts[0]\n"
+                    "started = time.perf_counter()\n"
+                    f"pipeline._simplify_part(part, SIMPLIFY_PROFILES[{args.profile!r}], engine={engine!r})\n"
+                    "elapsed = time.perf_counter() - started\n"
+                    "print(json.dumps({'simplify_s': elapsed, 'notes_out': len(list(part.recurse().notes))}))\n"
+                )
+                measured = _run_child_measured(code)
+                result = json.loads(measured["stdout"].splitlines()[-1])
+                rows.append(
+                    {
+                        "notes_in": notes,
+                        "engine": engine,
+                        "notes_out": result["notes_out"],
+                        "simplify_s": round(result["simplify_s"], 3),
+                        "peak_rss_mb": measured["peak_rss_mb"],
+                    }
+                )
+    _print_rows(
+        f"Simplify ({args.profile})",
+        rows,
+        ["notes_in", "engine", "notes_out", "simplify_s", "peak_rss_mb"],
+    )
+    return {"benchmark": "simplify", "rows": rows}
+
+
+def bench_parsed_midi(args: argparse.Namespace) -> dict:
+    """Fit check followed by Quick Reruns, with and without the parsed-MIDI cache."""
+    instruments = ["Alto Sax 1", "Tuba", "Bb Trumpet 1", "Flute"][: max(1, args.stems)]
+    profiles = ["Easy Intermediate", "Beginner", "Intermediate"]
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-parsed-") as tmp:
+        tmp_path = Path(tmp)
+        sources = []
+        for index in range(len(instruments)):
+            source = tmp_path / f"source_{index}.mid"
+            _write_synthetic_midi(source, args.notes, seed=args.seed + index)
+            sources.append(source)
+        for enabled in (False, True):
+            # Fresh MIDI paths per mode so neither run starts from music21's own pickles.
+            mode_dir = tmp_path / ("cached" if enabled else "uncached")
+            mode_dir.mkdir()
+            midis = {}
+            for index, source in enumerate(sources):
+                target = mode_dir / source.name
+                target.write_bytes(source.read_bytes())
+                midis[f"stem_{index}"] = str(target)
+            assignment = {f"stem_{index}": name for index, name in enumerate(instruments)}
+            code = (
+                "import json, time\n"
+                "from pathlib import Path\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"pipeline.PARSED_MIDI_CACHE_ENABLED = {enabled!r}\n"
+                f"midis, assignment = {midis!r}, {assignment!r}\n"
+                "steps = []\n"
+                "started = time.perf_counter()\n"
+                "pipeline.assess_song_fit(midis, assignment)\n"
+                "steps.append(('fit check', time.perf_counter() - started))\n"
+                f"for index, profile in enumerate({profiles!r}):\n"
+                "    options = dict(SIMPLIFY_PROFILES[profile], simplify_enabled=True, title='Bench')\n"
+                "    started = time.perf_counter()\n"
+                f"    pipeline.build_score(midis, assignment, options, run_dir=Path({str(mode_dir)!r}) / str(index))\n"
+                "    steps.append((f'rerun {index + 1} ({profile})', time.perf_counter() - started))\n"
+                "print(json.dumps(steps))\n"
+            )
+            measured = _run_child_measured(code)
+            steps = json.loads(measured["stdout"].splitlines()[-1])
+            for step, wall_s in steps:
+                rows.append({"cache": "on" if enabled else "off", "step": step, "wall_s": round(wall_s, 3)})
+            rows.append(
+                {
+                    "cache": "on" if enabled else "off",
+                    "step": "child total",
+                    "wall_s": measured["wall_s"],
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+    _print_rows(
+        f"Parsed-MIDI cache ({len(instruments)} stems x {args.notes} notes)",
+        rows,
+        ["cache", "step", "wall_s", "peak_rss_mb"],
+    )
+    return {"benchmark": "parsed-midi", "rows": rows}
+
+
+def bench_quick_rerun(args: argparse.Namespace) -> dict:
+    """Quick Reruns that change metadata or profile, with and without the part-stage cache."""
+    instruments = ["Alto Sax 1", "Tuba", "Bb Trumpet 1", "Flute", "Trombone 1", "Snare Drum"]
+    instruments = [instruments[index % len(instruments)] for index in range(max(1, args.stems))]
+    reruns = [
+        ("first build", {}),
+        ("same settings", {}),
+        ("new school", {"school": "Bench Middle School"}),
+        ("new title/composer", {"title": "Bench 2", "composer": "Bench Composer"}),
+        ("new profile", {"profile": "Intermediate"}),
+    ]
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-rerun-") as tmp:
+        tmp_path = Path(tmp)
+        midis = {}
+        for index in range(len(instruments)):
+            source = tmp_path / f"source_{index}.mid"
+            _write_synthetic_midi(source, args.notes, seed=args.seed + index)
+            midis[f"stem_{index}"] = str(source)
+        assignment = {f"stem_{index}": name for index, name in enumerate(instruments)}
+        for enabled in (False, True):
+            mode_dir = tmp_path / ("cached" if enabled else "uncached")
+            code = (
+                "import json, time\n"
+                "from pathlib import Path\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"pipeline.PART_STAGE_CACHE_ENABLED = {enabled!r}\n"
+                f"midis, assignment = {midis!r}, {assignment!r}\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], simplify_enabled=True,\n"
+                f"    profile={args.profile!r}, title='Bench', composer='', school='')\n"
+                "steps = []\n"
+                f"for index, (step, changes) in enumerate({reruns!r}):\n"
+                "    options.update(changes)\n"
+                "    options.update(SIMPLIFY_PROFILES.get(changes.get('profile'), {}))\n"
+                "    timings = {}\n"
+                "    started = time.perf_counter()\n"
+                f"    pipeline.build_score(midis, assignment, options, run_dir=Path({str(mode_dir)!r}) / str(index),\n"
+                "        timings=timings, max_workers=1)\n"
+                "    reused = timings['score_build']['reused_stages']\n"
+                "    exports = sum('part_export' in stages for stages in reused.values())\n"
+                "    steps.append((step, time.perf_counter() - started, len(reused), exports))\n"
+                "print(json.dumps(steps))\n"
+            )
+            measured = _run_child_measured(code)
+            for step, wall_s, reused_parts, reused_exports in json.loads(measured["stdout"].splitlines()[-1]):
+                rows.append(
+                    {
+                        "cache": "on" if enabled else "off",
+                        "step": step,
+                        "reused_builds": reused_parts,
+                        "reused_exports": reused_exports,
+                        "wall_s": round(wall_s, 3),
+                    }
+                )
+    _print_rows(
+        f"Quick Rerun part-stage cache ({len(instruments)} stems x {args.notes} notes, {args.profile})",
+        rows,
+        ["cache", "step", "reused_builds", "reused_exports", "wall_s"],
+    )
+    return {"benchmark": "quick-rerun", "rows": rows}
+
+
+def bench_score_parallel(args: argparse.Namespace) -> dict:
+    """Multi-stem `build_score`: in-process part builds vs the process pool at several sizes."""
+    instruments = ["Alto Sax 1", "Tuba", "Bb Trumpet 1", "Flute", "Trombone 1", "Snare Drum"]
+    instruments = [instruments[index % len(instruments)] for index in range(max(1, args.stems))]
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-parallel-") as tmp:
+        tmp_path = Path(tmp)
+        sources = []
+        for index in range(len(instruments)):
+            source = tmp_path / f"source_{index}.mid"
+            _write_synthetic_midi(source, args.notes, seed=args.seed + index)
+            sources.append(source)
+        for workers in args.workers:
+            # Fresh MIDI paths per mode so no run starts from music21's own pickles.
+            mode_dir = tmp_path / f"workers_{workers}"
+            mode_dir.mkdir()
+            midis = {}
+            for index, source in enumerate(sources):
+                target = mode_dir / source.name
+                target.write_bytes(source.read_bytes())
+                midis[f"stem_{index}"] = str(target)
+            assignment = {f"stem_{index}": name for index, name in enumerate(instruments)}
+            code = (
+                "import json, time\n"
+                "from pathlib import Path\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], simplify_enabled=True, title='Bench')\n"
+                "timings = {}\n"
+                "started = time.perf_counter()\n"
+                f"result = pipeline.build_score({midis!r}, {assignment!r}, options,\n"
+                f"    run_dir=Path({str(mode_dir)!r}), timings=timings, max_workers={workers!r})\n"
+                "print(json.dumps({'build_s': time.perf_counter() - started,\n"
+                "    'workers': timings['score_build']['workers'], 'parts': len(result['parts'])}))\n"
+            )
+            measured = _run_child_measured(code)
+            result = json.loads(measured["stdout"].splitlines()[-1])
+            rows.append(
+                {
+                    "max_workers": workers,
+                    "workers": result["workers"],
+                    "parts": result["parts"],
+                    "build_score_s": round(result["build_s"], 3),
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+    _print_rows(
+        f"Parallel score build ({len(instruments)} stems x {args.notes} notes, {os.cpu_count()} CPUs)",
+        rows,
+        ["max_workers", "workers", "parts", "build_score_s", "peak_rss_mb"],
+    )
+    return {"benchmark": "score-parallel", "rows": rows}
+
+
+def bench_score_assembly(args: argparse.Namespace) -> dict:
+    """Full-score assembly for many parts: the old double pad/align/notate vs one in-place pass."""
+    instruments = [
+        "Flute", "Bb Clarinet 1", "Alto Sax 1", "Bb Trumpet 1",
+        "French Horn 1", "Trombone 1", "Tuba", "Snare Drum", "Euphonium", "Oboe",
+    ]
+    instruments = [instruments[index % len(instruments)] for index in range(max(1, args.parts))]
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-assembly-") as tmp:
+        tmp_path = Path(tmp)
+        jobs = []
+        for index, instrument_name in enumerate(instruments):
+            midi_path = tmp_path / f"part_{index}.mid"
+            _write_synthetic_midi(midi_path, args.notes, seed=args.seed + index)
+            jobs.append(
+                {
+                    "midi_path": str(midi_path),
+                    "instrument_name": instrument_name,
+                    "part_label": f"{instrument_name} {index + 1}",
+                    "part_dir": str(tmp_path),
+                    "engine": "events",
+                    "parsed": None,
+                    "return_parsed": False,
+                }
+            )
+        for mode in ("two-pass", "single-pass"):
+            code = (
+                "import json, resource, time, warnings\n"
+                "from music21 import stream\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], simplify_enabled=True, title='Bench')\n"
+                "grid = options['quantize_grid']\n"
+                "score = stream.Score()\n"
+                f"for job in {jobs!r}:\n"
+                "    score.insert(0, pipeline._build_part(dict(job, options=options))['concert_part'])\n"
+                "rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+                "started = time.perf_counter()\n"
+                f"if {mode!r} == 'two-pass':\n"
+                "    for _ in range(2):\n"
+                "        pipeline._pad_parts_to_common_length(score, grid)\n"
+                "        pipeline._align_score_measures(score)\n"
+                "        with warnings.catch_warnings():\n"
+                "            pipeline._suppress_known_music21_warnings()\n"
+                "            score = score.makeNotation(inPlace=False)\n"
+                "else:\n"
+                "    pipeline._assemble_full_score(score, grid)\n"
+                "elapsed = time.perf_counter() - started\n"
+                "rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+                "measures = sorted({len(part.getElementsByClass(stream.Measure)) for part in score.parts})\n"
+                "print(json.dumps({'assembly_s': elapsed, 'rss_growth': rss_after - rss_before,\n"
+                "    'measures': measures}))\n"
+            )
+            measured = _run_child_measured(code)
+            result = json.loads(measured["stdout"].splitlines()[-1])
+            scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+            rows.append(
+                {
+                    "mode": mode,
+                    "parts": len(instruments),
+                    "measures": "/".join(str(count) for count in result["measures"]),
+                    "assembly_s": round(result["assembly_s"], 3),
+                    "assembly_rss_growth_mb": round(result["rss_growth"] / scale, 1),
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                }
+            )
+    _print_rows(
+        f"Full-score assembly ({len(instruments)} parts x {args.notes} notes, {args.profile})",
+        rows,
+        ["mode", "parts", "measures", "assembly_s", "assembly_rss_growth_mb", "peak_rss_mb"],
+    )
+    return {"benchmark": "score-assembly", "rows": rows}
+
+
+def bench_score_align(args: argparse.Namespace) -> dict:
+    """Full-score measure alignment: music21 makeMeasures per part vs the linear barline sweep."""
+    instruments = ["Flute", "Alto Sax 1", "Bb Trumpet 1", "Trombone 1", "Tuba", "Snare Drum"]
+    instruments = [instruments[index % len(instruments)] for index in range(max(1, args.parts))]
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-align-") as tmp:
+        tmp_path = Path(tmp)
+        for notes in args.notes:
+            jobs = []
+            for index, instrument_name in enumerate(instruments):
+                midi_path = tmp_path / f"part_{notes}_{index}.mid"
+                _write_synthetic_midi(midi_path, notes, seed=args.seed + index)
+                jobs.append(
+                    {
+                        "midi_path": str(midi_path),
+                        "instrument_name": instrument_name,
+                        "part_label": f"{instrument_name} {index + 1}",
+                        "part_dir": str(tmp_path),
+                        "engine": "events",
+                        "parsed": None,
+                        "return_parsed": False,
+                    }
+                )
+            code = (
+                "import copy, json, time\n"
+                "from music21 import stream\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], simplify_enabled={not args.no_simplify!r}, title='Bench')\n"
+                "score = stream.Score()\n"
+                f"for job in {jobs!r}:\n"
+                "    score.insert(0, pipeline._build_part(dict(job, options=options))['concert_part'])\n"
+                "pipeline._pad_parts_to_common_length(score, options['quantize_grid'])\n"
+                "out = {}\n"
+                "for engine in ('music21', 'linear'):\n"
+                "    aligned = copy.deepcopy(score)\n"
+                "    pipeline.SCORE_ALIGN_ENGINE = engine\n"
+                "    started = time.perf_counter()\n"
+                "    pipeline._align_score_measures(aligned)\n"
+                "    elapsed = time.perf_counter() - started\n"
+                "    layout = [[(m.number, len(m.recurse().notesAndRests)) for m in part.getElementsByClass(stream.Measure)]\n"
+                "              for part in aligned.parts]\n"
+                "    ties = sum(1 for n in aligned.recurse().notes if n.tie is not None)\n"
+                "    out[engine] = {'align_s': elapsed, 'measures': len(layout[0]), 'ties': ties, 'layout': layout}\n"
+                "print(json.dumps(out))\n"
+            )
+            measured = _run_child_measured(code)
+            result = json.loads(measured["stdout"].splitlines()[-1])
+            for engine in ("music21", "linear"):
+                rows.append(
+                    {
+                        "notes": notes,
+                        "engine": engine,
+                        "measures": result[engine]["measures"],
+                        "ties": result[engine]["ties"],
+                        "align_s": round(result[engine]["align_s"], 3),
+                        "same_layout": result[engine]["layout"] == result["music21"]["layout"],
+                    }
+                )
+    _print_rows(
+        f"Measure alignment ({len(instruments)} parts, {args.profile})",
+        rows,
+        ["notes", "engine", "measures", "ties", "align_s", "same_layout"],
+    )
+    return {"benchmark": "score-align", "rows": rows}
+
+
+def bench_render(args: argparse.Namespace) -> dict:
+    """PDF rendering: per-file MuseScore processes (serial or pooled) vs one batch (`-j` job file).
+
+    The last variant renders once to fill the render cache, rebuilds the same MusicXML (new
+    part ids, as a rerun would) and times the second, cached render.
+    """
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-render-") as tmp:
+        tmp_path = Path(tmp)
+        mscore = args.mscore
+        if not mscore:
+            # Stand-in for MuseScore: pays a fixed startup per launch plus a per-file conversion.
+            stub = tmp_path / "mscore"
+            stub.write_text(
+                f"#!{sys.executable}\n"
+                "import json, sys, time\n"
+                "from pathlib import Path\n"
+                f"time.sleep({args.startup_s!r})\n"
+                "if sys.argv[1] == '--version':\n"
+                "    print('MuseScore stub')\n"
+                "    sys.exit(0)\n"
+                "if sys.argv[1] == '-j':\n"
+                "    jobs = json.loads(Path(sys.argv[2]).read_text())\n"
+                "else:\n"
+                "    jobs = [{'in': sys.argv[3], 'out': sys.argv[2]}]\n"
+                "for job in jobs:\n"
+                f"    time.sleep({args.convert_s!r})\n"
+                "    Path(job['out']).write_bytes(b'%PDF-stub')\n"
+            )
+            stub.chmod(0o755)
+            mscore = str(stub)
+        for parts in args.parts:
+            xml_dir = tmp_path / f"xml_{parts}"
+            xml_dir.mkdir()
+            code_setup = (
+                "from pathlib import Path\n"
+                "from music21 import note, stream\n"
+                "def write_xml(path):\n"
+                "    source = stream.Stream()\n"
+                "    for idx in range(16):\n"
+                "        source.append(note.Note(60 + idx % 12, quarterLength=1.0))\n"
+                "    source.write('musicxml', fp=str(path))\n"
+                "    return str(path)\n"
+                f"xml_dir = Path({str(xml_dir)!r})\n"
+                "def export():\n"
+                "    return {'full_score': write_xml(xml_dir / 'Bench.musicxml'), 'skipped_parts': [],\n"
+                f"        'parts': {{f'Part {{idx + 1}}': write_xml(xml_dir / f'part_{{idx}}.musicxml') for idx in range({parts})}}}}\n"
+                "score_data = export()\n"
+            )
+            variants = [("per_file", workers, False) for workers in args.workers] + [
+                ("batch", "auto", False),
+                ("batch", "auto", True),
+            ]
+            for mode, workers, cached in variants:
+                workers = workers if workers == "auto" else int(workers)
+                run_id = f"{mode}_{parts}{'_cached' if cached else ''}"
+                code = (
+                    "import json\n"
+                    + code_setup
+                    + "import pipeline\n"
+                    f"pipeline.MUSESCORE_CMD = {mscore!r}\n"
+                    f"pipeline.MUSESCORE_RENDER_MODE = {mode!r}\n"
+                    f"pipeline.OUTPUT_DIR = Path({str(tmp_path / 'outputs')!r})\n"
+                    f"pipeline.RENDER_CACHE_ENABLED = {cached!r}\n"
+                    f"pipeline.RENDER_CACHE_DIR = Path({str(tmp_path / f'render_cache_{parts}')!r})\n"
+                    + (
+                        f"pipeline.render_pdfs(score_data, run_id={run_id + '_warm'!r}, max_workers={workers!r})\n"
+                        "score_data = export()\n"
+                        if cached
+                        else ""
+                    )
+                    + "timings = {}\n"
+                    f"result = pipeline.render_pdfs(score_data, run_id={run_id!r}, timings=timings,\n"
+                    f"    max_workers={workers!r})\n"
+                    "print(json.dumps(dict(timings['render'], pdfs=len(result['paths']))))\n"
+                )
+                measured = _run_child_measured(code)
+                result = json.loads(measured["stdout"].splitlines()[-1])
+                rows.append(
+                    {
+                        "parts": parts,
+                        "mode": f"{mode} (cached)" if cached else mode,
+                        "max_workers": workers if mode == "per_file" else "",
+                        "workers": result["workers"],
+                        "pdfs": result["pdfs"],
+                        "processes": result["processes"],
+                        "render_s": result["total_s"],
+                    }
+                )
+    label = args.mscore or f"stub mscore, {args.startup_s}s startup + {args.convert_s}s/file"
+    _print_rows(
+        f"PDF rendering ({label}, {os.cpu_count()} CPUs)",
+        rows,
+        ["parts", "mode", "max_workers", "workers", "pdfs", "processes", "render_s"],
+    )
+    return {"benchmark": "render", "rows": rows}
+
+
+def bench_key_detection(args: argparse.Namespace) -> dict:
+    """Woodwind key detection per part: three music21 analyze("key") calls vs one histogram pass."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-key-") as tmp:
+        for notes in args.notes:
+            midi_path = Path(tmp) / f"dense_{notes}.mid"
+            _write_synthetic_midi(midi_path, notes, seed=args.seed)
+            code = (
+                "import copy, json, time\n"
+                "from music21 import converter, interval\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], enabled=True)\n"
+                f"part = converter.parse({str(midi_path)!r}).parts[0]\n"
+                "part = pipeline._clean_single_line_part(part, 'Alto Sax 1', options)\n"
+                "transposed = copy.deepcopy(part)\n"
+                "transposed.transpose(interval.Interval(9), inPlace=True)\n"
+                "started = time.perf_counter()\n"
+                f"for _ in range({args.repeat}):\n"
+                "    legacy = [part.analyze('key'), part.analyze('key'), transposed.analyze('key')]\n"
+                "legacy_s = time.perf_counter() - started\n"
+                "pipeline._key_estimate_for_histogram.cache_clear()\n"
+                "started = time.perf_counter()\n"
+                f"for _ in range({args.repeat}):\n"
+                "    pipeline._key_estimate_for_histogram.cache_clear()\n"
+                "    first = pipeline._estimate_key(part)\n"
+                "    second = pipeline._estimate_key(part)\n"
+                "    third = pipeline._transpose_key_estimate(second, 9) or pipeline._estimate_key(transposed)\n"
+                "    fast = [pipeline._key_from_estimate(item) for item in (first, second, third)]\n"
+                "fast_s = time.perf_counter() - started\n"
+                "agree = [str(a) for a in legacy] == [str(b) for b in fast]\n"
+                "print(json.dumps({'notes_out': len(list(part.recurse().notes)), 'legacy_s': legacy_s,\n"
+                "    'fast_s': fast_s, 'agree': agree, 'key': str(fast[0])}))\n"
+            )
+            result = json.loads(_run_child_measured(code)["stdout"].splitlines()[-1])
+            for engine, key_s in (("music21", result["legacy_s"]), ("histogram", result["fast_s"])):
+                rows.append(
+                    {
+                        "notes_in": notes,
+                        "notes_out": result["notes_out"],
+                        "engine": engine,
+                        "key": result["key"],
+                        "agree": result["agree"],
+                        "per_part_ms": round(1000.0 * key_s / max(1, args.repeat), 2),
+                    }
+                )
+    _print_rows(
+        f"Key detection (3 detections per woodwind part, {args.profile})",
+        rows,
+        ["notes_in", "notes_out", "engine", "key", "agree", "per_part_ms"],
+    )
+    return {"benchmark": "key-detection", "rows": rows}
+
+
+def bench_part_export(args: argparse.Namespace) -> dict:
+    """Per-part MusicXML export: music21's exporter vs the direct single-line writer."""
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="btt-bench-part-export-") as tmp:
+        tmp_path = Path(tmp)
+        midi_path = tmp_path / "dense.mid"
+        _write_synthetic_midi(midi_path, args.notes, seed=args.seed)
+        jobs = [
+            {
+                "midi_path": str(midi_path),
+                "instrument_name": instrument_name,
+                "part_label": instrument_name,
+                "part_dir": str(tmp_path),
+                "engine": "events",
+                "parsed": None,
+                "return_parsed": False,
+            }
+            for instrument_name in args.instruments
+        ]
+        for writer in ("music21", "direct"):
+            code = (
+                "import json, os, statistics, time\n"
+                "import pipeline\n"
+                "from config import SIMPLIFY_PROFILES\n"
+                f"pipeline.PART_EXPORT_WRITER = {writer!r}\n"
+                f"options = dict(SIMPLIFY_PROFILES[{args.profile!r}], simplify_enabled=True, title='Bench')\n"
+                "out = {}\n"
+                f"for job in {jobs!r}:\n"
+                "    samples = []\n"
+                f"    for _ in range({max(1, args.repeat)}):\n"
+                "        started = time.perf_counter()\n"
+                "        result = pipeline._build_part(dict(job, options=options))\n"
+                "        samples.append(time.perf_counter() - started)\n"
+                "    out[job['instrument_name']] = {'build_s': statistics.median(samples),\n"
+                "        'writer': result.get('part_writer', 'skipped'),\n"
+                "        'xml_kb': os.path.getsize(result['part_xml']) / 1024.0 if 'part_xml' in result else 0.0}\n"
+                "print(json.dumps(out))\n"
+            )
+            measured = _run_child_measured(code)
+            result = json.loads(measured["stdout"].splitlines()[-1])
+            for instrument_name, entry in result.items():
+                rows.append(
+                    {
+                        "instrument": instrument_name,
+                        "setting": writer,
+                        "writer": entry["writer"],
+                        "part_build_s": round(entry["build_s"], 3),
+                        "xml_kb": round(entry["xml_kb"], 1),
+                        "peak_rss_mb": measured["peak_rss_mb"],
+                    }
+                )
+    _print_rows(
+        f"Part export ({args.notes} notes, median of {max(1, args.repeat)}, {args.profile})",
+        rows,
+        ["instrument", "setting", "writer", "part_build_s", "xml_kb", "peak_rss_mb"],
+    )
+    return {"benchmark": "part-export", "rows": rows}
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark BTT pipeline stages locally.")
+    parser.add_argument("--out", default="", help="Optional JSON output path for results.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    normalize = sub.add_parser("normalize", help="Input normalization: pydub vs streaming ffmpeg.")
+    normalize.add_argument(
+        "--minutes",
+        type=float,
+        nargs="+",
+        default=[2.0, 6.0, 10.0],
+        help="Synthetic song lengths (minutes) to benchmark.",
+    )
+    normalize.add_argument("--repeat", type=int, default=1, help="Runs per mode and length.")
+    normalize.set_defaults(handler=bench_normalize)
+
+    demucs_engine = sub.add_parser(
+        "demucs-engine", help="Demucs: cold CLI per song vs warm in-process engine."
+    )
+    demucs_engine.add_argument("--songs", type=int, default=3, help="Back-to-back songs to separate.")
+    demucs_engine.add_argument("--seconds", type=float, default=30.0, help="Synthetic song length.")
+    demucs_engine.set_defaults(handler=bench_demucs_engine)
+
+    demucs_profiles = sub.add_parser(
+        "demucs-profiles", help="Demucs: timing across DEMUCS_PROFILES on a fixed fixture."
+    )
+    demucs_profiles.add_argument("--seconds", type=float, default=30.0, help="Fixture length.")
+    demucs_profiles.add_argument(
+        "--two-stems", default="vocals", help="Also time two-stem mode for this stem ('' to skip)."
+    )
+    demucs_profiles.set_defaults(handler=bench_demucs_profiles)
+
+    transcribe_engine = sub.add_parser(
+        "transcribe-engine", help="Basic Pitch: CLI per stem vs one warm in-process model."
+    )
+    transcribe_engine.add_argument("--stems", type=int, default=4, help="Stems to transcribe.")
+    transcribe_engine.add_argument("--seconds", type=float, default=30.0, help="Synthetic stem length.")
+    transcribe_engine.set_defaults(handler=bench_transcribe_engine)
+
+    score_build = sub.add_parser(
+        "score-build", help="Score build: music21 cleanup passes vs the note-event IR."
+    )
+    score_build.add_argument("--notes", type=int, default=5000, help="Notes in the synthetic stem.")
+    score_build.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    score_build.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    score_build.add_argument(
+        "--instruments",
+        nargs="+",
+        default=["Alto Sax 1", "Tuba", "Snare Drum"],
+        help="Target instruments (one per single-line family).",
+    )
+    score_build.set_defaults(handler=bench_score_build)
+
+    simplify = sub.add_parser(
+        "simplify", help="_simplify_part: music21 quantize/remove vs vectorized quantize/prune."
+    )
+    simplify.add_argument(
+        "--notes", type=int, nargs="+", default=[5000, 10000], help="Synthetic stem sizes (notes)."
+    )
+    simplify.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    simplify.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    simplify.set_defaults(handler=bench_simplify)
+
+    parsed_midi = sub.add_parser(
+        "parsed-midi", help="Fit check + three Quick Reruns with/without the parsed-MIDI cache."
+    )
+    parsed_midi.add_argument("--stems", type=int, default=4, help="Assigned stems (max 4).")
+    parsed_midi.add_argument("--notes", type=int, default=3000, help="Notes per synthetic stem.")
+    parsed_midi.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    parsed_midi.set_defaults(handler=bench_parsed_midi)
+
+    quick_rerun = sub.add_parser(
+        "quick-rerun", help="Quick Reruns (metadata/profile changes) with/without the part-stage cache."
+    )
+    quick_rerun.add_argument("--stems", type=int, default=4, help="Assigned stems.")
+    quick_rerun.add_argument("--notes", type=int, default=3000, help="Notes per synthetic stem.")
+    quick_rerun.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    quick_rerun.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    quick_rerun.set_defaults(handler=bench_quick_rerun)
+
+    score_parallel = sub.add_parser(
+        "score-parallel", help="Multi-stem build_score: in-process vs process-pool part builds."
+    )
+    score_parallel.add_argument("--stems", type=int, default=6, help="Assigned stems.")
+    score_parallel.add_argument("--notes", type=int, default=2000, help="Notes per synthetic stem.")
+    score_parallel.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    score_parallel.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    score_parallel.add_argument(
+        "--workers", nargs="+", default=["1", "2", "auto"], help="max_workers values to compare."
+    )
+    score_parallel.set_defaults(handler=bench_score_parallel)
+
+    score_assembly = sub.add_parser(
+        "score-assembly", help="Full-score assembly: repeated pad/align/makeNotation vs one pass."
+    )
+    score_assembly.add_argument("--parts", type=int, default=10, help="Concert parts in the score.")
+    score_assembly.add_argument("--notes", type=int, default=1500, help="Notes per synthetic stem.")
+    score_assembly.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    score_assembly.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    score_assembly.set_defaults(handler=bench_score_assembly)
+
+    score_align = sub.add_parser(
+        "score-align", help="Full-score measure alignment: music21 makeMeasures vs the linear sweep."
+    )
+    score_align.add_argument("--parts", type=int, default=6, help="Concert parts in the score.")
+    score_align.add_argument(
+        "--notes", type=int, nargs="+", default=[1000, 4000], help="Notes per synthetic stem."
+    )
+    score_align.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    score_align.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    score_align.add_argument(
+        "--no-simplify", action="store_true", help="Build the parts with simplification off (keeps voices)."
+    )
+    score_align.set_defaults(handler=bench_score_align)
+
+    render = sub.add_parser("render", help="PDF rendering: per-file MuseScore launches (pooled) vs one batch job.")
+    render.add_argument("--parts", type=int, nargs="+", default=[4, 12], help="Part PDFs per export.")
+    render.add_argument(
+        "--mscore", default="", help="Real MuseScore executable to time (default: a stub with fixed costs)."
+    )
+    render.add_argument("--startup-s", type=float, default=2.0, help="Stub MuseScore startup cost per launch.")
+    render.add_argument("--convert-s", type=float, default=0.2, help="Stub MuseScore cost per converted file.")
+    render.add_argument(
+        "--workers", nargs="+", default=["1", "4"], help="max_workers values to time in per_file mode ('auto' allowed)."
+    )
+    render.set_defaults(handler=bench_render)
+
+    key_detection = sub.add_parser(
+        "key-detection", help="Woodwind key detection: music21 analyze('key') vs histogram engine."
+    )
+    key_detection.add_argument(
+        "--notes", type=int, nargs="+", default=[1000, 5000], help="Synthetic stem sizes (notes)."
+    )
+    key_detection.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    key_detection.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    key_detection.add_argument("--repeat", type=int, default=5, help="Timed repetitions per engine.")
+    key_detection.set_defaults(handler=bench_key_detection)
+
+    part_export = sub.add_parser(
+        "part-export", help="Part MusicXML export: music21 exporter vs direct single-line writer."
+    )
+    part_export.add_argument("--notes", type=int, default=5000, help="Notes in the synthetic stem.")
+    part_export.add_argument("--seed", type=int, default=0, help="Synthetic MIDI random seed.")
+    part_export.add_argument("--profile", default="Easy Intermediate", help="SIMPLIFY_PROFILES entry.")
+    part_export.add_argument(
+        "--instruments",
+        nargs="+",
+        default=["Alto Sax 1", "Tuba", "Snare Drum"],
+        help="Target instruments (one per single-line family).",
+    )
+    part_export.add_argument("--repeat", type=int, default=3, help="Timed builds per instrument.")
+    part_export.set_defaults(handler=bench_part_export)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    result = args.handler(args)
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(result, indent=2))
+        print(f"Saved results: {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
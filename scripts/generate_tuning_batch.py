@@ -27,6 +27,12 @@ def _parse_args() -> argparse.Namespace:
         default=[],
         help="Run ID to include (can be repeated). If omitted, uses newest successful runs.",
     )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        help="sweep_manifest.json from `sweep_simplification.py --render`; adds its rendered runs. Repeatable.",
+    )
     parser.add_argument(
         "--limit-runs",
         type=int,
@@ -72,12 +78,25 @@ def _collect_run_ids(runs_dir: Path, explicit_ids: list[str], limit_runs: int) -
     return candidates
 
 
+def _sweep_run_ids(sweep_manifests: list[str]) -> list[str]:
+    run_ids: list[str] = []
+    for raw_path in sweep_manifests:
+        data = _load_manifest(Path(raw_path))
+        if not data:
+            raise SystemExit(f"Missing or unreadable sweep manifest: {raw_path}")
+        run_ids.extend(str(run_id) for run_id in data.get("rendered_runs") or [])
+    return run_ids
+
+
 def main() -> int:
     args = _parse_args()
     runs_dir = Path(args.runs_dir)
     out_root = Path(args.out_root)
 
-    run_ids = _collect_run_ids(runs_dir, list(args.run_id), int(args.limit_runs))
+    explicit_ids = list(dict.fromkeys(list(args.run_id) + _sweep_run_ids(list(args.sweep))))
+    if args.sweep and not explicit_ids:
+        raise SystemExit("Sweep manifest(s) list no rendered runs. Re-run the sweep with --render.")
+    run_ids = _collect_run_ids(runs_dir, explicit_ids, int(args.limit_runs))
     if not run_ids:
         raise SystemExit("No candidate runs found. Provide --run-id or create successful runs first.")
 
@@ -54,6 +54,26 @@ def check_config_invariants() -> None:
         )
 
 
+def check_demucs_profiles() -> None:
+    from config import DEFAULT_DEMUCS_PROFILE, DEMUCS_PROFILES
+    from pipeline import demucs_profile_settings
+
+    _assert(DEFAULT_DEMUCS_PROFILE in DEMUCS_PROFILES, "DEFAULT_DEMUCS_PROFILE missing from DEMUCS_PROFILES")
+    for name in DEMUCS_PROFILES:
+        settings = demucs_profile_settings(name)
+        _assert(settings["profile"] == name, f"Demucs profile '{name}' did not resolve")
+        _assert(settings["jobs"] >= 1, f"Demucs profile '{name}' resolved to zero jobs")
+        _assert(settings["shifts"] >= 0, f"Demucs profile '{name}' has negative shifts")
+    _assert(
+        demucs_profile_settings("missing")["profile"] == DEFAULT_DEMUCS_PROFILE,
+        "Unknown Demucs profile should fall back to default",
+    )
+    _assert(
+        demucs_profile_settings(None, "vocals")["two_stems"] == "vocals",
+        "Expected two-stem target to resolve",
+    )
+
+
 def check_manifest_roundtrip() -> None:
     from utils import MANIFEST_SCHEMA_VERSION, write_run_manifest
 
@@ -226,7 +246,11 @@ def check_outcome_status_contract() -> None:
 
 def check_source_validation_helpers() -> None:
     from config import YOUTUBE_DOMAINS
-    from utils import classify_audio_source, validate_single_video_youtube_url
+    from utils import (
+        classify_audio_source,
+        extract_youtube_video_id,
+        validate_single_video_youtube_url,
+    )
 
     _assert(
         classify_audio_source("https://www.youtube.com/watch?v=abc123", YOUTUBE_DOMAINS) == "youtube_url",
@@ -249,6 +273,19 @@ def check_source_validation_helpers() -> None:
         "Expected empty classification for blank source",
     )
 
+    _assert(
+        extract_youtube_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "dQw4w9WgXcQ",
+        "Expected video ID extraction from watch URL",
+    )
+    _assert(
+        extract_youtube_video_id("https://youtu.be/dQw4w9WgXcQ") == "dQw4w9WgXcQ",
+        "Expected video ID extraction from youtu.be URL",
+    )
+    _assert(
+        extract_youtube_video_id("https://www.youtube.com/channel/abc") == "",
+        "Expected empty video ID for non-video URL",
+    )
+
     _assert(
         validate_single_video_youtube_url("https://www.youtube.com/watch?v=abc123", YOUTUBE_DOMAINS) == "",
         "Expected no validation error for single-video YouTube URL",
@@ -309,7 +346,223 @@ def check_export_zip_inspection_helper() -> None:
         )
 
 
+def check_content_cache_helpers() -> None:
+    import os
+
+    from utils import (
+        cache_storage_summary,
+        commit_cache_entry,
+        evict_cache_lru,
+        hash_file_sha256,
+        link_or_copy_file,
+        lookup_cache_entry,
+        read_cache_entry_metadata,
+        record_cache_event,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="btt-cache-") as tmp:
+        tmp_path = Path(tmp)
+        cache_root = tmp_path / "cache"
+        source = tmp_path / "input_normalized.wav"
+        source.write_bytes(b"x" * 1000)
+
+        for index, key in enumerate(("aaa", "bbb", "ccc")):
+            entry = commit_cache_entry(cache_root, key, {"input_normalized.wav": source})
+            _assert(entry is not None and entry.is_dir(), f"Expected committed cache entry for {key}")
+            os.utime(entry, (1000.0 + index, 1000.0 + index))
+
+        _assert(lookup_cache_entry(cache_root, "missing", ["input_normalized.wav"]) is None, "Expected miss")
+        hit = lookup_cache_entry(cache_root, "aaa", ["input_normalized.wav"])
+        _assert(hit is not None, "Expected cache hit for committed key")
+
+        restored = tmp_path / "run" / "input_normalized.wav"
+        mode = link_or_copy_file(hit / "input_normalized.wav", restored)
+        _assert(mode in ("hardlink", "copy"), "Unexpected link mode")
+        _assert(
+            hash_file_sha256(restored) == hash_file_sha256(source),
+            "Restored cache file content mismatch",
+        )
+
+        # Entries are copies: rewriting the committed source in place must not reach the cache.
+        with open(source, "r+b") as handle:
+            handle.write(b"y" * 1000)
+        _assert(
+            (hit / "input_normalized.wav").read_bytes() == b"x" * 1000,
+            "Cache entry changed when its source file was rewritten",
+        )
+
+        # "aaa" was just touched by lookup, so "bbb" is least recently used.
+        result = evict_cache_lru(cache_root, max_bytes=2000, keep_keys=("ccc",))
+        _assert(result["evicted_count"] == 1, "Expected one LRU eviction")
+        remaining = sorted(path.name for path in cache_root.iterdir())
+        _assert(remaining == ["aaa", "ccc"], f"Unexpected entries after eviction: {remaining}")
+        _assert(cache_storage_summary(cache_root)["count"] == 2, "Cache summary count mismatch")
+
+        meta_entry = commit_cache_entry(
+            tmp_path / "stems", "ddd", {"bass.wav": source}, metadata={"stems": ["bass"]}
+        )
+        _assert(
+            meta_entry is not None and read_cache_entry_metadata(meta_entry) == {"stems": ["bass"]},
+            "Expected cache entry metadata roundtrip",
+        )
+
+        stats: dict = {}
+        record_cache_event(stats, "input_audio", hit=False)
+        record_cache_event(stats, "input_audio", hit=True)
+        _assert(stats == {"input_audio": {"hits": 1, "misses": 1}}, "Cache counters mismatch")
+
+
+def check_input_cache_isolation() -> None:
+    import wave
+
+    import pipeline
+
+    with tempfile.TemporaryDirectory(prefix="btt-input-cache-") as tmp:
+        tmp_path = Path(tmp)
+        sources = {}
+        for name, level in (("a", 1000), ("b", -1000)):
+            sources[name] = tmp_path / f"{name}.wav"
+            with wave.open(str(sources[name]), "wb") as handle:
+                handle.setnchannels(1)
+                handle.setsampwidth(2)
+                handle.setframerate(8000)
+                handle.writeframes(level.to_bytes(2, "little", signed=True) * 800)
+
+        original = (pipeline.TEMP_DIR, pipeline.INPUT_CACHE_DIR)
+        pipeline.TEMP_DIR = tmp_path / "temp"
+        pipeline.INPUT_CACHE_DIR = tmp_path / "input-cache"
+        try:
+            # Normalizing a, b, then a again into the shared temp wav must return a's audio.
+            digests = {}
+            for name in ("a", "b"):
+                digests[name] = pipeline.hash_file_sha256(pipeline.download_or_convert_audio(str(sources[name])))
+            stats: dict = {}
+            again = pipeline.download_or_convert_audio(str(sources["a"]), cache_stats=stats)
+            _assert(stats["input_audio"] == {"hits": 1, "misses": 0}, f"Expected a cache hit: {stats}")
+            _assert(digests["a"] != digests["b"], "Expected distinct normalized audio")
+            _assert(pipeline.hash_file_sha256(again) == digests["a"], "Cache hit returned another input's audio")
+        finally:
+            pipeline.TEMP_DIR, pipeline.INPUT_CACHE_DIR = original
+
+
+def check_parallel_transcription() -> None:
+    import os
+
+    import pipeline
+    from pipeline import load_posteriorgram, transcribe_to_midi, transcription_worker_count
+
+    _assert(transcription_worker_count(0) == 1, "Worker count should never drop below 1")
+    _assert(transcription_worker_count(2, max_workers=8) <= 2, "Worker count should not exceed stem count")
+    _assert(transcription_worker_count(4, max_workers=1) == 1, "Explicit worker cap ignored")
+
+    with tempfile.TemporaryDirectory(prefix="btt-transcribe-") as tmp:
+        tmp_path = Path(tmp)
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        stub = bin_dir / "basic-pitch"
+        stub.write_text(
+            f"#!{sys.executable}\n"
+            "import sys, time\n"
+            "from pathlib import Path\n"
+            "out_dir, wav = Path(sys.argv[-2]), Path(sys.argv[-1])\n"
+            "time.sleep(0.05)\n"
+            "if 'broken' in wav.stem:\n"
+            "    sys.exit('stub failure for ' + wav.stem)\n"
+            "(out_dir / f'{wav.stem}_basic_pitch.mid').write_bytes(b'')\n"
+            "if '--save-model-outputs' in sys.argv:\n"
+            "    import numpy as np\n"
+            "    output = {'note': np.full((4, 88), 0.25), 'onset': np.zeros((4, 88)), 'contour': np.zeros((4, 264))}\n"
+            "    np.savez(out_dir / f'{wav.stem}_basic_pitch_model_output.npz', basic_pitch_model_output=output)\n"
+        )
+        stub.chmod(0o755)
+        stems = {}
+        for name in ("vocals", "drums", "bass", "other", "piano"):
+            stems[name] = str(tmp_path / f"{name}.wav")
+            Path(stems[name]).write_bytes(name.encode("utf-8"))
+        extra_stem = {"piano": stems.pop("piano")}
+
+        original_path = os.environ.get("PATH", "")
+        original_cache_dir = pipeline.MIDI_CACHE_DIR
+        original_engine = pipeline.resolve_transcribe_engine
+        original_in_process = pipeline._transcribe_stem_in_process
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{original_path}"
+        pipeline.MIDI_CACHE_DIR = tmp_path / "midi-cache"
+        try:
+            timings: dict = {}
+            outputs = transcribe_to_midi(stems, run_dir=tmp_path / "run", timings=timings, max_workers=4)
+            _assert(list(outputs) == list(stems), "Transcription output order should follow stem order")
+            _assert(
+                all(Path(path).parent.name == name for name, path in outputs.items()),
+                "Expected midi/<stem>/ output layout",
+            )
+            block = timings.get("transcription") or {}
+            _assert(set(block.get("stems_s", {})) == set(stems), "Missing per-stem transcription timings")
+            _assert(block.get("total_s", -1) >= 0, "Missing total transcription time")
+
+            # Adding one stem only transcribes that stem; the rest come from the MIDI cache.
+            cache_stats: dict = {}
+            timings = {}
+            outputs = transcribe_to_midi(
+                stems | extra_stem, run_dir=tmp_path / "run-b", cache_stats=cache_stats, timings=timings,
+            )
+            block = timings.get("transcription") or {}
+            _assert(list(outputs) == list(stems | extra_stem), "Cached output order should follow stem order")
+            _assert(block.get("cached_stems") == sorted(stems), "Expected existing stems to hit the MIDI cache")
+            _assert(list(block.get("stems_s", {})) == ["piano"], "Only the new stem should be transcribed")
+            _assert(cache_stats.get("midi") == {"hits": 4, "misses": 1}, "Unexpected MIDI cache counters")
+            _assert(all(Path(path).is_file() for path in outputs.values()), "Cached MIDI not linked into run")
+            if pipeline.TRANSCRIBE_SAVE_POSTERIORGRAMS:
+                posteriorgram = Path(outputs["drums"]).with_name("drums_posteriorgram.npz")
+                _assert(posteriorgram.is_file(), "Cached posteriorgram not linked next to MIDI")
+                arrays = load_posteriorgram(posteriorgram)
+                _assert(arrays["note"].shape == (4, 88), "Posteriorgram note array shape mismatch")
+                _assert(abs(float(arrays["note"].max()) - 0.25) < 1e-3, "Posteriorgram values not preserved")
+                _assert(
+                    not list(Path(outputs["piano"]).parent.glob("*_model_output.npz")),
+                    "Raw basic-pitch model output should be replaced by the compact posteriorgram",
+                )
+
+            broken = dict(stems)
+            broken["z_broken"] = str(tmp_path / "z_broken.wav")
+            broken["a_broken"] = str(tmp_path / "a_broken.wav")
+            try:
+                transcribe_to_midi(broken, run_dir=tmp_path / "run2", max_workers=4)
+            except RuntimeError as exc:
+                message = str(exc)
+                _assert(message.startswith("Transcription failed for 2 of 6"), "Unexpected failure summary")
+                _assert(
+                    0 < message.index("\nz_broken:") < message.index("\na_broken:"),
+                    "Per-stem failures should be reported in stem order",
+                )
+            else:
+                raise AssertionError("Expected transcription failure for broken stems")
+
+            # The in-process engine writes MIDI in place; re-transcribing a changed stem into a
+            # run dir holding a cache-linked MIDI must leave that cache entry intact.
+            def fake_in_process(stem_name: str, stem_path: str, midi_root: Path) -> tuple[str, float]:
+                midi_path = pipeline._stem_midi_path(stem_name, stem_path, midi_root)
+                with open(midi_path, "wb") as handle:
+                    handle.write(Path(stem_path).read_bytes())
+                return str(midi_path), 0.0
+
+            pipeline.resolve_transcribe_engine = lambda: "inprocess"
+            pipeline._transcribe_stem_in_process = fake_in_process
+            drums_key = pipeline._midi_cache_key(stems["drums"])
+            cached_drums = pipeline.MIDI_CACHE_DIR / drums_key / "transcription.mid"
+            before = cached_drums.read_bytes()
+            Path(stems["drums"]).write_bytes(b"re-recorded drums")
+            transcribe_to_midi({"drums": stems["drums"]}, run_dir=tmp_path / "run-b")
+            _assert(cached_drums.read_bytes() == before, "Re-transcription wrote through a cached MIDI")
+        finally:
+            os.environ["PATH"] = original_path
+            pipeline.MIDI_CACHE_DIR = original_cache_dir
+            pipeline.resolve_transcribe_engine = original_engine
+            pipeline._transcribe_stem_in_process = original_in_process
+
+
 def check_simplify_part_effectiveness() -> None:
+    import copy
+
     from music21 import chord, note, stream
 
     from pipeline import _simplify_part
@@ -327,13 +580,24 @@ def check_simplify_part_effectiveness() -> None:
     before_tuplets = sum(1 for n in before_notes if n.duration.tuplets)
     _assert(before_tuplets > 0, "Expected tuplets in synthetic source part")
 
-    _simplify_part(
-        part,
-        {
-            "quantize_grid": "1/8",
-            "min_note_duration_beats": 0.25,
-            "density_threshold": 3,
-        },
+    options = {
+        "quantize_grid": "1/8",
+        "min_note_duration_beats": 0.25,
+        "density_threshold": 3,
+    }
+    legacy = copy.deepcopy(part)
+    _simplify_part(legacy, options, engine="music21")
+    _simplify_part(part, options, engine="events")
+
+    def timeline(stream_obj) -> list[tuple]:
+        return [
+            (float(n.offset), float(n.quarterLength), tuple(p.midi for p in n.pitches))
+            for n in stream_obj.recurse().notes
+        ]
+
+    _assert(
+        timeline(part) == timeline(legacy),
+        "Expected vectorized simplification to match music21 quantize/prune",
     )
 
     after_notes = list(part.recurse().notes)
@@ -346,17 +610,768 @@ def check_simplify_part_effectiveness() -> None:
     )
 
 
+def check_single_line_engine_parity() -> None:
+    import copy
+
+    from music21 import chord, note, stream
+
+    from pipeline import _clean_single_line_part
+
+    source = stream.Part()
+    offsets = [0.0, 0.1, 0.5, 0.55, 1.26, 1.5, 2.0, 2.1, 2.2, 3.33, 3.5, 4.75, 5.0, 6.49, 7.0]
+    for idx, off in enumerate(offsets):
+        if idx % 4 == 0:
+            source.insert(off, chord.Chord([48 + idx, 55 + idx, 64 + idx], quarterLength=0.5))
+        else:
+            source.insert(off, note.Note(40 + (idx * 7) % 45, quarterLength=0.2 + (idx % 3) * 0.4))
+    source.makeMeasures(inPlace=True)
+
+    def timeline(part) -> list[tuple[float, float, int]]:
+        return [
+            (float(n.getOffsetInHierarchy(part)), float(n.quarterLength), int(n.pitch.midi))
+            for n in part.recurse().notes
+        ]
+
+    for instrument_name in ("Alto Sax 1", "Tuba", "Snare Drum"):
+        for grid in ("1/4", "1/8", "1/16"):
+            options = {"quantize_grid": grid, "min_note_duration_beats": 0.25, "density_threshold": 3}
+            legacy = _clean_single_line_part(copy.deepcopy(source), instrument_name, options, engine="music21")
+            events = _clean_single_line_part(copy.deepcopy(source), instrument_name, options, engine="events")
+            _assert(timeline(legacy), f"Expected notes after cleanup for {instrument_name} {grid}")
+            _assert(
+                timeline(events) == timeline(legacy),
+                f"Note-event cleanup diverged from music21 passes for {instrument_name} {grid}",
+            )
+
+
+def check_key_detection_matches_music21() -> None:
+    import copy
+
+    from music21 import chord, interval, note, stream
+
+    import pipeline
+
+    lines = {
+        "g major": [(67, 1.0), (71, 0.5), (74, 0.5), (66, 1.0), (69, 0.5), (72, 0.5), (67, 2.0)],
+        "d minor": [(62, 1.0), (65, 1.0), (69, 0.5), (70, 0.5), (61, 1.0), (62, 2.0)],
+        # A lone pitch class ties two major keys exactly; music21 picks the higher tonic.
+        "tie": [(63, 1.0), (75, 0.5)],
+    }
+    for label, line in lines.items():
+        part = stream.Part()
+        for idx, (midi_value, duration) in enumerate(line):
+            part.insert(idx, note.Note(midi_value, quarterLength=duration))
+        part.insert(len(line), chord.Chord([60, 64, 67], quarterLength=0.5))
+        for semitones in (0, 2, 9, 14):
+            variant = copy.deepcopy(part)
+            if semitones:
+                variant.transpose(interval.Interval(semitones), inPlace=True)
+            expected = variant.analyze("key")
+            detected = pipeline._key_from_estimate(pipeline._estimate_key(variant))
+            _assert(
+                (detected.tonic.name, detected.mode) == (expected.tonic.name, expected.mode),
+                f"Key detection for {label} +{semitones} gave {detected}, music21 {expected}",
+            )
+            shifted = pipeline._transpose_key_estimate(pipeline._estimate_key(part), semitones)
+            if shifted is not None:
+                detected = pipeline._key_from_estimate(shifted)
+                _assert(
+                    detected.sharps == expected.sharps,
+                    f"Shifted key for {label} +{semitones} gave {detected}, music21 {expected}",
+                )
+    _assert(pipeline._estimate_key(stream.Part()) is None, "Expected no key for an empty part")
+
+
+def check_score_build_family_timings() -> None:
+    from music21 import chord, note, stream
+
+    import pipeline
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-score-") as tmp:
+        tmp_path = Path(tmp)
+        midis: dict[str, str] = {}
+        for stem_name, base in (("sax", 64), ("low", 43)):
+            source = stream.Stream()
+            for idx in range(16):
+                offset = idx * 0.5 + (0.05 if idx % 3 else 0.0)
+                if idx % 5 == 0:
+                    source.insert(offset, chord.Chord([base, base + 4], quarterLength=0.5))
+                else:
+                    source.insert(offset, note.Note(base + idx % 7, quarterLength=0.45))
+            midi_path = tmp_path / f"{stem_name}.mid"
+            source.write("midi", fp=str(midi_path))
+            midis[stem_name] = str(midi_path)
+
+        timings: dict = {}
+        options = {
+            "title": "Smoke",
+            "simplify_enabled": True,
+            "quantize_grid": "1/8",
+            "min_note_duration_beats": 0.25,
+            "density_threshold": 6,
+        }
+        result = pipeline.build_score(
+            midis, {"sax": "Alto Sax 1", "low": "Tuba"}, options, run_dir=tmp_path, timings=timings,
+        )
+        _assert(len(result["parts"]) == 2, "Expected both smoke parts to export")
+        score_timing = timings.get("score_build") or {}
+        _assert(score_timing.get("engine") == pipeline.SIMPLIFY_ENGINE, "Expected cleanup engine in timings")
+        families = score_timing.get("families") or {}
+        _assert(set(families) == {"woodwind", "low_brass"}, f"Unexpected cleanup families: {families}")
+        _assert(all(entry["parts"] == 1 for entry in families.values()), "Expected one part per family")
+        writers = score_timing.get("part_writers") or {}
+        _assert(sum(writers.values()) == 2, f"Expected a writer recorded per exported part: {writers}")
+
+
+def check_parallel_score_build() -> None:
+    import re
+
+    from music21 import note, stream
+
+    import pipeline
+
+    def _normalized(path: str) -> str:
+        text = Path(path).read_text(encoding="utf-8")
+        text = re.sub(r"<encoding-date>.*?</encoding-date>", "", text)
+        return re.sub(r'id="[^"]*"', 'id=""', text)
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-parallel-") as tmp:
+        tmp_path = Path(tmp)
+        midis: dict[str, str] = {}
+        for stem_name, base in (("lead", 67), ("bass", 43)):
+            source = stream.Stream()
+            for idx in range(12):
+                source.insert(idx * 0.5 + (0.04 if idx % 2 else 0.0), note.Note(base + idx % 5, quarterLength=0.45))
+            midi_path = tmp_path / f"{stem_name}.mid"
+            source.write("midi", fp=str(midi_path))
+            midis[stem_name] = str(midi_path)
+        broken = tmp_path / "broken.mid"
+        broken.write_bytes(b"not a midi file")
+        midis = {"lead": midis["lead"], "broken": str(broken), "bass": midis["bass"]}
+        assignment = {"lead": "Flute", "broken": "Bb Trumpet 1", "bass": "Tuba"}
+        options = {
+            "title": "Smoke",
+            "simplify_enabled": True,
+            "quantize_grid": "1/8",
+            "min_note_duration_beats": 0.25,
+            "density_threshold": 6,
+        }
+
+        results = {}
+        for workers in (1, 2):
+            # Both builds must run every part, not reuse the first build's part stages.
+            pipeline.clear_part_stage_cache()
+            timings: dict = {}
+            results[workers] = pipeline.build_score(
+                midis, assignment, options, run_dir=tmp_path / f"w{workers}",
+                timings=timings, max_workers=workers,
+            )
+            _assert(timings["score_build"]["workers"] == workers, f"Expected {workers} score build worker(s)")
+        serial, pooled = results[1], results[2]
+        for result in (serial, pooled):
+            _assert(list(result["parts"]) == ["Flute", "Tuba"], f"Unexpected part order: {list(result['parts'])}")
+            skipped = result["skipped_parts"]
+            _assert(
+                len(skipped) == 1 and skipped[0]["name"] == "Bb Trumpet 1"
+                and skipped[0]["reason"] == "build_failed" and skipped[0].get("error"),
+                f"Expected the broken stem isolated as build_failed: {skipped}",
+            )
+        _assert(
+            _normalized(serial["full_score"]) == _normalized(pooled["full_score"]),
+            "Pooled full score differs from the in-process build",
+        )
+        full_score_xml = Path(serial["full_score"]).read_text(encoding="utf-8")
+        measure_counts = {
+            part.count("<measure ") for part in re.findall(r"<part id=.*?</part>", full_score_xml, re.S)
+        }
+        _assert(len(measure_counts) == 1, f"Full-score parts are not measure-aligned: {measure_counts}")
+        for name in serial["parts"]:
+            _assert(
+                _normalized(serial["parts"][name]) == _normalized(pooled["parts"][name]),
+                f"Pooled part export differs for {name}",
+            )
+
+
+def check_parsed_midi_cache() -> None:
+    import os
+
+    from music21 import note, stream
+
+    import pipeline
+
+    original_max = pipeline.PARSED_MIDI_CACHE_MAX_BYTES
+    pipeline.clear_parsed_midi_cache()
+    try:
+        with tempfile.TemporaryDirectory(prefix="btt-smoke-parsed-") as tmp:
+            midi_path = Path(tmp) / "line.mid"
+            source = stream.Stream()
+            for idx in range(8):
+                source.insert(idx * 0.5, note.Note(60 + idx, quarterLength=0.5))
+            source.write("midi", fp=str(midi_path))
+
+            stats: dict = {}
+            first = pipeline.load_parsed_midi(midi_path, cache_stats=stats)
+            for element in list(first.parts[0].recurse().notes):
+                element.activeSite.remove(element)
+            second = pipeline.load_parsed_midi(midi_path, cache_stats=stats)
+            _assert(stats["parsed_midi"] == {"hits": 1, "misses": 1}, f"Unexpected cache stats: {stats}")
+            _assert(len(second.parts[0].recurse().notes) == 8, "Expected copy-on-read to protect cached score")
+            events = pipeline.load_midi_note_events(midi_path, cache_stats=stats)
+            events["pitch"] = 0
+            again = pipeline.load_midi_note_events(midi_path, cache_stats=stats)
+            _assert(list(again["pitch"]) == list(range(60, 68)), "Expected cached note events to be copied")
+
+            # Rewriting the file (new mtime and content) must miss.
+            source.insert(4.0, note.Note(72, quarterLength=1.0))
+            source.write("midi", fp=str(midi_path))
+            os.utime(midi_path, ns=(1, 1))
+            changed = pipeline.load_parsed_midi(midi_path, cache_stats=stats)
+            _assert(len(changed.parts[0].recurse().notes) == 9, "Expected changed MIDI to be re-parsed")
+            _assert(stats["parsed_midi"]["misses"] == 2, "Expected a miss after the MIDI changed")
+
+            # Entries over the byte budget are evicted oldest-first.
+            pipeline.PARSED_MIDI_CACHE_MAX_BYTES = max(
+                size for _, _, size in pipeline._PARSED_MIDI_ENTRIES.values()
+            ) + 1
+            small_path = Path(tmp) / "small.mid"
+            small = stream.Stream()
+            small.insert(0.0, note.Note(64, quarterLength=1.0))
+            small.write("midi", fp=str(small_path))
+            pipeline.load_parsed_midi(small_path)
+            _assert(len(pipeline._PARSED_MIDI_ENTRIES) == 1, "Expected parsed-MIDI cache to stay bounded")
+    finally:
+        pipeline.PARSED_MIDI_CACHE_MAX_BYTES = original_max
+        pipeline.clear_parsed_midi_cache()
+
+
+def check_direct_part_writer() -> None:
+    import re
+
+    from music21 import chord, note, stream
+
+    import pipeline
+
+    def normalized(path: str) -> str:
+        text = Path(path).read_text(encoding="utf-8")
+        text = re.sub(r"<encoding-date>[^<]*</encoding-date>", "", text)
+        text = re.sub(r"<software>[^<]*</software>", "", text)
+        return re.sub(r' id="[^"]*"', "", text)
+
+    original_writer = pipeline.PART_EXPORT_WRITER
+    try:
+        with tempfile.TemporaryDirectory(prefix="btt-smoke-writer-") as tmp:
+            tmp_path = Path(tmp)
+            source = stream.Stream()
+            for idx in range(24):
+                offset = idx * 0.5 + (0.07 if idx % 4 else 0.0)
+                if idx % 6 == 0:
+                    source.insert(offset, chord.Chord([60, 64, 67], quarterLength=0.5))
+                else:
+                    source.insert(offset, note.Note(55 + (idx * 5) % 19, quarterLength=0.2 + (idx % 3) * 0.45))
+            midi_path = tmp_path / "line.mid"
+            source.write("midi", fp=str(midi_path))
+            options = {
+                "title": "Smoke",
+                "composer": "Smoke Composer",
+                "simplify_enabled": True,
+                "quantize_grid": "1/8",
+                "min_note_duration_beats": 0.25,
+                "density_threshold": 6,
+            }
+            for instrument_name in ("Alto Sax 1", "Tuba", "Snare Drum"):
+                exports: dict[str, str] = {}
+                for writer in ("music21", "direct"):
+                    pipeline.PART_EXPORT_WRITER = writer
+                    part_dir = tmp_path / writer
+                    part_dir.mkdir(exist_ok=True)
+                    result = pipeline._build_part(
+                        {
+                            "midi_path": str(midi_path),
+                            "instrument_name": instrument_name,
+                            "part_label": instrument_name,
+                            "part_dir": str(part_dir),
+                            "engine": pipeline.SIMPLIFY_ENGINE,
+                            "parsed": None,
+                            "return_parsed": False,
+                            "options": options,
+                        }
+                    )
+                    _assert(result.get("part_writer") == writer, f"Expected {writer} writer for {instrument_name}")
+                    exports[writer] = normalized(result["part_xml"])
+                _assert(
+                    exports["direct"] == exports["music21"],
+                    f"Direct part MusicXML diverged from music21 for {instrument_name}",
+                )
+
+            # Anything the direct writer does not cover (here a chord) falls back to music21.
+            chord_score = stream.Score()
+            chord_part = stream.Part()
+            chord_part.append(chord.Chord([60, 64, 67], quarterLength=4.0))
+            chord_score.insert(0, chord_part)
+            fallback = pipeline._write_part_musicxml(chord_score, tmp_path / "chord.musicxml", "Smoke", "")
+            _assert(fallback == "music21", "Expected chord parts to fall back to music21's exporter")
+            _assert((tmp_path / "chord.musicxml").exists(), "Expected fallback part MusicXML on disk")
+    finally:
+        pipeline.PART_EXPORT_WRITER = original_writer
+
+
+def check_part_stage_cache() -> None:
+    import re
+
+    from music21 import note, stream
+
+    import pipeline
+
+    def normalized(path: str) -> str:
+        text = Path(path).read_text(encoding="utf-8")
+        text = re.sub(r"<encoding-date>[^<]*</encoding-date>", "", text)
+        return re.sub(r' id="[^"]*"', "", text)
+
+    pipeline.clear_part_stage_cache()
+    try:
+        with tempfile.TemporaryDirectory(prefix="btt-smoke-stages-") as tmp:
+            tmp_path = Path(tmp)
+            midis: dict[str, str] = {}
+            for stem_name, base in (("sax", 64), ("low", 43)):
+                source = stream.Stream()
+                for idx in range(16):
+                    source.insert(idx * 0.5 + (0.05 if idx % 3 else 0.0), note.Note(base + idx % 7, quarterLength=0.45))
+                midi_path = tmp_path / f"{stem_name}.mid"
+                source.write("midi", fp=str(midi_path))
+                midis[stem_name] = str(midi_path)
+            assignment = {"sax": "Alto Sax 1", "low": "Tuba"}
+            options = {
+                "title": "Smoke",
+                "composer": "",
+                "school": "",
+                "simplify_enabled": True,
+                "quantize_grid": "1/8",
+                "min_note_duration_beats": 0.25,
+                "density_threshold": 6,
+            }
+
+            def build(run_name: str, run_options: dict) -> tuple[dict, dict, dict]:
+                timings: dict = {}
+                stats: dict = {}
+                result = pipeline.build_score(
+                    midis, assignment, run_options, run_dir=tmp_path / run_name,
+                    timings=timings, cache_stats=stats, max_workers=1,
+                )
+                return result, timings["score_build"]["reused_stages"], stats.get("part_stages", {})
+
+            _, reused, stats = build("first", options)
+            _assert(reused == {} and stats == {"hits": 0, "misses": 2}, f"Unexpected first build reuse: {stats}")
+            same, reused, _ = build("same", options)
+            _assert(
+                all(stages == ["part_build", "part_export"] for stages in reused.values()) and len(reused) == 2,
+                f"Expected an unchanged rerun to reuse both part stages: {reused}",
+            )
+            _assert(Path(same["parts"]["Tuba"]).exists(), "Expected reused part MusicXML in the new run")
+
+            renamed = dict(options, title="Smoke Renamed", composer="Someone", school="Smoke School")
+            rerun, reused, _ = build("renamed", renamed)
+            _assert(
+                all(stages == ["part_build"] for stages in reused.values()) and len(reused) == 2,
+                f"Expected a metadata-only rerun to rewrite part exports: {reused}",
+            )
+            pipeline.clear_part_stage_cache()
+            fresh, reused, _ = build("fresh", renamed)
+            _assert(reused == {}, "Expected a cleared cache to rebuild every part")
+            for label in ("Alto Sax 1", "Tuba"):
+                _assert(
+                    normalized(rerun["parts"][label]) == normalized(fresh["parts"][label]),
+                    f"Rerun part export diverged from a fresh build for {label}",
+                )
+            _assert(
+                normalized(rerun["full_score"]) == normalized(fresh["full_score"]),
+                "Rerun full score diverged from a fresh build",
+            )
+
+            _, reused, _ = build("profile", dict(renamed, quantize_grid="1/16"))
+            _assert(reused == {}, "Expected a cleanup option change to rebuild every part")
+    finally:
+        pipeline.clear_part_stage_cache()
+
+
+def check_evaluate_simplification() -> None:
+    from music21 import note, stream
+
+    import pipeline
+    from config import SIMPLIFY_PROFILES
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-sweep-") as tmp:
+        tmp_path = Path(tmp)
+        midis: dict[str, str] = {}
+        for stem_name, pitches in (("calm", [60, 62, 64, 65, 67]), ("wild", [60, 73, 58, 75, 61, 78])):
+            source = stream.Stream()
+            for idx in range(24):
+                source.insert(idx * 0.5, note.Note(pitches[idx % len(pitches)], quarterLength=0.5))
+            midi_path = tmp_path / f"{stem_name}.mid"
+            source.write("midi", fp=str(midi_path))
+            midis[stem_name] = str(midi_path)
+        assignment = {"calm": "Flute", "wild": "Alto Sax 1", "unused": ""}
+        for profile in ("Beginner", "Easy Intermediate"):
+            options = dict(SIMPLIFY_PROFILES[profile], simplify_enabled=True, profile=profile, title="Smoke")
+            rows = pipeline.evaluate_simplification(midis, assignment, options)
+            _assert([row["part"] for row in rows] == ["Flute", "Alto Sax 1"], f"Unexpected sweep rows: {rows}")
+            _assert(all("accidental_density" in row and row["wall_s"] >= 0 for row in rows), "Expected metrics per row")
+            pipeline.clear_part_stage_cache()
+            built = pipeline.build_score(midis, assignment, options, run_dir=tmp_path / profile.replace(" ", "_"), max_workers=1)
+            expected = {item["name"]: item["reason"] for item in built["skipped_parts"]}
+            swept = {row["part"]: row["reason"] for row in rows if row["status"] == "skipped"}
+            _assert(swept == expected, f"Sweep skips {swept} differ from build_score skips {expected} ({profile})")
+    pipeline.clear_part_stage_cache()
+
+
+def check_score_build_pass_timings() -> None:
+    import json
+
+    from music21 import note, stream
+
+    import pipeline
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-passes-") as tmp:
+        tmp_path = Path(tmp)
+        source = stream.Stream()
+        for idx in range(12):
+            source.insert(idx * 0.5, note.Note(60 + idx % 5, quarterLength=0.5))
+        midi_path = tmp_path / "line.mid"
+        source.write("midi", fp=str(midi_path))
+        midis = {"line": str(midi_path)}
+        assignment = {"line": "Flute"}
+        options = {"title": "Smoke", "simplify_enabled": True, "quantize_grid": "1/8"}
+        original_profile = pipeline.SCORE_BUILD_PROFILE
+        try:
+            for profile, artifact in (("", None), ("trace", "score_build_trace.json"), ("cprofile", "score_build.prof")):
+                pipeline.SCORE_BUILD_PROFILE = profile
+                pipeline.clear_part_stage_cache()
+                run_dir = tmp_path / (profile or "plain")
+                timings: dict = {}
+                pipeline.build_score(midis, assignment, options, run_dir=run_dir, timings=timings, max_workers=1)
+                score_build = timings["score_build"]
+                passes = score_build["passes"]
+                cleanup_pass = "events_cleanup" if pipeline.SIMPLIFY_ENGINE == "events" else "simplify"
+                for name in (cleanup_pass, "transpose", "part_export", "align_measures", "full_score_write"):
+                    _assert(passes.get(name, {}).get("calls", 0) >= 1, f"Missing timed pass {name}: {sorted(passes)}")
+                _assert(passes["transpose"]["notes"] > 0, f"Expected a note count for transpose: {passes['transpose']}")
+                _assert(list(score_build["parts"]) == ["Flute"], f"Unexpected per-part passes: {score_build['parts']}")
+                if artifact is None:
+                    _assert("profile" not in score_build, "Profiling output written while disabled")
+                    continue
+                _assert(score_build.get("profile") == str(run_dir / artifact), f"Unexpected profile path: {score_build}")
+                _assert((run_dir / artifact).stat().st_size > 0, f"Missing {artifact}")
+            events = json.loads((tmp_path / "trace" / "score_build_trace.json").read_text())["traceEvents"]
+            _assert(
+                {event["args"]["part"] for event in events if event["ph"] == "X"} == {"score", "Flute"},
+                "Expected trace events for the part and the full score",
+            )
+        finally:
+            pipeline.SCORE_BUILD_PROFILE = original_profile
+            pipeline.clear_part_stage_cache()
+
+
+def check_linear_measure_alignment() -> None:
+    from music21 import clef, meter, note, stream
+
+    import pipeline
+
+    def make_score(signatures: tuple[str, str]) -> stream.Score:
+        score = stream.Score()
+        held = stream.Part()
+        held.insert(0, clef.TrebleClef())
+        held.insert(0, meter.TimeSignature(signatures[0]))
+        held.insert(0, note.Note("C4", quarterLength=3.0))
+        held.insert(3.0, note.Note("D4", quarterLength=2.0))  # crosses the first 4/4 barline
+        longer = stream.Part()
+        longer.insert(0, meter.TimeSignature(signatures[1]))
+        for idx in range(10):
+            longer.insert(float(idx), note.Note("G3", quarterLength=1.0))
+        score.insert(0, held)
+        score.insert(0, longer)
+        return score
+
+    score = make_score(("4/4", "4/4"))
+    _assert(pipeline._align_score_measures_linear(score), "Expected the linear engine to handle one shared meter")
+    for part in score.parts:
+        measures = list(part.getElementsByClass(stream.Measure))
+        _assert([m.number for m in measures] == [1, 2, 3], f"Expected 3 shared bars, got {len(measures)}")
+        _assert(all(float(m.duration.quarterLength) == 4.0 for m in measures), "Expected every bar filled to 4/4")
+    held_notes = list(score.parts[0].recurse().notes)
+    _assert(
+        [(n.nameWithOctave, float(n.quarterLength), n.tie.type if n.tie else None) for n in held_notes]
+        == [("C4", 3.0, None), ("D4", 1.0, "start"), ("D4", 1.0, "stop")],
+        f"Expected the barline-crossing note to be tied over: {held_notes}",
+    )
+    _assert(
+        held_notes[2].getOffsetInHierarchy(score.parts[0]) == 4.0, "Expected the tied continuation on the barline"
+    )
+
+    mixed = make_score(("3/4", "4/4"))
+    _assert(not pipeline._align_score_measures_linear(mixed), "Expected mixed meters to fall back")
+    _assert(
+        all(not part.getElementsByClass(stream.Measure) for part in mixed.parts),
+        "Expected the fallback check to leave the score untouched",
+    )
+    pipeline._align_score_measures(mixed)
+    _assert(
+        all(part.getElementsByClass(stream.Measure) for part in mixed.parts),
+        "Expected the music21 engine to align mixed meters",
+    )
+
+
+def check_batch_pdf_render() -> None:
+    from music21 import note, stream
+
+    import pipeline
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-render-") as tmp:
+        tmp_path = Path(tmp)
+        calls_log = tmp_path / "calls.log"
+        stub = tmp_path / "mscore"
+        stub.write_text(
+            f"#!{sys.executable}\n"
+            "import json, sys, time\n"
+            "from pathlib import Path\n"
+            "started = time.time()\n"
+            "if sys.argv[1] == '-j':\n"
+            "    jobs = json.loads(Path(sys.argv[2]).read_text())\n"
+            "else:\n"
+            "    jobs = [{'in': sys.argv[3], 'out': sys.argv[2]}]\n"
+            "failed = False\n"
+            "for job in jobs:\n"
+            "    time.sleep(10 if 'slow' in Path(job['in']).name else 0.2)\n"
+            "    if 'broken' in Path(job['in']).name:\n"
+            "        failed = True\n"
+            "        continue\n"
+            "    Path(job['out']).write_bytes(b'%PDF-stub')\n"
+            f"with open({str(calls_log)!r}, 'a') as log:\n"
+            "    log.write(f'{sys.argv[1]} {started} {time.time()}\\n')\n"
+            "sys.exit('cannot render broken file' if failed else 0)\n"
+        )
+        stub.chmod(0o755)
+
+        def write_xml(path: Path) -> str:
+            source = stream.Stream()
+            for idx in range(4):
+                source.append(note.Note(60 + idx, quarterLength=1.0))
+            source.write("musicxml", fp=str(path))
+            return str(path)
+
+        score_data = {
+            "full_score": write_xml(tmp_path / "Smoke.musicxml"),
+            "parts": {
+                "Flute": write_xml(tmp_path / "flute.musicxml"),
+                "Tuba": write_xml(tmp_path / "broken_tuba.musicxml"),
+                "Oboe": write_xml(tmp_path / "oboe.musicxml"),
+            },
+            "skipped_parts": [],
+        }
+        original = (
+            pipeline.MUSESCORE_CMD, pipeline.MUSESCORE_RENDER_MODE, pipeline.OUTPUT_DIR, pipeline.MUSESCORE_TIMEOUT_S,
+        )
+        pipeline.MUSESCORE_CMD = str(stub)
+        pipeline.OUTPUT_DIR = tmp_path / "outputs"
+
+        def launches() -> list[tuple[str, float, float]]:
+            rows = [line.split() for line in calls_log.read_text().splitlines()]
+            return sorted((flag, float(start), float(end)) for flag, start, end in rows)
+
+        try:
+            for mode, expected_calls, expected_retries in (
+                ("batch", ["-j", "-o"], ["Tuba.pdf"]),
+                ("per_file", ["-o"] * 4, []),
+            ):
+                pipeline.MUSESCORE_RENDER_MODE = mode
+                calls_log.write_text("")
+                timings: dict = {}
+                result = pipeline.render_pdfs(score_data, run_id=f"smoke_{mode}", timings=timings, max_workers=1)
+                calls = [flag for flag, _, _ in launches()]
+                _assert(sorted(calls) == expected_calls, f"Unexpected MuseScore launches for {mode}: {calls}")
+                _assert(
+                    timings["render"]["processes"] == len(expected_calls)
+                    and timings["render"]["retried"] == expected_retries,
+                    f"Bad render timings for {mode}: {timings}",
+                )
+                report = {entry["name"]: entry for entry in result["part_report"]}
+                _assert(list(report) == ["Flute", "Tuba", "Oboe"], f"Part report lost stem order: {list(report)}")
+                _assert(
+                    report["Tuba"]["reason"] == "render_failed" and report["Tuba"].get("error"),
+                    f"Expected the broken part mapped to render_failed ({mode}): {report['Tuba']}",
+                )
+                _assert(
+                    report["Flute"]["status"] == report["Oboe"]["status"] == "exported",
+                    f"Expected the other parts exported ({mode})",
+                )
+                _assert(
+                    len(result["paths"]) == 3 and all(Path(path).stat().st_size for path in result["paths"]),
+                    f"Expected full score plus two part PDFs ({mode}): {result['paths']}",
+                )
+
+            # Concurrent per-file renders: the full score overlaps the parts, a hung part times out.
+            pipeline.MUSESCORE_RENDER_MODE = "per_file"
+            pipeline.MUSESCORE_TIMEOUT_S = 2
+            calls_log.write_text("")
+            slow_data = dict(score_data, parts=dict(score_data["parts"], Horn=write_xml(tmp_path / "slow_horn.musicxml")))
+            timings = {}
+            result = pipeline.render_pdfs(slow_data, run_id="smoke_pool", timings=timings, max_workers=5)
+            _assert(timings["render"]["workers"] == 5, f"Expected 5 concurrent renders: {timings['render']}")
+            _assert(
+                [entry["name"] for entry in result["part_report"]] == ["Flute", "Tuba", "Oboe", "Horn"],
+                "Concurrent renders lost stem order",
+            )
+            horn = result["part_report"][3]
+            _assert(
+                horn["reason"] == "render_failed" and "timed out" in horn.get("error", ""),
+                f"Expected the hung part reported as timed out: {horn}",
+            )
+            spans = launches()
+            _assert(
+                max(start for _, start, _ in spans) < min(end for _, _, end in spans),
+                "Expected the full score and part renders to overlap",
+            )
+            _assert(timings["render"]["total_s"] < 8, f"Hung render was not cut off: {timings['render']}")
+        finally:
+            (
+                pipeline.MUSESCORE_CMD, pipeline.MUSESCORE_RENDER_MODE, pipeline.OUTPUT_DIR, pipeline.MUSESCORE_TIMEOUT_S,
+            ) = original
+
+
+def check_render_cache() -> None:
+    from music21 import note, stream
+
+    import pipeline
+
+    with tempfile.TemporaryDirectory(prefix="btt-smoke-render-cache-") as tmp:
+        tmp_path = Path(tmp)
+        calls_log = tmp_path / "calls.log"
+        stubs = {}
+        for version in ("4.4.0", "4.5.0"):
+            stub = tmp_path / f"mscore-{version}"
+            stub.write_text(
+                f"#!{sys.executable}\n"
+                "import hashlib, json, sys\n"
+                "from pathlib import Path\n"
+                "if sys.argv[1] == '--version':\n"
+                f"    print('MuseScore4 {version}')\n"
+                "    sys.exit(0)\n"
+                "if sys.argv[1] == '-j':\n"
+                "    jobs = json.loads(Path(sys.argv[2]).read_text())\n"
+                "else:\n"
+                "    jobs = [{'in': sys.argv[3], 'out': sys.argv[2]}]\n"
+                "for job in jobs:\n"
+                "    digest = hashlib.sha256(Path(job['in']).read_bytes()).hexdigest()\n"
+                "    Path(job['out']).write_text('%PDF-stub ' + digest)\n"
+                f"with open({str(calls_log)!r}, 'a') as log:\n"
+                "    log.write(f'{sys.argv[1]} {len(jobs)}\\n')\n"
+            )
+            stub.chmod(0o755)
+            stubs[version] = str(stub)
+
+        def write_xml(path: Path, pitches: range) -> str:
+            source = stream.Stream()
+            for pitch in pitches:
+                source.append(note.Note(pitch, quarterLength=1.0))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            source.write("musicxml", fp=str(path))
+            return str(path)
+
+        def export(folder: str, flute_pitches: range = range(60, 64)) -> dict:
+            # Every export gets fresh music21 part/instrument ids, as a real rebuild would.
+            root = tmp_path / folder
+            return {
+                "full_score": write_xml(root / "Smoke.musicxml", range(60, 64)),
+                "parts": {
+                    "Flute": write_xml(root / "flute.musicxml", flute_pitches),
+                    "Oboe": write_xml(root / "oboe.musicxml", range(65, 69)),
+                },
+                "skipped_parts": [],
+            }
+
+        def render(score_data: dict, run_id: str) -> tuple[dict, dict, list[str]]:
+            calls_log.write_text("")
+            stats: dict = {}
+            timings: dict = {}
+            result = pipeline.render_pdfs(score_data, run_id=run_id, timings=timings, cache_stats=stats)
+            _assert(len(result["paths"]) == 3, f"Expected three PDFs: {result['paths']}")
+            return stats.get("renders", {}), timings["render"], calls_log.read_text().split()
+
+        original = (
+            pipeline.MUSESCORE_CMD, pipeline.MUSESCORE_RENDER_MODE, pipeline.OUTPUT_DIR,
+            pipeline.RENDER_CACHE_ENABLED, pipeline.RENDER_CACHE_DIR, pipeline.RENDER_CACHE_MAX_BYTES,
+        )
+        pipeline.MUSESCORE_CMD = stubs["4.4.0"]
+        pipeline.MUSESCORE_RENDER_MODE = "batch"
+        pipeline.OUTPUT_DIR = tmp_path / "outputs"
+        pipeline.RENDER_CACHE_ENABLED = True
+        pipeline.RENDER_CACHE_DIR = tmp_path / "render-cache"
+        try:
+            stats, timings, calls = render(export("first"), "run_a")
+            _assert(stats == {"hits": 0, "misses": 3}, f"Expected a cold render cache: {stats}")
+            _assert(calls == ["-j", "3"], f"Expected one batch render of every PDF: {calls}")
+
+            stats, timings, calls = render(export("rebuilt"), "run_b")
+            _assert(stats == {"hits": 3, "misses": 0}, f"Rebuilt MusicXML should hit the cache: {stats}")
+            _assert(calls == [] and timings["processes"] == 0, f"Cache hits must not launch MuseScore: {calls}")
+            _assert(len(timings["cached"]) == 3, f"Expected cached PDFs in render timings: {timings}")
+            flute_pdf = pipeline.OUTPUT_DIR / "run_b" / "Flute.pdf"
+            cached_flute = flute_pdf.read_text()
+            _assert(flute_pdf.stat().st_nlink > 1, "Expected cache hits hard-linked into outputs/<run_id>/")
+
+            # Only the changed part is re-engraved, and re-rendering over a linked PDF leaves the
+            # cached copy intact.
+            stats, timings, calls = render(export("changed", range(70, 74)), "run_b")
+            _assert(stats == {"hits": 2, "misses": 1}, f"Expected one changed part to miss: {stats}")
+            _assert(calls == ["-o", "1"], f"Expected one MuseScore launch for the changed part: {calls}")
+            _assert(flute_pdf.read_text() != cached_flute, "Changed part kept its stale PDF")
+            stats, _, calls = render(export("again"), "run_c")
+            _assert(stats["hits"] == 3 and calls == [], f"Re-render corrupted a cached PDF: {stats} {calls}")
+            _assert(
+                (pipeline.OUTPUT_DIR / "run_c" / "Flute.pdf").read_text() == cached_flute,
+                "Cached PDF content changed after a re-render into a linked output",
+            )
+
+            pipeline.MUSESCORE_CMD = stubs["4.5.0"]
+            stats, _, calls = render(export("upgraded"), "run_d")
+            _assert(stats == {"hits": 0, "misses": 3}, f"A MuseScore upgrade must invalidate renders: {stats}")
+
+            pipeline.RENDER_CACHE_MAX_BYTES = 0
+            stats, _, _ = render(export("evicted", range(50, 54)), "run_e")
+            remaining = sorted(path.name for path in pipeline.RENDER_CACHE_DIR.iterdir())
+            _assert(len(remaining) == 3, f"Eviction should keep only this run's renders: {remaining}")
+        finally:
+            (
+                pipeline.MUSESCORE_CMD, pipeline.MUSESCORE_RENDER_MODE, pipeline.OUTPUT_DIR,
+                pipeline.RENDER_CACHE_ENABLED, pipeline.RENDER_CACHE_DIR, pipeline.RENDER_CACHE_MAX_BYTES,
+            ) = original
+
+
 def main() -> int:
     checks = [
         ("imports", check_imports),
         ("config invariants", check_config_invariants),
+        ("demucs profiles", check_demucs_profiles),
         ("manifest roundtrip", check_manifest_roundtrip),
         ("run prune helpers", check_run_prune_helpers),
         ("manifest loader", check_load_run_manifest),
         ("outcome status contract", check_outcome_status_contract),
         ("source validation helpers", check_source_validation_helpers),
         ("export zip inspection helper", check_export_zip_inspection_helper),
+        ("content cache helpers", check_content_cache_helpers),
+        ("input cache isolation", check_input_cache_isolation),
+        ("parallel transcription", check_parallel_transcription),
         ("simplify part effectiveness", check_simplify_part_effectiveness),
+        ("single-line engine parity", check_single_line_engine_parity),
+        ("key detection", check_key_detection_matches_music21),
+        ("score build family timings", check_score_build_family_timings),
+        ("parallel score build", check_parallel_score_build),
+        ("parsed-midi cache", check_parsed_midi_cache),
+        ("direct part writer", check_direct_part_writer),
+        ("part-stage cache", check_part_stage_cache),
+        ("evaluate simplification", check_evaluate_simplification),
+        ("score build pass timings", check_score_build_pass_timings),
+        ("linear measure alignment", check_linear_measure_alignment),
+        ("batch pdf render", check_batch_pdf_render),
+        ("render cache", check_render_cache),
     ]
 
     failed = False
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Sweep simplification parameters over existing runs and tabulate playability per part."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config import APP_VERSION, SIMPLIFY_PROFILES
+
+PARAM_KEYS = ("profile", "quantize_grid", "min_note_duration_beats", "density_threshold")
+RESULT_COLUMNS = [
+    "run_id",
+    "cell_id",
+    "profile",
+    "quantize_grid",
+    "min_note_duration_beats",
+    "density_threshold",
+    "part",
+    "instrument",
+    "family",
+    "status",
+    "reason",
+    "note_count",
+    "accidental_density",
+    "large_leap_rate",
+    "short_note_rate",
+    "cleanup_s",
+    "wall_s",
+    "rendered_run",
+    "error",
+]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run build_score's simplification stage over a parameter grid for existing runs."
+    )
+    parser.add_argument("--runs-dir", default="temp/runs", help="Path containing run folders.")
+    parser.add_argument("--out-root", default="datasets/sweeps", help="Sweep output root.")
+    parser.add_argument("--sweep-id", default="", help="Optional explicit sweep id.")
+    parser.add_argument(
+        "--run-id",
+        action="append",
+        default=[],
+        required=True,
+        help="Run ID whose transcribed MIDI and assignments to sweep (can be repeated).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        help="SIMPLIFY_PROFILES entry to sweep (repeatable; default: every profile).",
+    )
+    parser.add_argument(
+        "--quantize-grid",
+        action="append",
+        default=[],
+        help="quantize_grid value (repeatable; default: each profile's own).",
+    )
+    parser.add_argument(
+        "--min-duration",
+        action="append",
+        type=float,
+        default=[],
+        help="min_note_duration_beats value (repeatable; default: each profile's own).",
+    )
+    parser.add_argument(
+        "--density",
+        action="append",
+        type=int,
+        default=[],
+        help="density_threshold value (repeatable; default: each profile's own).",
+    )
+    parser.add_argument(
+        "--workers",
+        default="auto",
+        help="Worker processes ('auto' = one per CPU core, capped like the score build; 1 = in-process).",
+    )
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="Also build and render each cell with MuseScore as a new run (see generate_tuning_batch.py).",
+    )
+    return parser.parse_args()
+
+
+def _load_manifest(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except Exception:
+        return None
+
+
+def _run_inputs(runs_dir: Path, run_id: str) -> dict:
+    """Assignments and per-stem Basic Pitch MIDI paths recorded for a run."""
+    run_dir = runs_dir / run_id
+    data = _load_manifest(run_dir / "manifest.json")
+    if not data:
+        raise SystemExit(f"Missing or unreadable manifest for run {run_id}: {run_dir / 'manifest.json'}")
+    assignment = {
+        str(stem): str(instrument)
+        for stem, instrument in (data.get("assignments") or {}).items()
+        if str(instrument or "").strip()
+    }
+    midis: dict[str, str] = {}
+    for stem_name in assignment:
+        candidates = sorted((run_dir / "midi" / stem_name).glob("*.mid"))
+        if candidates:
+            midis[stem_name] = str(candidates[0])
+    if not midis:
+        raise SystemExit(f"No transcribed MIDI found for run {run_id} under {run_dir / 'midi'}")
+    source = data.get("input") or {}
+    return {
+        "run_id": run_id,
+        "midis": midis,
+        "assignment": assignment,
+        "source_type": str(source.get("type", "")),
+        "source_value": str(source.get("value", "")),
+    }
+
+
+def _grid_cells(args: argparse.Namespace) -> list[dict]:
+    """Cross product of profiles and parameter overrides, deduplicated, in a stable order."""
+    profiles = args.profile or list(SIMPLIFY_PROFILES)
+    unknown = [name for name in profiles if name not in SIMPLIFY_PROFILES]
+    if unknown:
+        raise SystemExit(f"Unknown profile(s): {', '.join(unknown)}")
+    cells: list[dict] = []
+    seen: set[tuple] = set()
+    for profile in profiles:
+        base = SIMPLIFY_PROFILES[profile]
+        for grid, min_duration, density in itertools.product(
+            args.quantize_grid or [base["quantize_grid"]],
+            args.min_duration or [base["min_note_duration_beats"]],
+            args.density or [base["density_threshold"]],
+        ):
+            params = {
+                "profile": profile,
+                "quantize_grid": str(grid),
+                "min_note_duration_beats": float(min_duration),
+                "density_threshold": int(density),
+            }
+            identity = tuple(params.values())
+            if identity in seen:
+                continue
+            seen.add(identity)
+            cells.append(dict(params, cell_id=f"C{len(cells) + 1:03d}"))
+    return cells
+
+
+def _render_cell(task: dict, options: dict, timings: dict) -> str:
+    """Build and render one cell as its own run folder; returns the new run id.
+
+    Inside the sweep pool the build and render stay serial: cells already run one per
+    worker, and nested "auto" pools would start about workers x workers processes.
+    """
+    from pipeline import build_score, render_pdfs
+    from utils import get_tool_versions, sanitize_filename, write_run_manifest
+
+    runs_dir = Path(task["runs_dir"])
+    run_id = sanitize_filename(f"{task['run_id']}_{task['sweep_id']}_{task['cell_id']}")
+    run_dir = runs_dir / run_id
+    max_workers = 1 if task["in_pool"] else None
+    score_data = build_score(
+        task["midis"], task["assignment"], options, run_dir=run_dir, timings=timings, max_workers=max_workers,
+    )
+    cache_stats: dict = {}
+    rendered = render_pdfs(
+        score_data, run_id=run_id, timings=timings, max_workers=max_workers, cache_stats=cache_stats,
+    )
+    write_run_manifest(
+        manifest_path=run_dir / "manifest.json",
+        run_id=run_id,
+        source_type=task["source_type"],
+        source_value=task["source_value"],
+        options=options,
+        assignments=task["assignment"],
+        part_report=rendered["part_report"],
+        pipeline={
+            "app_version": APP_VERSION,
+            "sweep_id": task["sweep_id"],
+            "sweep_cell": task["cell_id"],
+            "source_run": task["run_id"],
+        },
+        tool_versions=get_tool_versions(),
+        zip_filename="",
+        outcome_success=True,
+        cache_stats=cache_stats,
+        timings=timings,
+    )
+    return run_id
+
+
+def _evaluate_cell(task: dict) -> dict:
+    """Simplification metrics for one (run, cell); runs in a pool worker."""
+    from pipeline import evaluate_simplification
+
+    started = time.perf_counter()
+    options = {
+        "title": f"{task['run_id']} {task['cell_id']}",
+        "composer": "",
+        "school": "",
+        "simplify_enabled": True,
+        "profile": task["params"]["profile"],
+        "quantize_grid": task["params"]["quantize_grid"],
+        "min_note_duration_beats": task["params"]["min_note_duration_beats"],
+        "density_threshold": task["params"]["density_threshold"],
+    }
+    rows = evaluate_simplification(task["midis"], task["assignment"], options)
+    rendered_run = ""
+    render_error = ""
+    if task["render"]:
+        try:
+            rendered_run = _render_cell(task, options, {})
+        except Exception as exc:
+            render_error = f"{type(exc).__name__}: {exc}"
+    return {
+        "rows": rows,
+        "rendered_run": rendered_run,
+        "render_error": render_error,
+        "wall_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def _run_tasks(tasks: list[dict], workers: int) -> list[dict]:
+    """Evaluate every task, on a process pool when workers > 1; results keep task order."""
+    if workers <= 1:
+        return [_evaluate_cell(task) for task in tasks]
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # Each worker keeps its own parsed-MIDI cache, so a run's stems parse once per worker.
+        return list(pool.map(_evaluate_cell, tasks))
+
+
+def _cell_summary(cell: dict, rows: list[dict]) -> dict:
+    kept = [row for row in rows if row["status"] == "kept"]
+    reasons: dict[str, int] = {}
+    for row in rows:
+        if row["status"] == "skipped":
+            reasons[row["reason"]] = reasons.get(row["reason"], 0) + 1
+
+    def _mean(key: str) -> float | None:
+        values = [float(row[key]) for row in kept if row.get(key) is not None]
+        return round(sum(values) / len(values), 4) if values else None
+
+    return {
+        "cell_id": cell["cell_id"],
+        "params": {key: cell[key] for key in PARAM_KEYS},
+        "parts": len(rows),
+        "kept_parts": len(kept),
+        "skipped": reasons,
+        "mean_accidental_density": _mean("accidental_density"),
+        "mean_large_leap_rate": _mean("large_leap_rate"),
+        "mean_short_note_rate": _mean("short_note_rate"),
+        "cleanup_s": round(sum(float(row["cleanup_s"] or 0.0) for row in rows), 3),
+    }
+
+
+def main() -> int:
+    args = _parse_args()
+    runs_dir = Path(args.runs_dir)
+    sweep_id = args.sweep_id.strip() or f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    sweep_dir = Path(args.out_root) / sweep_id
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+
+    inputs = [_run_inputs(runs_dir, run_id) for run_id in dict.fromkeys(args.run_id)]
+    cells = _grid_cells(args)
+    tasks = [
+        dict(
+            run_input,
+            cell_id=cell["cell_id"],
+            params={key: cell[key] for key in PARAM_KEYS},
+            render=bool(args.render),
+            runs_dir=str(runs_dir),
+            sweep_id=sweep_id,
+        )
+        for run_input in inputs
+        for cell in cells
+    ]
+
+    from pipeline import score_build_worker_count
+
+    requested = args.workers if args.workers == "auto" else int(args.workers)
+    workers = score_build_worker_count(len(tasks), requested)
+    for task in tasks:
+        task["in_pool"] = workers > 1
+    print(f"Sweeping {len(cells)} cell(s) x {len(inputs)} run(s) on {workers} worker(s)...")
+    started = time.perf_counter()
+    outcomes = _run_tasks(tasks, workers)
+    elapsed = time.perf_counter() - started
+
+    results_path = sweep_dir / "results.csv"
+    all_rows: list[dict] = []
+    rendered_runs: list[str] = []
+    summaries: list[dict] = []
+    with results_path.open("w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=RESULT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for task, outcome in zip(tasks, outcomes):
+            if outcome["rendered_run"]:
+                rendered_runs.append(outcome["rendered_run"])
+            cell_rows = []
+            for row in outcome["rows"]:
+                full_row = dict(
+                    row,
+                    run_id=task["run_id"],
+                    cell_id=task["cell_id"],
+                    rendered_run=outcome["rendered_run"],
+                    error=row.get("error") or outcome["render_error"],
+                    **task["params"],
+                )
+                writer.writerow(full_row)
+                cell_rows.append(full_row)
+            all_rows.extend(cell_rows)
+            summary = _cell_summary(dict(task["params"], cell_id=task["cell_id"]), cell_rows)
+            summary.update(
+                run_id=task["run_id"],
+                wall_s=outcome["wall_s"],
+                rendered_run=outcome["rendered_run"],
+                render_error=outcome["render_error"],
+            )
+            summaries.append(summary)
+
+    manifest = {
+        "sweep_id": sweep_id,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "app_version": APP_VERSION,
+        "source_runs": [item["run_id"] for item in inputs],
+        "workers": workers,
+        "wall_s": round(elapsed, 3),
+        "cells": [
+            {key: cell[key] for key in ("cell_id", *PARAM_KEYS)} for cell in cells
+        ],
+        "results_csv": str(results_path),
+        "rendered_runs": rendered_runs,
+        "summary": summaries,
+    }
+    manifest_path = sweep_dir / "sweep_manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    print(f"Created sweep: {sweep_id}")
+    print(f"- results: {results_path} ({len(all_rows)} part rows)")
+    print(f"- manifest: {manifest_path}")
+    print(f"- wall time: {elapsed:.1f}s")
+    if rendered_runs:
+        print(f"- rendered runs: {len(rendered_runs)} (use generate_tuning_batch.py --sweep {manifest_path})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
+import os
 import re
 import shutil
 import subprocess
@@ -77,6 +80,26 @@ def validate_single_video_youtube_url(url: str, youtube_domains: tuple[str, ...]
     return ""
 
 
+def extract_youtube_video_id(url: str) -> str:
+    """Return the YouTube video ID for watch/short/embed/youtu.be URLs, else empty string."""
+    try:
+        parsed = urlparse((url or "").strip())
+    except ValueError:
+        return ""
+    host = (parsed.netloc or "").lower().split(":", 1)[0]
+    path_parts = [part for part in (parsed.path or "").split("/") if part]
+    candidate = ""
+    if host == "youtu.be" or host.endswith(".youtu.be"):
+        candidate = path_parts[0] if path_parts else ""
+    else:
+        query = parse_qs(parsed.query)
+        if query.get("v"):
+            candidate = query["v"][0]
+        elif len(path_parts) >= 2 and path_parts[0] in ("shorts", "embed", "live", "v"):
+            candidate = path_parts[1]
+    return candidate if re.fullmatch(r"[A-Za-z0-9_-]{6,64}", candidate or "") else ""
+
+
 def zip_outputs(paths: list[str], zip_path: str) -> str:
     zip_file = Path(zip_path)
     zip_file.parent.mkdir(parents=True, exist_ok=True)
@@ -222,24 +245,51 @@ def get_tool_paths(tool_specs: list[dict]) -> list[dict]:
     return resolved
 
 
+_TOOL_VERSION_CMDS = {
+    "streamlit": ["streamlit", "--version"],
+    "demucs": ["demucs", "--help"],
+    "basic-pitch": ["basic-pitch", "--help"],
+    "ffmpeg": ["ffmpeg", "-version"],
+}
+
+# Python-packaged tools report their distribution version; the CLI first line is
+# only a fallback (for demucs/basic-pitch it is a usage line, not a version).
+_TOOL_PACKAGE_NAMES = {"demucs": "demucs", "basic-pitch": "basic-pitch"}
+
+
+def probe_tool_version(tool: str) -> str:
+    """Return a best-effort version string for one configured tool."""
+    package_name = _TOOL_PACKAGE_NAMES.get(tool)
+    if package_name:
+        try:
+            from importlib.metadata import version
+
+            return f"{tool} {version(package_name)}"
+        except Exception:
+            pass
+    cmd = _TOOL_VERSION_CMDS.get(tool)
+    if not cmd:
+        return "unavailable"
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        return (result.stdout or result.stderr or "").strip().split("\n")[0]
+    except Exception:
+        return "unavailable"
+
+
+@functools.lru_cache(maxsize=None)
+def cached_tool_version(tool: str) -> str:
+    """Process-lifetime memoized `probe_tool_version` for cache keys on hot paths."""
+    return probe_tool_version(tool)
+
+
 def get_tool_versions() -> dict[str, str]:
     """Collect version strings for core tools (best-effort)."""
     import sys
 
     versions: dict[str, str] = {"python": sys.version.split()[0]}
-    version_cmds = {
-        "streamlit": ["streamlit", "--version"],
-        "demucs": ["demucs", "--help"],
-        "basic-pitch": ["basic-pitch", "--help"],
-        "ffmpeg": ["ffmpeg", "-version"],
-    }
-    for tool, cmd in version_cmds.items():
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            first_line = (result.stdout or result.stderr or "").strip().split("\n")[0]
-            versions[tool] = first_line
-        except Exception:
-            versions[tool] = "unavailable"
+    for tool in _TOOL_VERSION_CMDS:
+        versions[tool] = probe_tool_version(tool)
     return versions
 
 
@@ -255,6 +305,8 @@ def write_run_manifest(
     tool_versions: dict[str, str],
     zip_filename: str,
     outcome_success: bool = False,
+    cache_stats: dict | None = None,
+    timings: dict | None = None,
 ) -> str:
     """Write a JSON manifest summarizing a pipeline run."""
     exported_count, skipped_count = part_report_counts(part_report)
@@ -286,6 +338,8 @@ def write_run_manifest(
         "assignments": assignments,
         "parts": part_report,
         "tool_versions": tool_versions,
+        "cache": cache_stats or {},
+        "timings": timings or {},
     }
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
     manifest_path.write_text(json.dumps(manifest, indent=2))
@@ -346,6 +400,22 @@ def normalize_manifest_data(data: object) -> dict:
     if not isinstance(tool_versions, dict):
         tool_versions = {}
 
+    cache_block = data.get("cache")
+    if not isinstance(cache_block, dict):
+        cache_block = {}
+    normalized_cache = {
+        str(name): {
+            "hits": _safe_int(counters.get("hits"), 0),
+            "misses": _safe_int(counters.get("misses"), 0),
+        }
+        for name, counters in cache_block.items()
+        if isinstance(counters, dict)
+    }
+
+    timings = data.get("timings")
+    if not isinstance(timings, dict):
+        timings = {}
+
     success_raw = outcome.get("success")
     success_value = success_raw if isinstance(success_raw, bool) else None
     outcome_status = derive_outcome_status(success_value)
@@ -392,10 +462,19 @@ def normalize_manifest_data(data: object) -> dict:
         "pipeline": {
             "app_version": pipeline.get("app_version", ""),
             "demucs_model": pipeline.get("demucs_model", ""),
+            "demucs_engine": pipeline.get("demucs_engine", ""),
+            "separation_profile": pipeline.get("separation_profile", ""),
+            "separation_settings": (
+                pipeline.get("separation_settings")
+                if isinstance(pipeline.get("separation_settings"), dict)
+                else {}
+            ),
         },
         "parts": normalized_parts,
         "assignments": assignments,
         "tool_versions": tool_versions,
+        "cache": normalized_cache,
+        "timings": timings,
     }
 
 
@@ -541,6 +620,154 @@ def prune_old_runs(runs_dir: Path, keep_latest_n: int, active_run_id: str = "")
     return {"deleted_count": deleted_count, "reclaimed_bytes": reclaimed_bytes}
 
 
+# --- Content-addressed cache helpers ---
+
+
+def hash_file_sha256(path: str | Path, chunk_bytes: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_text_sha256(text: str) -> str:
+    """Return the SHA-256 hex digest of a text key description."""
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def link_or_copy_file(source: Path, destination: Path) -> str:
+    """Hard-link source to destination, copying when linking is unsupported.
+
+    Returns "hardlink" or "copy" to describe how the file was materialized.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(source, destination)
+        return "copy"
+
+
+def lookup_cache_entry(cache_root: Path, key: str, required_files: list[str]) -> Path | None:
+    """Return a complete cache entry dir for key (refreshing its LRU stamp), else None."""
+    if not key:
+        return None
+    entry = cache_root / key
+    if not entry.is_dir():
+        return None
+    if not all((entry / name).is_file() for name in required_files):
+        return None
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return entry
+
+
+CACHE_ENTRY_METADATA_FILENAME = "entry.json"
+
+
+def commit_cache_entry(
+    cache_root: Path, key: str, files: dict[str, Path], metadata: dict | None = None,
+) -> Path | None:
+    """Store files under cache_root/key atomically; returns entry dir or None on failure.
+
+    Files are copied (never linked) into a temp dir and renamed into place, so
+    concurrent sessions never observe a half-written entry and later writes to
+    the caller's paths cannot reach the cache. If another writer won the race,
+    the existing entry is kept. Optional metadata is saved as `entry.json`.
+    """
+    if not key or not files:
+        return None
+    cache_root.mkdir(parents=True, exist_ok=True)
+    entry = cache_root / key
+    if entry.is_dir():
+        return entry
+    staging = cache_root / f".staging-{key}-{os.getpid()}-{datetime.now().strftime('%H%M%S%f')}"
+    try:
+        staging.mkdir(parents=True)
+        for name, source in files.items():
+            shutil.copy2(Path(source), staging / name)
+        if metadata is not None:
+            (staging / CACHE_ENTRY_METADATA_FILENAME).write_text(json.dumps(metadata, indent=2))
+        os.replace(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return entry if entry.is_dir() else None
+    return entry
+
+
+def read_cache_entry_metadata(entry: Path) -> dict:
+    """Return the `entry.json` metadata for a cache entry, or {} if unreadable."""
+    try:
+        data = json.loads((entry / CACHE_ENTRY_METADATA_FILENAME).read_text())
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def evict_cache_lru(cache_root: Path, max_bytes: int, keep_keys: tuple[str, ...] = ()) -> dict[str, int]:
+    """Delete least-recently-used cache entries until total size fits max_bytes."""
+    if not cache_root.exists():
+        return {"evicted_count": 0, "reclaimed_bytes": 0}
+    entries: list[tuple[float, int, Path]] = []
+    total = 0
+    for entry in cache_root.iterdir():
+        if not entry.is_dir():
+            continue
+        if entry.name.startswith(".staging-"):
+            continue
+        size_bytes = _dir_size_bytes(entry)
+        total += size_bytes
+        try:
+            stamp = entry.stat().st_mtime
+        except OSError:
+            stamp = 0.0
+        entries.append((stamp, size_bytes, entry))
+
+    evicted_count = 0
+    reclaimed_bytes = 0
+    entries.sort(key=lambda item: item[0])
+    for _, size_bytes, entry in entries:
+        if total <= max(0, int(max_bytes)):
+            break
+        if entry.name in keep_keys:
+            continue
+        try:
+            shutil.rmtree(entry)
+        except OSError:
+            continue
+        total -= size_bytes
+        evicted_count += 1
+        reclaimed_bytes += size_bytes
+    return {"evicted_count": evicted_count, "reclaimed_bytes": reclaimed_bytes}
+
+
+def cache_storage_summary(cache_root: Path) -> dict[str, int]:
+    """Return cache entry count and aggregate size."""
+    if not cache_root.exists():
+        return {"count": 0, "size_bytes": 0}
+    entries = [
+        path for path in cache_root.iterdir() if path.is_dir() and not path.name.startswith(".staging-")
+    ]
+    return {
+        "count": len(entries),
+        "size_bytes": sum(_dir_size_bytes(path) for path in entries),
+    }
+
+
+def record_cache_event(cache_stats: dict | None, cache_name: str, hit: bool) -> None:
+    """Increment hit/miss counters for a named cache in a run-scoped stats dict."""
+    if cache_stats is None:
+        return
+    counters = cache_stats.setdefault(cache_name, {"hits": 0, "misses": 0})
+    counters["hits" if hit else "misses"] = int(counters.get("hits" if hit else "misses", 0)) + 1
+
+
 def load_run_manifest(runs_dir: Path, run_id: str) -> dict:
     """Load a run manifest by run_id with explicit status."""
     if not run_id: